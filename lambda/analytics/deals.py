@@ -0,0 +1,279 @@
+import time
+import warnings
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+import numpy as np
+from aws_accessors import price_history_accessor
+from aws_accessors.price_history_accessor import Granularity, PricePoint
+
+SECONDS_PER_DAY = 86400
+
+# (part_id, store_id)
+SeriesKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class DealCriteria:
+    """When a current price counts as a deal."""
+    # Days of history, ending with the current day, used for the median and percentile
+    window_days: int = 30
+    # Minimum drop below the window median, in percent
+    min_drop_pct: float = 15.0
+    # Percentile of the window reported alongside the median
+    percentile: float = 10.0
+    # Days with a price needed before a product can be flagged at all
+    min_history_days: int = 7
+
+
+@dataclass
+class PriceMatrix:
+    """
+    Daily prices for many products: one row per series, one column per day,
+    oldest first, in cents with NaN where nothing was observed.
+    """
+    keys: list[SeriesKey]
+    # Epoch seconds at the start of column 0
+    start: int
+    prices: np.ndarray
+
+    @property
+    def days(self) -> int:
+        return self.prices.shape[1]
+
+
+@dataclass
+class PriceStats:
+    """Per-series statistics, each array aligned with PriceMatrix.keys."""
+    current: np.ndarray
+    window_min: np.ndarray
+    window_median: np.ndarray
+    window_percentile: np.ndarray
+    # Lowest price before the current one over the whole matrix
+    previous_low: np.ndarray
+    # Percent below the window median; positive means cheaper
+    drop_pct: np.ndarray
+    history_days: np.ndarray
+
+
+@dataclass
+class DealCandidate:
+    part_id: str
+    store_id: str
+    price_cents: int
+    median_cents: int
+    drop_pct: float
+    all_time_low: bool
+
+    def describe(self) -> str:
+        reasons = [f"{self.drop_pct:.0f}% below the median of ${self.median_cents / 100:.2f}"]
+        if self.all_time_low:
+            reasons.append("new all-time low")
+        return f"{self.part_id} at {self.store_id} is ${self.price_cents / 100:.2f}: {', '.join(reasons)}"
+
+
+def build_price_matrix(
+    series: dict[SeriesKey, Iterable[PricePoint]],
+    start: int,
+    days: int
+) -> PriceMatrix:
+    """
+    Bin raw points into a daily matrix, keeping the lowest price seen each day.
+
+    Args:
+        series: Points for each (part_id, store_id)
+        start: Epoch seconds of the first day; rounded down to a day boundary
+        days: Number of columns
+
+    Returns:
+        PriceMatrix
+    """
+    start = start - start % SECONDS_PER_DAY
+    keys = list(series)
+    rows: list[np.ndarray] = []
+    timestamps: list[np.ndarray] = []
+    prices: list[np.ndarray] = []
+    for row, key in enumerate(keys):
+        priced = [(point.timestamp, point.price_cents) for point in series[key] if point.price_cents is not None]
+        if not priced:
+            continue
+        data = np.asarray(priced, dtype=np.int64)
+        rows.append(np.full(len(data), row, dtype=np.int64))
+        timestamps.append(data[:, 0])
+        prices.append(data[:, 1])
+
+    matrix = np.full((len(keys), days), np.nan)
+    if rows:
+        row_index = np.concatenate(rows)
+        column_index = (np.concatenate(timestamps) - start) // SECONDS_PER_DAY
+        values = np.concatenate(prices).astype(np.float64)
+        in_range = (column_index >= 0) & (column_index < days)
+        # fmin ignores NaN, so the first point of a day replaces the fill value
+        np.fmin.at(matrix, (row_index[in_range], column_index[in_range]), values[in_range])
+    return PriceMatrix(keys=keys, start=start, prices=matrix)
+
+
+def matrix_from_daily_rollups(
+    keys: list[SeriesKey],
+    days: int = 90,
+    now: Optional[int] = None
+) -> PriceMatrix:
+    """
+    Load the daily minimum of each series from the precomputed price history rollups.
+
+    Args:
+        keys: (part_id, store_id) pairs
+        days: Days of history, ending today
+        now: Epoch seconds; defaults to now
+
+    Returns:
+        PriceMatrix
+    """
+    now = int(time.time()) if now is None else now
+    start = Granularity.DAY.bucket_start(now) - (days - 1) * SECONDS_PER_DAY
+    series: dict[SeriesKey, list[PricePoint]] = {}
+    for part_id, store_id in keys:
+        rollups = price_history_accessor.query_rollups(part_id, store_id, Granularity.DAY, start, now)
+        series[(part_id, store_id)] = [
+            PricePoint(timestamp=rollup.bucket_start, price_cents=rollup.min_cents, in_stock=True)
+            for rollup in rollups
+        ]
+    return build_price_matrix(series, start, days)
+
+
+def _last_observed(prices: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Column index and value of the last non-NaN entry in each row; -1 and NaN for empty rows.
+    """
+    observed = ~np.isnan(prices)
+    has_any = observed.any(axis=1)
+    last_column = prices.shape[1] - 1 - np.argmax(observed[:, ::-1], axis=1)
+    last_column = np.where(has_any, last_column, -1)
+    values = np.where(has_any, prices[np.arange(prices.shape[0]), np.maximum(last_column, 0)], np.nan)
+    return last_column, values
+
+
+def _nan_quantiles(values: np.ndarray, quantiles: tuple[float, ...]) -> list[np.ndarray]:
+    """
+    Row-wise quantiles ignoring NaN, with the same linear interpolation as
+    np.nanpercentile. One sort serves every quantile; np.nanpercentile falls
+    back to a per-row loop and is far slower on wide batches.
+    """
+    ordered = np.sort(values, axis=1)  # NaN sorts last
+    counts = (~np.isnan(values)).sum(axis=1)
+    results = []
+    for quantile in quantiles:
+        position = quantile * np.maximum(counts - 1, 0)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        low_values = np.take_along_axis(ordered, lower[:, np.newaxis], axis=1)[:, 0]
+        high_values = np.take_along_axis(ordered, upper[:, np.newaxis], axis=1)[:, 0]
+        result = low_values + (high_values - low_values) * (position - lower)
+        results.append(np.where(counts > 0, result, np.nan))
+    return results
+
+
+def rolling_min(prices: np.ndarray, window_days: int) -> np.ndarray:
+    """
+    Trailing minimum over window_days for every day, ignoring missing days.
+
+    Returns:
+        Array shaped like prices; the first window_days - 1 columns use the days available so far
+    """
+    padded = np.concatenate([np.full((prices.shape[0], window_days - 1), np.nan), prices], axis=1)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window_days, axis=1)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmin(windows, axis=2)
+
+
+def compute_stats(
+    matrix: PriceMatrix,
+    criteria: DealCriteria = DealCriteria(),
+    current: Optional[Sequence[float]] = None
+) -> PriceStats:
+    """
+    Compute the statistics deal rules need for every series at once.
+
+    Args:
+        matrix: Daily prices
+        criteria: Deal thresholds
+        current: Latest in-stock price of each series, in cents, aligned with matrix.keys.
+            A daily column holds the lowest price of the day, which may be a dip that has
+            since recovered, so callers that know the live price should pass it. When
+            omitted the last observed column stands in.
+    """
+    prices = matrix.prices
+    last_column, last_observed = _last_observed(prices)
+    if current is None:
+        current = last_observed
+    else:
+        current = np.asarray(current, dtype=np.float64)
+        # Observed now, so only earlier days count towards the previous low
+        last_column = np.full(prices.shape[0], prices.shape[1] - 1)
+    window = prices[:, -criteria.window_days:]
+
+    # Everything before each row's current observation
+    columns = np.arange(prices.shape[1])
+    earlier = np.where(columns[np.newaxis, :] < last_column[:, np.newaxis], prices, np.nan)
+
+    # All-NaN rows are expected for new products and yield NaN, which the rules treat as "no data"
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        window_min = np.nanmin(window, axis=1)
+        window_median, window_percentile = _nan_quantiles(window, (0.5, criteria.percentile / 100.0))
+        previous_low = np.nanmin(earlier, axis=1)
+        drop_pct = (window_median - current) / window_median * 100.0
+
+    return PriceStats(
+        current=current,
+        window_min=window_min,
+        window_median=window_median,
+        window_percentile=window_percentile,
+        previous_low=previous_low,
+        drop_pct=drop_pct,
+        history_days=(~np.isnan(prices)).sum(axis=1)
+    )
+
+
+def find_deals(
+    matrix: PriceMatrix,
+    criteria: DealCriteria = DealCriteria(),
+    in_stock: Optional[np.ndarray] = None,
+    current: Optional[Sequence[float]] = None
+) -> list[DealCandidate]:
+    """
+    Flag series whose current price is far enough below the window median or
+    is a new all-time low, ranked by drop below the median.
+
+    Args:
+        matrix: Daily prices
+        criteria: Deal thresholds
+        in_stock: Optional boolean mask aligned with matrix.keys; out-of-stock series are never deals
+        current: Optional latest in-stock price of each series, in cents; see compute_stats
+
+    Returns:
+        DealCandidate list, biggest drop first
+    """
+    stats = compute_stats(matrix, criteria, current)
+    enough_history = stats.history_days >= criteria.min_history_days
+    with np.errstate(invalid='ignore'):
+        big_drop = stats.drop_pct >= criteria.min_drop_pct
+        all_time_low = stats.current < stats.previous_low
+    flagged = enough_history & (big_drop | all_time_low)
+    if in_stock is not None:
+        flagged &= np.asarray(in_stock, dtype=bool)
+
+    indices = np.flatnonzero(flagged)
+    # Biggest drop first; all-time lows break ties
+    order = np.lexsort((~all_time_low[indices], -stats.drop_pct[indices]))
+    return [
+        DealCandidate(
+            part_id=matrix.keys[index][0],
+            store_id=matrix.keys[index][1],
+            price_cents=int(stats.current[index]),
+            median_cents=int(round(stats.window_median[index])),
+            drop_pct=float(stats.drop_pct[index]),
+            all_time_low=bool(all_time_low[index])
+        )
+        for index in indices[order]
+    ]
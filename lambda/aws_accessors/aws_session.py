@@ -1,31 +1,92 @@
-import boto3
-from botocore.exceptions import ClientError
 import os
-from typing import Any
+import threading
+from typing import Any, Optional
+
+DEFAULT_REGION = 'us-east-1'
+# Sized for the thread pools that batch DynamoDB reads and writes
+MAX_POOL_CONNECTIONS = 32
+CLIENT_CONFIG_OPTIONS: dict = {
+    'max_pool_connections': MAX_POOL_CONNECTIONS,
+    'connect_timeout': 5,
+    'read_timeout': 30,
+    'retries': {'max_attempts': 5, 'mode': 'adaptive'},
+}
 
 class AWSSession:
+    """
+    Process-wide boto3 session. boto3 is imported, and clients, resources and
+    tables are built, on first use rather than at import time; each is then
+    kept per (service, region) and reused by warm invocations.
+    """
     _instance = None
     _session = None
+    _config = None
+    _clients: dict[tuple[str, str], Any] = {}
+    _resources: dict[tuple[str, str], Any] = {}
+    _tables: dict[tuple[str, str], Any] = {}
+    _lock = threading.RLock()
 
     def __new__(cls):
         if cls._instance is None:
+            import boto3
+            from botocore.config import Config
             cls._instance = super(AWSSession, cls).__new__(cls)
             cls._session = boto3.Session()
+            cls._config = Config(**CLIENT_CONFIG_OPTIONS)
         return cls._instance
 
     @classmethod
-    def get_session(cls) -> boto3.Session:
-        if cls._instance is None:
-            cls()
-        return cls._session
+    def get_session(cls) -> Any:
+        with cls._lock:
+            if cls._instance is None:
+                cls()
+            return cls._session
+
+    @staticmethod
+    def default_region() -> str:
+        return os.getenv('AWS_REGION', os.getenv('AWS_DEFAULT_REGION', DEFAULT_REGION))
+
+    @classmethod
+    def get_client(cls, service: str, region: Optional[str] = None) -> Any:
+        key = (service, region or cls.default_region())
+        with cls._lock:
+            if key not in cls._clients:
+                cls._clients[key] = cls.get_session().client(service, region_name=key[1], config=cls._config)
+            return cls._clients[key]
+
+    @classmethod
+    def get_resource(cls, service: str, region: Optional[str] = None) -> Any:
+        key = (service, region or cls.default_region())
+        with cls._lock:
+            if key not in cls._resources:
+                cls._resources[key] = cls.get_session().resource(service, region_name=key[1], config=cls._config)
+            return cls._resources[key]
 
     @classmethod
-    def get_client(cls, service: str) -> Any:
-        return cls.get_session().client(service, region_name='us-east-1')
+    def get_table(cls, table_name: str, region: Optional[str] = None) -> Any:
+        key = (table_name, region or cls.default_region())
+        with cls._lock:
+            if key not in cls._tables:
+                cls._tables[key] = cls.get_resource('dynamodb', key[1]).Table(table_name)
+            return cls._tables[key]
 
     @classmethod
-    def get_resource(cls, service: str) -> Any:
-        return cls.get_session().resource(service, region_name='us-east-1')
+    def reset(cls) -> None:
+        """Drop memoized clients, resources and tables, e.g. after credentials change."""
+        with cls._lock:
+            cls._clients.clear()
+            cls._resources.clear()
+            cls._tables.clear()
+
+def is_client_error(error: Exception, code: Optional[str] = None) -> bool:
+    """
+    Check for a botocore ClientError, optionally with a specific error code,
+    without importing botocore before it is needed.
+    """
+    from botocore.exceptions import ClientError
+    if not isinstance(error, ClientError):
+        return False
+    return code is None or error.response['Error']['Code'] == code
 
 def handle_aws_error(operation: str):
     """Decorator for handling AWS ClientErrors"""
@@ -33,8 +94,9 @@ def handle_aws_error(operation: str):
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
-            except ClientError as e:
-                print(f"AWS Error during {operation}: {e.response['Error']['Message']}")
+            except Exception as e:
+                if is_client_error(e):
+                    print(f"AWS Error during {operation}: {e.response['Error']['Message']}")
                 raise e
         return wrapper
     return decorator
@@ -0,0 +1,55 @@
+from typing import Optional
+from catalog.catalog import CatalogEntry
+from models.store import Store
+from .aws_session import AWSSession, handle_aws_error
+
+# Constants
+CATALOG_TABLE_NAME = 'CatalogTable'
+
+def get_table():
+    # Built on first use so importing this module makes no AWS calls
+    return AWSSession.get_table(CATALOG_TABLE_NAME)
+
+@handle_aws_error('DynamoDB catalog scan')
+def scan_catalog() -> list[CatalogEntry]:
+    print(f"Scanning DynamoDB catalog table {CATALOG_TABLE_NAME}")
+    entries: list[CatalogEntry] = []
+    scan_kwargs: dict = {}
+    while True:
+        response = get_table().scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            entry = entry_from_dict(item)
+            if entry is not None:
+                entries.append(entry)
+        last_key: Optional[dict] = response.get('LastEvaluatedKey')
+        if last_key is None:
+            break
+        scan_kwargs['ExclusiveStartKey'] = last_key
+    print(f"Loaded {len(entries)} catalog entries from DynamoDB")
+    return entries
+
+@handle_aws_error('DynamoDB catalog put')
+def put_entry(entry: CatalogEntry) -> None:
+    get_table().put_item(Item=entry_to_dict(entry))
+
+def entry_to_dict(entry: CatalogEntry) -> dict:
+    return {
+        'PartId': entry.product_id,
+        'Title': entry.title,
+        'Urls': {store.name: url for store, url in entry.urls.items()}
+    }
+
+def entry_from_dict(unstructured_item: dict) -> Optional[CatalogEntry]:
+    urls = {}
+    for store_name, url in (unstructured_item.get('Urls') or {}).items():
+        if store_name not in Store.__members__:
+            print(f"Skipping unknown store {store_name} for {unstructured_item.get('PartId')}")
+            continue
+        urls[Store[store_name]] = url
+    if 'PartId' not in unstructured_item:
+        return None
+    return CatalogEntry(
+        product_id=unstructured_item['PartId'],
+        title=unstructured_item.get('Title', unstructured_item['PartId']),
+        urls=urls
+    )
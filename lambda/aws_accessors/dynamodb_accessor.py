@@ -1,33 +1,304 @@
-from boto3.dynamodb.conditions import Key
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from dataclasses import dataclass
+from decimal import Decimal
 from models.product import Product
-from typing import Optional
-from .aws_session import AWSSession, handle_aws_error
+from models.store import Store
+from observability.metrics import timed
+from typing import Iterable, Optional
+from .aws_session import AWSSession, handle_aws_error, is_client_error
 
 # Constants
 DYNAMODB_TABLE_NAME = 'StockTable'
+BATCH_GET_MAX_KEYS = 100
+BATCH_WRITE_MAX_ITEMS = 25
+BATCH_MAX_WORKERS = 8
+BATCH_MAX_RETRIES = 6
+BATCH_BACKOFF_BASE_SECONDS = 0.05
 
-# Initialize DynamoDB
-dynamodb = AWSSession.get_resource('dynamodb')
-table = dynamodb.Table(DYNAMODB_TABLE_NAME)
+def get_table():
+    # Built on first use so importing this module makes no AWS calls
+    return AWSSession.get_table(DYNAMODB_TABLE_NAME)
+def get_client():
+    # Low-level client for batch calls; unlike the resource it is safe to share between threads
+    return AWSSession.get_client('dynamodb')
+
+@lru_cache(maxsize=1)
+def _deserializer():
+    from boto3.dynamodb.types import TypeDeserializer
+    return TypeDeserializer()
+
+@lru_cache(maxsize=1)
+def _serializer():
+    from boto3.dynamodb.types import TypeSerializer
+    return TypeSerializer()
 
 @handle_aws_error('DynamoDB query')
+@timed('dynamodb.query')
 def query_item(part_id: str, store_id: str) -> Optional[Product]:
+    from boto3.dynamodb.conditions import Key
     print(f"Querying DynamoDB for part_id: {part_id} and store_id: {store_id}")
-    response = table.query(
+    response = get_table().query(
         KeyConditionExpression=Key('PartId').eq(part_id) & Key('StoreId').eq(store_id)
     )
-    items = response['Items']
-    if items is not None:
+    items = response.get('Items')
+    if items:
         print("Found item in DynamoDB")
         return product_from_dict(items[0])
     else:
         print("No items found in DynamoDB for part_id and store_id")
         return None
 
+def _backoff(attempt: int) -> None:
+    # Exponential backoff with full jitter
+    time.sleep(random.uniform(0, BATCH_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+@timed('dynamodb.batch_get')
+def _batch_get_chunk(keys: list[tuple[str, str]], table_name: str = DYNAMODB_TABLE_NAME) -> list[dict]:
+    """
+    Fetch up to BATCH_GET_MAX_KEYS items, retrying UnprocessedKeys with backoff.
+
+    Raises:
+        RuntimeError: If keys are still unprocessed after BATCH_MAX_RETRIES retries
+    """
+    request_items = {
+        table_name: {
+            'Keys': [{'PartId': {'S': part_id}, 'StoreId': {'S': store_id}} for part_id, store_id in keys]
+        }
+    }
+    items: list[dict] = []
+    deserializer = _deserializer()
+    for attempt in range(BATCH_MAX_RETRIES + 1):
+        response = get_client().batch_get_item(RequestItems=request_items)
+        for raw_item in response.get('Responses', {}).get(table_name, []):
+            items.append({name: deserializer.deserialize(value) for name, value in raw_item.items()})
+        request_items = response.get('UnprocessedKeys') or {}
+        if not request_items:
+            return items
+        _backoff(attempt)
+    unprocessed = len(request_items.get(table_name, {}).get('Keys', []))
+    raise RuntimeError(f"{unprocessed} keys still unprocessed after {BATCH_MAX_RETRIES} retries")
+
+def batch_get_keys(table_name: str, keys: Iterable[tuple[str, str]]) -> list[dict]:
+    """
+    Fetch the items of many (PartId, StoreId) keys from a table with BatchGetItem.
+    Keys are de-duplicated and split into chunks of 100 that run in parallel.
+
+    Args:
+        table_name: Table keyed by PartId and StoreId
+        keys: (part_id, store_id) pairs
+
+    Returns:
+        Deserialized items; keys with no item are absent
+
+    Raises:
+        RuntimeError: If keys are still unprocessed after BATCH_MAX_RETRIES retries
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    if not unique_keys:
+        return []
+    chunks = [unique_keys[start:start + BATCH_GET_MAX_KEYS]
+              for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS)]
+    print(f"Batch reading {len(unique_keys)} items from {table_name} in {len(chunks)} requests")
+
+    with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(chunks))) as executor:
+        chunk_results = list(executor.map(lambda chunk: _batch_get_chunk(chunk, table_name), chunks))
+    return [item for items in chunk_results for item in items]
+
+@handle_aws_error('DynamoDB batch get')
+def batch_get_items(keys: Iterable[tuple[str, str]]) -> dict[tuple[str, str], Product]:
+    """
+    Fetch the stored state for many (PartId, StoreId) keys with BatchGetItem.
+    See batch_get_keys, which de-duplicates and chunks the keys.
+
+    Args:
+        keys: (part_id, store_id) pairs
+
+    Returns:
+        Dict of stored products keyed by (part_id, store_id); keys with no item are absent
+    """
+    products: dict[tuple[str, str], Product] = {}
+    for item in batch_get_keys(DYNAMODB_TABLE_NAME, keys):
+        products[(item['PartId'], item['StoreId'])] = product_from_dict(item)
+    print(f"Found {len(products)} items in DynamoDB")
+    return products
+
+@timed('dynamodb.batch_write')
+def _batch_write_chunk(items: list[dict]) -> None:
+    """
+    Write up to BATCH_WRITE_MAX_ITEMS items, retrying UnprocessedItems with backoff.
+
+    Raises:
+        RuntimeError: If items are still unprocessed after BATCH_MAX_RETRIES retries
+    """
+    serializer = _serializer()
+    request_items = {
+        DYNAMODB_TABLE_NAME: [
+            {'PutRequest': {'Item': {name: serializer.serialize(value) for name, value in item.items()}}}
+            for item in items
+        ]
+    }
+    for attempt in range(BATCH_MAX_RETRIES + 1):
+        response = get_client().batch_write_item(RequestItems=request_items)
+        request_items = response.get('UnprocessedItems') or {}
+        if not request_items:
+            return
+        _backoff(attempt)
+    unprocessed = len(request_items.get(DYNAMODB_TABLE_NAME, []))
+    raise RuntimeError(f"{unprocessed} items still unprocessed after {BATCH_MAX_RETRIES} retries")
+
+class WriteBuffer:
+    """
+    Collects changed product states during a run and writes them with
+    BatchWriteItem. Each full group of 25 is sent on a worker thread as soon
+    as it fills, so the caller keeps going; flush() sends the remainder and
+    waits for every write. Products whose serialized state matches what was
+    read are skipped.
+    """
+
+    def __init__(self, known_products: Optional[dict[tuple[str, str], Product]] = None,
+                 max_workers: int = BATCH_MAX_WORKERS) -> None:
+        """
+        Args:
+            known_products: Stored state keyed by (part_id, store_id), e.g. from batch_get_items
+            max_workers: Parallel BatchWriteItem calls
+        """
+        self._known: dict[tuple[str, str], dict] = {
+            key: product_to_dict(product) for key, product in (known_products or {}).items()
+        }
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._futures: list[Future] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers: int = max_workers
+        self._lock = threading.Lock()
+        self.written: int = 0
+        self.skipped: int = 0
+
+    def add(self, product: Product) -> bool:
+        """
+        Queue a product state for writing.
+
+        Returns:
+            False if the state matches what is stored and was skipped
+        """
+        item = product_to_dict(product)
+        key = (item['PartId'], item['StoreId'])
+        with self._lock:
+            if self._known.get(key) == item:
+                self.skipped += 1
+                return False
+            # A later state for the same key replaces the pending one; a batch may not repeat keys
+            self._pending[key] = item
+            self._known[key] = item
+            if len(self._pending) >= BATCH_WRITE_MAX_ITEMS:
+                self._submit_pending()
+        return True
+
+    def _submit_pending(self) -> None:
+        items = list(self._pending.values())
+        self._pending.clear()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+        for start in range(0, len(items), BATCH_WRITE_MAX_ITEMS):
+            chunk = items[start:start + BATCH_WRITE_MAX_ITEMS]
+            self._futures.append(self._executor.submit(_batch_write_chunk, chunk))
+            self.written += len(chunk)
+
+    @handle_aws_error('DynamoDB batch write')
+    def flush(self) -> None:
+        """
+        Send any pending items and wait for every write to finish.
+        The first failed write is re-raised.
+        """
+        with self._lock:
+            if self._pending:
+                self._submit_pending()
+            futures, self._futures = self._futures, []
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        print(f"Wrote {self.written} items to DynamoDB, skipped {self.skipped} unchanged")
+
+@dataclass
+class StateTransition:
+    """The outcome of recording a product state with record_transition."""
+    product: Product
+    # Stored state before the update; None when the product was first seen
+    previous: Optional[Product]
+    # False when the stored state already matched and nothing was written
+    changed: bool
+
+    @property
+    def first_seen(self) -> bool:
+        return self.changed and self.previous is None
+
+    @property
+    def restocked(self) -> bool:
+        """
+        True when the product is in stock and was not before, including a first sighting in stock.
+        """
+        if not self.changed or not self.product.in_stock:
+            return False
+        return self.previous is None or not self.previous.in_stock
+
+    @property
+    def price_dropped(self) -> bool:
+        if not self.changed or self.previous is None:
+            return False
+        if self.product.price is None or self.previous.price is None:
+            return False
+        return _to_decimal(self.product.price) < _to_decimal(self.previous.price)
+
+@handle_aws_error('DynamoDB conditional update')
+@timed('dynamodb.update')
+def record_transition(product: Product) -> StateTransition:
+    """
+    Record a product state with one conditional UpdateItem instead of a read
+    followed by a put. The update only applies when the price or stock state
+    differs from the stored item, and ALL_OLD returns what it replaced, so two
+    overlapping sweeps cannot both report the same transition.
+
+    Args:
+        product: Newly resolved product
+
+    Returns:
+        StateTransition describing what changed
+    """
+    item = product_to_dict(product)
+    try:
+        response = get_table().update_item(
+            Key={'PartId': item['PartId'], 'StoreId': item['StoreId']},
+            UpdateExpression='SET #name = :name, Price = :price, #url = :url, InStock = :in_stock',
+            ConditionExpression='attribute_not_exists(PartId) OR InStock <> :in_stock OR Price <> :price',
+            ExpressionAttributeNames={'#name': 'Name', '#url': 'Url'},
+            ExpressionAttributeValues={
+                ':name': item['Name'],
+                ':price': item['Price'],
+                ':url': item['Url'],
+                ':in_stock': item['InStock'],
+            },
+            ReturnValues='ALL_OLD'
+        )
+    except Exception as e:
+        if is_client_error(e, 'ConditionalCheckFailedException'):
+            return StateTransition(product=product, previous=None, changed=False)
+        raise
+    old_item = response.get('Attributes')
+    previous = product_from_dict(old_item) if old_item else None
+    return StateTransition(product=product, previous=previous, changed=True)
+
 @handle_aws_error('DynamoDB put')
+@timed('dynamodb.put')
 def put_item(product: Product) -> None:
     print(f"Putting item in DynamoDB: {product.id}")
-    table.put_item(
+    get_table().put_item(
         Item={
             'PartId': product.id,
             'StoreId': product.store.name,
@@ -39,12 +310,18 @@ def put_item(product: Product) -> None:
     )
     print("Successfully put item in DynamoDB")
 
+def _to_decimal(price) -> Optional[Decimal]:
+    # DynamoDB numbers must be Decimal; str() keeps 1999.99 from becoming 1999.9899...
+    if price is None or isinstance(price, Decimal):
+        return price
+    return Decimal(str(price))
+
 def product_to_dict(product: Product) -> dict:
     return {
         'PartId': product.id,
         'StoreId': product.store.name,
         'Name': product.name,
-        'Price': product.price,
+        'Price': _to_decimal(product.price),
         'Url': product.url,
         'InStock': product.in_stock
     }
@@ -52,7 +329,7 @@ def product_to_dict(product: Product) -> dict:
 def product_from_dict(unstructured_item: dict) -> Product:
     return Product(
         id=unstructured_item['PartId'],
-        store=unstructured_item['StoreId'],
+        store=Store(unstructured_item['StoreId']),
         name=unstructured_item['Name'],
         price=unstructured_item['Price'],
         url=unstructured_item['Url'],
@@ -0,0 +1,91 @@
+from typing import Optional
+from .aws_session import AWSSession, handle_aws_error, is_client_error
+
+# Constants
+OUTBOX_TABLE_NAME = 'OutboxTable'
+# Sparse index: only records that still await delivery carry PendingChannel
+PENDING_INDEX_NAME = 'PendingIndex'
+SENT_RETENTION_SECONDS = 14 * 24 * 3600
+
+def get_table():
+    # Built on first use so importing this module makes no AWS calls
+    return AWSSession.get_table(OUTBOX_TABLE_NAME)
+
+
+def _condition_failed(error: Exception) -> bool:
+    return is_client_error(error, 'ConditionalCheckFailedException')
+
+
+@handle_aws_error('DynamoDB outbox put')
+def put_record(item: dict) -> bool:
+    """
+    Store a notification record unless one with the same NotificationId is
+    still pending. A sent record with that id belongs to an earlier occurrence
+    of the same transition and is replaced.
+
+    Returns:
+        False if the record is already pending in the outbox
+    """
+    try:
+        get_table().put_item(
+            Item=item,
+            ConditionExpression='attribute_not_exists(NotificationId) OR attribute_not_exists(PendingChannel)'
+        )
+        return True
+    except Exception as e:
+        if _condition_failed(e):
+            return False
+        raise
+
+
+@handle_aws_error('DynamoDB outbox scan')
+def scan_pending() -> list[dict]:
+    items: list[dict] = []
+    scan_kwargs: dict = {'IndexName': PENDING_INDEX_NAME}
+    while True:
+        response = get_table().scan(**scan_kwargs)
+        items.extend(response.get('Items', []))
+        last_key: Optional[dict] = response.get('LastEvaluatedKey')
+        if last_key is None:
+            return items
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+
+@handle_aws_error('DynamoDB outbox claim')
+def claim(notification_id: str, lease_until: int, now: int) -> bool:
+    """
+    Lease a pending record so that no other drainer sends it.
+
+    Returns:
+        False if the record was already sent or is leased by someone else
+    """
+    try:
+        get_table().update_item(
+            Key={'NotificationId': notification_id},
+            UpdateExpression='SET LeaseUntil = :lease',
+            ConditionExpression='attribute_exists(PendingChannel) AND '
+                                '(attribute_not_exists(LeaseUntil) OR LeaseUntil < :now)',
+            ExpressionAttributeValues={':lease': lease_until, ':now': now}
+        )
+        return True
+    except Exception as e:
+        if _condition_failed(e):
+            return False
+        raise
+
+
+@handle_aws_error('DynamoDB outbox mark sent')
+def mark_sent(notification_id: str, now: int) -> None:
+    get_table().update_item(
+        Key={'NotificationId': notification_id},
+        UpdateExpression='SET SentAt = :now, ExpiresAt = :expires REMOVE PendingChannel, LeaseUntil',
+        ExpressionAttributeValues={':now': now, ':expires': now + SENT_RETENTION_SECONDS}
+    )
+
+
+@handle_aws_error('DynamoDB outbox release')
+def release(notification_id: str) -> None:
+    get_table().update_item(
+        Key={'NotificationId': notification_id},
+        UpdateExpression='REMOVE LeaseUntil'
+    )
@@ -0,0 +1,57 @@
+from typing import Iterable, Optional
+from observability.metrics import timed
+from .aws_session import AWSSession, handle_aws_error
+from .dynamodb_accessor import batch_get_keys
+
+# Constants
+POLL_SCHEDULE_TABLE_NAME = 'PollScheduleTable'
+# Every item shares one DueIndex partition, so a single query returns the earliest due items of the whole catalog
+DUE_INDEX_NAME = 'DueIndex'
+SCHEDULE_BUCKET = 'DUE'
+
+def get_table():
+    # Built on first use so importing this module makes no AWS calls
+    return AWSSession.get_table(POLL_SCHEDULE_TABLE_NAME)
+
+@handle_aws_error('DynamoDB poll schedule query')
+@timed('dynamodb.poll_due')
+def query_due(now: int, limit: int) -> list[dict]:
+    """
+    Items whose NextCheckAt has passed, earliest first.
+
+    Args:
+        now: Epoch seconds
+        limit: Most items to return
+    """
+    from boto3.dynamodb.conditions import Key
+    items: list[dict] = []
+    query_kwargs: dict = {
+        'IndexName': DUE_INDEX_NAME,
+        'KeyConditionExpression': Key('ScheduleBucket').eq(SCHEDULE_BUCKET) & Key('NextCheckAt').lte(now),
+    }
+    while len(items) < limit:
+        response = get_table().query(Limit=limit - len(items), **query_kwargs)
+        items.extend(response.get('Items', []))
+        last_key: Optional[dict] = response.get('LastEvaluatedKey')
+        if last_key is None:
+            break
+        query_kwargs['ExclusiveStartKey'] = last_key
+    return items
+
+@handle_aws_error('DynamoDB poll schedule get')
+@timed('dynamodb.poll_get')
+def get_items(keys: Iterable[tuple[str, str]]) -> list[dict]:
+    """
+    Fetch the schedule items for (PartId, StoreId) keys; keys without an item are absent from the result.
+
+    Raises:
+        RuntimeError: If keys are still unprocessed after the batch retries
+    """
+    return batch_get_keys(POLL_SCHEDULE_TABLE_NAME, keys)
+
+@handle_aws_error('DynamoDB poll schedule put')
+@timed('dynamodb.poll_put')
+def put_items(items: Iterable[dict]) -> None:
+    with get_table().batch_writer(overwrite_by_pkeys=['PartId', 'StoreId']) as batch:
+        for item in items:
+            batch.put_item(Item={**item, 'ScheduleBucket': SCHEDULE_BUCKET})
@@ -0,0 +1,240 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from enum import Enum
+from typing import Iterable, Optional
+from models.product import Product
+from .aws_session import AWSSession, handle_aws_error, is_client_error
+
+# Constants
+PRICE_HISTORY_TABLE_NAME = 'PriceHistoryTable'
+# Raw points and rollups expire through the table's TTL attribute
+RAW_RETENTION_SECONDS = 90 * 24 * 3600
+HOURLY_RETENTION_SECONDS = 180 * 24 * 3600
+DAILY_RETENTION_SECONDS = 2 * 365 * 24 * 3600
+# Rollup UpdateItems are independent per product, so they run on a small thread pool
+ROLLUP_MAX_WORKERS = 8
+
+def get_table():
+    # Built on first use so importing this module makes no AWS calls
+    return AWSSession.get_table(PRICE_HISTORY_TABLE_NAME)
+
+
+class Granularity(str, Enum):
+    """Rollup bucket sizes."""
+    HOUR = "HOUR"
+    DAY = "DAY"
+
+    @property
+    def seconds(self) -> int:
+        return 3600 if self == Granularity.HOUR else 86400
+
+    @property
+    def retention_seconds(self) -> int:
+        return HOURLY_RETENTION_SECONDS if self == Granularity.HOUR else DAILY_RETENTION_SECONDS
+
+    def bucket_start(self, timestamp: int) -> int:
+        return timestamp - timestamp % self.seconds
+
+
+@dataclass
+class PricePoint:
+    """One observation of a product at a store."""
+    # Epoch seconds
+    timestamp: int
+    # None when no price was shown, e.g. out of stock
+    price_cents: Optional[int]
+    in_stock: bool
+
+
+@dataclass
+class PriceRollup:
+    """Aggregate of the priced observations in one bucket."""
+    # Epoch seconds at the start of the bucket
+    bucket_start: int
+    min_cents: int
+    max_cents: int
+    last_cents: int
+    last_timestamp: int
+    count: int
+
+
+def to_cents(price) -> Optional[int]:
+    """
+    Convert a price in dollars to integer cents, rounding half up.
+    """
+    if price is None:
+        return None
+    return int((Decimal(str(price)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def series_id(part_id: str, store_id: str, granularity: Optional[Granularity] = None) -> str:
+    """
+    Partition key of a product's raw series, or of one of its rollup series.
+    """
+    if granularity is None:
+        return f"{part_id}#{store_id}"
+    return f"{part_id}#{store_id}#{granularity.value}"
+
+
+def point_to_dict(part_id: str, store_id: str, point: PricePoint) -> dict:
+    item = {
+        'SeriesId': series_id(part_id, store_id),
+        'Ts': point.timestamp,
+        'InStock': point.in_stock,
+        'ExpiresAt': point.timestamp + RAW_RETENTION_SECONDS
+    }
+    if point.price_cents is not None:
+        item['PriceCents'] = point.price_cents
+    return item
+
+
+def point_from_dict(unstructured_item: dict) -> PricePoint:
+    price_cents = unstructured_item.get('PriceCents')
+    return PricePoint(
+        timestamp=int(unstructured_item['Ts']),
+        price_cents=int(price_cents) if price_cents is not None else None,
+        in_stock=unstructured_item['InStock']
+    )
+
+
+def rollup_from_dict(unstructured_item: dict) -> PriceRollup:
+    return PriceRollup(
+        bucket_start=int(unstructured_item['Ts']),
+        min_cents=int(unstructured_item['MinCents']),
+        max_cents=int(unstructured_item['MaxCents']),
+        last_cents=int(unstructured_item['LastCents']),
+        last_timestamp=int(unstructured_item['LastTs']),
+        count=int(unstructured_item['PointCount'])
+    )
+
+
+def _replace_bound(key: dict, attribute: str, price_cents: int, comparison: str) -> None:
+    """
+    Conditionally replace MinCents or MaxCents. The condition makes concurrent writers safe:
+    whichever value is more extreme wins.
+    """
+    try:
+        get_table().update_item(
+            Key=key,
+            UpdateExpression=f'SET {attribute} = :price',
+            ConditionExpression=f'{attribute} {comparison} :price',
+            ExpressionAttributeValues={':price': price_cents}
+        )
+    except Exception as e:
+        if not is_client_error(e, 'ConditionalCheckFailedException'):
+            raise
+
+
+def _update_rollup(part_id: str, store_id: str, granularity: Granularity, timestamp: int, price_cents: int) -> None:
+    """
+    Fold one priced observation into its rollup bucket. Count and last price
+    are updated in one call that seeds min and max for a new bucket; min and
+    max only need a second, conditional call when the price leaves the range.
+    """
+    bucket_start = granularity.bucket_start(timestamp)
+    key = {'SeriesId': series_id(part_id, store_id, granularity), 'Ts': bucket_start}
+    response = get_table().update_item(
+        Key=key,
+        UpdateExpression=(
+            'SET MinCents = if_not_exists(MinCents, :price), MaxCents = if_not_exists(MaxCents, :price), '
+            'LastCents = :price, LastTs = :ts, ExpiresAt = :expires ADD PointCount :one'
+        ),
+        ExpressionAttributeValues={
+            ':price': price_cents,
+            ':ts': timestamp,
+            ':expires': bucket_start + granularity.retention_seconds,
+            ':one': 1
+        },
+        ReturnValues='ALL_NEW'
+    )
+    attributes = response.get('Attributes', {})
+    if price_cents < attributes.get('MinCents', price_cents):
+        _replace_bound(key, 'MinCents', price_cents, '>')
+    if price_cents > attributes.get('MaxCents', price_cents):
+        _replace_bound(key, 'MaxCents', price_cents, '<')
+
+
+@handle_aws_error('DynamoDB price history write')
+def record_prices(products: Iterable[Product], timestamp: Optional[int] = None) -> None:
+    """
+    Append one raw point per product and fold priced in-stock points into the
+    hourly and daily rollups. Out-of-stock listings often show a stale or
+    placeholder price, so the rollups leave them out.
+
+    Args:
+        products: Resolved products
+        timestamp: Observation time in epoch seconds; defaults to now
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    products = list(products)
+    print(f"Recording {len(products)} price history points")
+    # batch_writer groups puts into BatchWriteItem calls and resends unprocessed items
+    with get_table().batch_writer(overwrite_by_pkeys=['SeriesId', 'Ts']) as batch:
+        for product in products:
+            point = PricePoint(timestamp, to_cents(product.price), product.in_stock)
+            batch.put_item(Item=point_to_dict(product.id, product.store.name, point))
+    priced = [(product, to_cents(product.price)) for product in products
+              if product.price is not None and product.in_stock]
+    if not priced:
+        return
+
+    def update_rollups(product: Product, price_cents: int) -> None:
+        for granularity in Granularity:
+            _update_rollup(product.id, product.store.name, granularity, timestamp, price_cents)
+
+    with ThreadPoolExecutor(max_workers=min(ROLLUP_MAX_WORKERS, len(priced))) as executor:
+        # list() re-raises the first failure once every update has finished
+        list(executor.map(lambda pair: update_rollups(*pair), priced))
+
+
+def _query_range(partition: str, start: int, end: int) -> list[dict]:
+    from boto3.dynamodb.conditions import Key
+    items: list[dict] = []
+    query_kwargs: dict = {
+        'KeyConditionExpression': Key('SeriesId').eq(partition) & Key('Ts').between(start, end)
+    }
+    while True:
+        response = get_table().query(**query_kwargs)
+        items.extend(response.get('Items', []))
+        last_key: Optional[dict] = response.get('LastEvaluatedKey')
+        if last_key is None:
+            return items
+        query_kwargs['ExclusiveStartKey'] = last_key
+
+
+@handle_aws_error('DynamoDB price history query')
+def query_points(part_id: str, store_id: str, start: int, end: int) -> list[PricePoint]:
+    """
+    Read raw points in a time range, oldest first.
+
+    Args:
+        part_id: Product identifier
+        store_id: Store name
+        start: Range start in epoch seconds, inclusive
+        end: Range end in epoch seconds, inclusive
+
+    Returns:
+        List of PricePoint objects
+    """
+    return [point_from_dict(item) for item in _query_range(series_id(part_id, store_id), start, end)]
+
+
+@handle_aws_error('DynamoDB price history rollup query')
+def query_rollups(part_id: str, store_id: str, granularity: Granularity, start: int, end: int) -> list[PriceRollup]:
+    """
+    Read precomputed rollups whose buckets start in a time range, oldest first.
+
+    Args:
+        part_id: Product identifier
+        store_id: Store name
+        granularity: Bucket size
+        start: Range start in epoch seconds, inclusive
+        end: Range end in epoch seconds, inclusive
+
+    Returns:
+        List of PriceRollup objects
+    """
+    partition = series_id(part_id, store_id, granularity)
+    return [rollup_from_dict(item) for item in _query_range(partition, granularity.bucket_start(start), end)]
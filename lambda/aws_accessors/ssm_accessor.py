@@ -1,16 +1,104 @@
-import boto3
-from botocore.exceptions import ClientError
 import os
+import threading
+import time
+from typing import Callable, Iterable, Optional
+from observability.metrics import timed
 from .aws_session import AWSSession, handle_aws_error
 
-# Create a session using Lambda's IAM role credentials
-session = boto3.Session()
+# GetParameters accepts at most 10 names per call
+GET_PARAMETERS_MAX_NAMES = 10
+DEFAULT_CACHE_TTL_SECONDS = 300.0
 
-ssm_client = AWSSession.get_client('ssm')
+def get_client():
+    # Built on first use so importing this module makes no AWS calls
+    return AWSSession.get_client('ssm')
+
+class ParameterCache:
+    """
+    Process-wide cache of decrypted parameters. Entries live for ttl_seconds,
+    so warm invocations read configuration without calling SSM; prefetch()
+    loads many names with batched GetParameters calls and refresh() forces a
+    reload, e.g. after a webhook is rotated.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl_seconds: float = ttl_seconds
+        self._clock = clock
+        # name -> (value, expires_at)
+        self._entries: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, name: str, now: float) -> Optional[str]:
+        entry = self._entries.get(name)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        return None
+
+    def _fetch(self, names: list[str]) -> None:
+        for start in range(0, len(names), GET_PARAMETERS_MAX_NAMES):
+            chunk = names[start:start + GET_PARAMETERS_MAX_NAMES]
+            with timed('ssm.get_parameters'):
+                response = get_client().get_parameters(Names=chunk, WithDecryption=True)
+            expires_at = self._clock() + self.ttl_seconds
+            with self._lock:
+                for parameter in response.get('Parameters', []):
+                    value = parameter['Value']
+                    self._entries[parameter['Name']] = (value, expires_at)
+                    # Callers may ask by ARN; GetParameters answers with the name
+                    if 'ARN' in parameter:
+                        self._entries[parameter['ARN']] = (value, expires_at)
+            for invalid in response.get('InvalidParameters', []):
+                print(f"SSM parameter not found: {invalid}")
+                # A deleted parameter must not keep serving its last cached value
+                with self._lock:
+                    self._entries.pop(invalid, None)
+        print(f"Retrieved {len(names)} parameters from SSM")
+
+    @handle_aws_error('SSM parameter prefetch')
+    def prefetch(self, names: Iterable[Optional[str]]) -> None:
+        """
+        Load every name that is not cached yet, in as few GetParameters calls as possible.
+        """
+        now = self._clock()
+        with self._lock:
+            missing = list(dict.fromkeys(name for name in names if name and self._fresh(name, now) is None))
+        if missing:
+            self._fetch(missing)
+
+    @handle_aws_error('SSM parameter retrieval')
+    def get(self, name: str) -> str:
+        """
+        Raises:
+            KeyError: If SSM does not know the parameter
+        """
+        now = self._clock()
+        with self._lock:
+            value = self._fresh(name, now)
+        if value is not None:
+            return value
+        self._fetch([name])
+        with self._lock:
+            # Only an entry the fetch just stored counts; an expired one means SSM did not return the name
+            value = self._fresh(name, now)
+        if value is None:
+            raise KeyError(f"SSM parameter {name} not found")
+        return value
+
+    def refresh(self, name: Optional[str] = None) -> None:
+        """
+        Forget one cached parameter, or all of them; the next read goes to SSM.
+        """
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+parameter_cache = ParameterCache(float(os.getenv('CONFIG_CACHE_TTL_SECONDS', DEFAULT_CACHE_TTL_SECONDS)))
 
-@handle_aws_error('SSM parameter retrieval')
 def retrieve_parameter(parameter: str) -> str:
-    response = ssm_client.get_parameter(Name=parameter, WithDecryption=True)
-    value = response['Parameter']['Value']
-    print(f"Retrieved parameter {parameter}")
-    return value
+    return parameter_cache.get(parameter)
+
+def prefetch_parameters(parameters: Iterable[Optional[str]]) -> None:
+    parameter_cache.prefetch(parameters)
@@ -0,0 +1,68 @@
+from typing import Optional
+from models.store import Store
+from notifications.subscriptions import Subscription
+from .aws_session import AWSSession, handle_aws_error
+
+# Constants
+SUBSCRIPTION_TABLE_NAME = 'SubscriptionTable'
+
+def get_table():
+    # Built on first use so importing this module makes no AWS calls
+    return AWSSession.get_table(SUBSCRIPTION_TABLE_NAME)
+
+@handle_aws_error('DynamoDB subscription scan')
+def scan_subscriptions() -> list[Subscription]:
+    print(f"Scanning DynamoDB subscription table {SUBSCRIPTION_TABLE_NAME}")
+    subscriptions: list[Subscription] = []
+    scan_kwargs: dict = {}
+    while True:
+        response = get_table().scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            subscription = subscription_from_dict(item)
+            if subscription is not None:
+                subscriptions.append(subscription)
+        last_key: Optional[dict] = response.get('LastEvaluatedKey')
+        if last_key is None:
+            break
+        scan_kwargs['ExclusiveStartKey'] = last_key
+    print(f"Loaded {len(subscriptions)} subscriptions from DynamoDB")
+    return subscriptions
+
+@handle_aws_error('DynamoDB subscription put')
+def put_subscription(subscription: Subscription) -> None:
+    get_table().put_item(Item=subscription_to_dict(subscription))
+
+def subscription_id(subscription: Subscription) -> str:
+    store_name = subscription.store.name if subscription.store is not None else '*'
+    return f"{subscription.subscriber_id}#{subscription.channel}#{store_name}"
+
+def subscription_to_dict(subscription: Subscription) -> dict:
+    item = {
+        'PartId': subscription.product_id,
+        'SubscriptionId': subscription_id(subscription),
+        'Subscriber': subscription.subscriber_id,
+        'Channel': subscription.channel
+    }
+    if subscription.store is not None:
+        item['StoreId'] = subscription.store.name
+    if subscription.max_price is not None:
+        item['MaxPrice'] = subscription.max_price
+    if subscription.priority != 1:
+        item['Priority'] = subscription.priority
+    return item
+
+def subscription_from_dict(unstructured_item: dict) -> Optional[Subscription]:
+    store_name = unstructured_item.get('StoreId')
+    if store_name is not None and store_name not in Store.__members__:
+        print(f"Skipping subscription with unknown store {store_name}")
+        return None
+    if 'PartId' not in unstructured_item or 'Channel' not in unstructured_item:
+        return None
+    return Subscription(
+        subscriber_id=unstructured_item.get('Subscriber', unstructured_item.get('SubscriptionId', '')),
+        channel=unstructured_item['Channel'],
+        product_id=unstructured_item['PartId'],
+        store=Store[store_name] if store_name is not None else None,
+        max_price=unstructured_item.get('MaxPrice'),
+        priority=int(unstructured_item.get('Priority', 1))
+    )
@@ -0,0 +1,89 @@
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any
+from models.store import Store
+
+# Catalog configuration
+CATALOG_SOURCE_FILE = 'file'
+CATALOG_SOURCE_DYNAMODB = 'dynamodb'
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'catalog.json')
+
+@dataclass
+class CatalogEntry:
+    """A tracked product and its page URL at each store that carries it."""
+    product_id: str
+    title: str
+    urls: dict[Store, str] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.product_id,
+            'title': self.title,
+            'urls': {store.name: url for store, url in self.urls.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CatalogEntry":
+        """
+        Build an entry from its serialized form.
+
+        Raises:
+            ValueError: If a required field is missing or a store is unknown
+        """
+        try:
+            urls = {Store[store_name]: url for store_name, url in (data.get('urls') or {}).items()}
+            return cls(product_id=data['id'], title=data.get('title', data['id']), urls=urls)
+        except KeyError as e:
+            raise ValueError(f"Invalid catalog entry {data}: missing or unknown {str(e)}") from e
+
+
+def parse_catalog(document: Any) -> list[CatalogEntry]:
+    """
+    Parse a catalog document of the form {"products": [{"id", "title", "urls": {STORE: url}}]}.
+
+    Raises:
+        ValueError: If the document is malformed
+    """
+    if not isinstance(document, dict) or not isinstance(document.get('products'), list):
+        raise ValueError("Catalog must be an object with a 'products' list")
+    return [CatalogEntry.from_dict(item) for item in document['products']]
+
+
+def load_catalog_file(path: str = DEFAULT_CATALOG_PATH) -> list[CatalogEntry]:
+    """
+    Load the catalog from a local JSON or YAML file.
+
+    Args:
+        path: File path; .yaml/.yml files need PyYAML
+
+    Returns:
+        List of catalog entries
+    """
+    with open(path, encoding='utf-8') as catalog_file:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("PyYAML is required to load a YAML catalog") from e
+            document = yaml.safe_load(catalog_file)
+        else:
+            document = json.load(catalog_file)
+    entries = parse_catalog(document)
+    print(f"Loaded {len(entries)} catalog entries from {path}")
+    return entries
+
+
+def load_catalog() -> list[CatalogEntry]:
+    """
+    Load the catalog from the source named by the CATALOG_SOURCE environment
+    variable: "file" (CATALOG_PATH, default catalog.json) or "dynamodb".
+    """
+    source = os.getenv('CATALOG_SOURCE', CATALOG_SOURCE_FILE).lower()
+    if source == CATALOG_SOURCE_DYNAMODB:
+        # Imported here so file-backed runs never touch DynamoDB
+        from aws_accessors import catalog_accessor
+        return catalog_accessor.scan_catalog()
+    if source == CATALOG_SOURCE_FILE:
+        return load_catalog_file(os.getenv('CATALOG_PATH', DEFAULT_CATALOG_PATH))
+    raise ValueError(f"Unknown CATALOG_SOURCE: {source}")
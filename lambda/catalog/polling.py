@@ -0,0 +1,399 @@
+import heapq
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Iterable, Optional, Protocol
+from catalog.catalog import CatalogEntry
+from models.product import Product
+from models.store import Store
+from observability.metrics import log_event
+from transitions.engine import StateKey, TransitionKind, state_key
+
+# Polling schedule configuration
+POLL_SCHEDULE_NONE = 'none'
+POLL_SCHEDULE_MEMORY = 'memory'
+POLL_SCHEDULE_DYNAMODB = 'dynamodb'
+HOURS_PER_DAY = 24
+# Transitions that count as the page having changed since the last check
+CHANGE_KINDS: frozenset[TransitionKind] = frozenset(
+    {TransitionKind.RESTOCK, TransitionKind.SOLD_OUT, TransitionKind.PRICE_CHANGE})
+
+# Returns the summed subscriber priority of a (product id, store) pair
+PriorityLookup = Callable[[str, Store], int]
+
+
+def hour_of_day(timestamp: int) -> int:
+    """UTC hour of an epoch timestamp."""
+    return (timestamp // 3600) % HOURS_PER_DAY
+
+
+@dataclass(frozen=True)
+class PollState:
+    """When one product at one store is next checked, and what earlier checks saw."""
+    part_id: str
+    store: Store
+    # Epoch seconds
+    next_check_at: int
+    # Adaptive interval before priority and restock hours are applied
+    interval_seconds: int
+    last_checked_at: int = 0
+    checks: int = 0
+    changes: int = 0
+    # Restocks seen in each UTC hour of the day
+    restock_hours: tuple[int, ...] = (0,) * HOURS_PER_DAY
+
+    @property
+    def key(self) -> StateKey:
+        return (self.part_id, self.store.name)
+
+    def to_dict(self) -> dict:
+        return {
+            'PartId': self.part_id,
+            'StoreId': self.store.name,
+            'NextCheckAt': self.next_check_at,
+            'IntervalSeconds': self.interval_seconds,
+            'LastCheckedAt': self.last_checked_at,
+            'Checks': self.checks,
+            'Changes': self.changes,
+            'RestockHours': list(self.restock_hours),
+        }
+
+    @classmethod
+    def from_dict(cls, item: dict) -> "PollState":
+        # DynamoDB hands numbers back as Decimal
+        hours = [int(count) for count in item.get('RestockHours') or []]
+        return cls(
+            part_id=item['PartId'],
+            store=Store[item['StoreId']],
+            next_check_at=int(item['NextCheckAt']),
+            interval_seconds=int(item['IntervalSeconds']),
+            last_checked_at=int(item.get('LastCheckedAt', 0)),
+            checks=int(item.get('Checks', 0)),
+            changes=int(item.get('Changes', 0)),
+            restock_hours=tuple(hours) if len(hours) == HOURS_PER_DAY else (0,) * HOURS_PER_DAY
+        )
+
+
+@dataclass(frozen=True)
+class PollingPolicy:
+    """
+    How check intervals adapt. A check that saw a change shrinks the interval
+    by change_factor and a quiet one stretches it by quiet_factor, within
+    [min_interval_seconds, max_interval_seconds]. Subscriber priority divides
+    the interval by sqrt(1 + priority), and a check is pulled forward to the
+    start of any hour of day that has held hot_hour_share of the product's
+    past restocks.
+    """
+    min_interval_seconds: int = 300
+    max_interval_seconds: int = 6 * 3600
+    initial_interval_seconds: int = 3600
+    change_factor: float = 0.25
+    quiet_factor: float = 1.5
+    hot_hour_share: float = 0.25
+    hot_hour_min_restocks: int = 2
+    # Failed, blocked and skipped checks are retried after this long, leaving the interval alone
+    retry_seconds: int = 900
+    # Selected items are pushed back this far until their result is recorded, so overlapping ticks skip them;
+    # longer than the Lambda timeout, so items of a run that timed out come back afterwards
+    lease_seconds: int = 900
+    # Most (product, store) pairs checked per tick; the earliest due go first
+    max_per_tick: int = 200
+
+    @classmethod
+    def from_env(cls) -> "PollingPolicy":
+        return cls(
+            min_interval_seconds=int(os.getenv('POLL_MIN_INTERVAL_SECONDS', '300')),
+            max_interval_seconds=int(os.getenv('POLL_MAX_INTERVAL_SECONDS', str(6 * 3600))),
+            initial_interval_seconds=int(os.getenv('POLL_INITIAL_INTERVAL_SECONDS', '3600')),
+            max_per_tick=int(os.getenv('POLL_MAX_PER_TICK', '200')),
+            lease_seconds=int(os.getenv('POLL_LEASE_SECONDS', '900'))
+        )
+
+    def initial_state(self, part_id: str, store: Store, now: int) -> PollState:
+        return PollState(part_id=part_id, store=store, next_check_at=now,
+                         interval_seconds=self.initial_interval_seconds)
+
+    def hot_hours(self, restock_hours: tuple[int, ...]) -> set[int]:
+        total = sum(restock_hours)
+        if total < self.hot_hour_min_restocks:
+            return set()
+        return {hour for hour, count in enumerate(restock_hours) if count and count / total >= self.hot_hour_share}
+
+    def next_check_at(self, now: int, interval_seconds: int, restock_hours: tuple[int, ...], priority: int) -> int:
+        """
+        Args:
+            now: Epoch seconds of the check
+            interval_seconds: Adaptive interval
+            restock_hours: Restocks seen per UTC hour
+            priority: Summed subscriber priority
+
+        Returns:
+            Epoch seconds of the next check
+        """
+        wait = max(self.min_interval_seconds, int(interval_seconds / math.sqrt(1 + max(priority, 0))))
+        hot = self.hot_hours(restock_hours)
+        if hour_of_day(now) in hot:
+            wait = self.min_interval_seconds
+        else:
+            hour_start = now - now % 3600 + 3600
+            while hour_start < now + wait:
+                if hour_of_day(hour_start) in hot:
+                    wait = max(self.min_interval_seconds, hour_start - now)
+                    break
+                hour_start += 3600
+        return now + wait
+
+    def observe(self, state: PollState, now: int, kind: TransitionKind, priority: int) -> PollState:
+        """
+        The state after a successful check classified as kind.
+        """
+        changed = kind in CHANGE_KINDS
+        interval = state.interval_seconds * (self.change_factor if changed else self.quiet_factor)
+        interval = int(min(self.max_interval_seconds, max(self.min_interval_seconds, interval)))
+        restock_hours = state.restock_hours
+        if kind == TransitionKind.RESTOCK:
+            hours = list(restock_hours)
+            hours[hour_of_day(now)] += 1
+            restock_hours = tuple(hours)
+        return replace(
+            state,
+            next_check_at=self.next_check_at(now, interval, restock_hours, priority),
+            interval_seconds=interval,
+            last_checked_at=now,
+            checks=state.checks + 1,
+            changes=state.changes + changed,
+            restock_hours=restock_hours
+        )
+
+    def retry(self, state: PollState, now: int) -> PollState:
+        """
+        The state after a check that made no observation.
+        """
+        return replace(state, next_check_at=now + self.retry_seconds, last_checked_at=now)
+
+
+class PollScheduleStore(Protocol):
+    """Persistent next-check times, queryable by due time."""
+
+    def due(self, now: int, limit: int) -> list[PollState]:
+        """At most limit states with next_check_at <= now, earliest first."""
+        ...
+
+    def get_many(self, keys: Iterable[StateKey]) -> dict[StateKey, PollState]:
+        ...
+
+    def put_many(self, states: Iterable[PollState]) -> None:
+        ...
+
+
+class InMemoryPollSchedule:
+    """
+    Schedule kept in process memory as a heap ordered by next check. Stale
+    heap entries left behind by updates are skipped when popped. Used locally
+    and in tests.
+    """
+
+    def __init__(self) -> None:
+        self.states: dict[StateKey, PollState] = {}
+        self._heap: list[tuple[int, StateKey]] = []
+        self._lock = threading.Lock()
+
+    def due(self, now: int, limit: int) -> list[PollState]:
+        with self._lock:
+            picked: list[PollState] = []
+            seen: set[StateKey] = set()
+            while self._heap and self._heap[0][0] <= now and len(picked) < limit:
+                next_check_at, key = heapq.heappop(self._heap)
+                state = self.states.get(key)
+                if state is not None and state.next_check_at == next_check_at and key not in seen:
+                    seen.add(key)
+                    picked.append(state)
+            # Due items stay scheduled until a put moves them
+            for state in picked:
+                heapq.heappush(self._heap, (state.next_check_at, state.key))
+            return picked
+
+    def get_many(self, keys: Iterable[StateKey]) -> dict[StateKey, PollState]:
+        with self._lock:
+            return {key: self.states[key] for key in keys if key in self.states}
+
+    def put_many(self, states: Iterable[PollState]) -> None:
+        with self._lock:
+            for state in states:
+                self.states[state.key] = state
+                heapq.heappush(self._heap, (state.next_check_at, state.key))
+            if len(self._heap) > 4 * len(self.states):
+                self._heap = [(state.next_check_at, key) for key, state in self.states.items()]
+                heapq.heapify(self._heap)
+
+
+class DynamoDBPollSchedule:
+    """Schedule in the PollScheduleTable, queried through its DueIndex."""
+
+    def __init__(self) -> None:
+        # Imported here so runs without a schedule never touch DynamoDB
+        from aws_accessors import poll_schedule_accessor
+        self._accessor = poll_schedule_accessor
+
+    def due(self, now: int, limit: int) -> list[PollState]:
+        return [PollState.from_dict(item) for item in self._accessor.query_due(now, limit)]
+
+    def get_many(self, keys: Iterable[StateKey]) -> dict[StateKey, PollState]:
+        states = (PollState.from_dict(item) for item in self._accessor.get_items(keys))
+        return {state.key: state for state in states}
+
+    def put_many(self, states: Iterable[PollState]) -> None:
+        self._accessor.put_items(state.to_dict() for state in states)
+
+
+class PollingScheduler:
+    """
+    Picks the (product, store) pairs that are due on each tick and
+    reschedules them from what their check saw. Pairs the schedule has never
+    seen are due at once.
+    """
+
+    def __init__(
+        self,
+        store: PollScheduleStore,
+        policy: PollingPolicy = PollingPolicy(),
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        self.store: PollScheduleStore = store
+        self.policy: PollingPolicy = policy
+        self._clock = clock
+        # Keys known to have a schedule item; warm invocations only look up newly catalogued pairs
+        self._known: set[StateKey] = set()
+
+    def _now(self) -> int:
+        return int(self._clock())
+
+    def select(self, entries: list[CatalogEntry]) -> list[CatalogEntry]:
+        """
+        Narrow the catalog to the pairs due now, at most max_per_tick of them,
+        and lease them so an overlapping tick does not check them too.
+
+        Args:
+            entries: Full catalog
+
+        Returns:
+            Catalog entries holding only their due stores
+        """
+        now = self._now()
+        catalogued: dict[StateKey, tuple[CatalogEntry, Store]] = {
+            (entry.product_id, store.name): (entry, store) for entry in entries for store in entry.urls
+        }
+        unknown = [key for key in catalogued if key not in self._known]
+        if unknown:
+            self._known.update(self.store.get_many(unknown))
+        new_keys = [key for key in catalogued if key not in self._known]
+
+        budget = self.policy.max_per_tick
+        selected: list[PollState] = [
+            self.policy.initial_state(catalogued[key][0].product_id, catalogued[key][1], now)
+            for key in new_keys[:budget]
+        ]
+        if len(selected) < budget:
+            selected += self._take_due(now, budget - len(selected), catalogued)
+
+        lease_until = now + self.policy.lease_seconds
+        self.store.put_many(replace(state, next_check_at=lease_until) for state in selected)
+        self._known.update(state.key for state in selected)
+
+        due_stores: dict[str, list[Store]] = {}
+        for state in selected:
+            due_stores.setdefault(state.part_id, []).append(state.store)
+        log_event('poll_schedule', catalogued=len(catalogued), new=len(new_keys), selected=len(selected))
+        return [
+            CatalogEntry(entry.product_id, entry.title, {store: entry.urls[store] for store in due_stores[entry.product_id]})
+            for entry in entries if entry.product_id in due_stores
+        ]
+
+    def _take_due(
+        self,
+        now: int,
+        limit: int,
+        catalogued: dict[StateKey, tuple[CatalogEntry, Store]]
+    ) -> list[PollState]:
+        """
+        Up to limit due states of catalogued pairs, earliest first. Items of
+        pairs dropped from the catalog are never checked, so they would stay
+        due and fill every page; they are parked for max_interval_seconds as
+        they are met and the query repeats until the budget is filled.
+        """
+        picked: list[PollState] = []
+        seen: set[StateKey] = set()
+        while len(picked) < limit:
+            requested = limit - len(picked) + len(seen)
+            page = self.store.due(now, requested)
+            # An index that has not caught up with a put can return items already handled
+            fresh = [state for state in page if state.key not in seen]
+            seen.update(state.key for state in fresh)
+            orphans = [state for state in fresh if state.key not in catalogued]
+            picked += [state for state in fresh if state.key in catalogued][:limit - len(picked)]
+            if orphans:
+                log_event('poll_schedule_parked', count=len(orphans))
+                park_until = now + self.policy.max_interval_seconds
+                self.store.put_many(replace(state, next_check_at=park_until) for state in orphans)
+            if not orphans or len(page) < requested:
+                break
+        return picked
+
+    def record(
+        self,
+        products: list[Product],
+        kinds: dict[StateKey, TransitionKind],
+        priority_for: PriorityLookup = lambda part_id, store: 0
+    ) -> None:
+        """
+        Reschedule every checked pair.
+
+        Args:
+            products: Every product resolved this tick, scraped or not
+            kinds: Transition of each scraped product
+            priority_for: Summed subscriber priority of a pair
+        """
+        now = self._now()
+        previous = self.store.get_many(state_key(product) for product in products)
+        states: list[PollState] = []
+        for product in products:
+            key = state_key(product)
+            state = previous.get(key) or self.policy.initial_state(product.id, product.store, now)
+            kind = kinds.get(key)
+            if not product.scraped or kind is None:
+                states.append(self.policy.retry(state, now))
+            else:
+                states.append(self.policy.observe(state, now, kind, priority_for(product.id, product.store)))
+        self.store.put_many(states)
+        self._known.update(state.key for state in states)
+        if states:
+            soonest = min(state.next_check_at for state in states) - now
+            log_event('poll_rescheduled', pairs=len(states), soonest_seconds=soonest)
+
+
+_polling_scheduler: Optional[PollingScheduler] = None
+
+
+def get_polling_scheduler() -> Optional[PollingScheduler]:
+    """
+    The process-wide scheduler over the schedule named by POLL_SCHEDULE:
+    "dynamodb", "memory", or "none" to check the whole catalog on every run.
+
+    Raises:
+        ValueError: If POLL_SCHEDULE is unknown
+    """
+    global _polling_scheduler
+    source = os.getenv('POLL_SCHEDULE', POLL_SCHEDULE_NONE).lower()
+    if source == POLL_SCHEDULE_NONE:
+        return None
+    if _polling_scheduler is None:
+        if source == POLL_SCHEDULE_DYNAMODB:
+            store: PollScheduleStore = DynamoDBPollSchedule()
+        elif source == POLL_SCHEDULE_MEMORY:
+            store = InMemoryPollSchedule()
+        else:
+            raise ValueError(f"Unknown POLL_SCHEDULE: {source}")
+        _polling_scheduler = PollingScheduler(store, PollingPolicy.from_env())
+    return _polling_scheduler
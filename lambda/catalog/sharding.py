@@ -0,0 +1,124 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Protocol
+from catalog.catalog import CatalogEntry
+
+# Sharding configuration
+DEFAULT_SHARD_SIZE = 50
+SHARD_EVENT_KEY = 'shard'
+
+@dataclass
+class Shard:
+    """One worker's slice of the catalog."""
+    index: int
+    count: int
+    entries: list[CatalogEntry]
+
+    def to_event(self) -> dict:
+        return {
+            SHARD_EVENT_KEY: {
+                'index': self.index,
+                'count': self.count,
+                'products': [entry.to_dict() for entry in self.entries]
+            }
+        }
+
+    @classmethod
+    def from_event(cls, event: dict) -> "Shard":
+        body = event[SHARD_EVENT_KEY]
+        return cls(
+            index=body['index'],
+            count=body['count'],
+            entries=[CatalogEntry.from_dict(item) for item in body['products']]
+        )
+
+
+def is_shard_event(event: Any) -> bool:
+    return isinstance(event, dict) and SHARD_EVENT_KEY in event
+
+
+def shard_catalog(entries: list[CatalogEntry], shard_size: int = DEFAULT_SHARD_SIZE) -> list[Shard]:
+    """
+    Split the catalog into contiguous chunks of at most shard_size entries.
+
+    Args:
+        entries: Catalog entries
+        shard_size: Maximum entries per shard
+
+    Returns:
+        List of shards
+    """
+    if shard_size < 1:
+        raise ValueError("shard_size must be at least 1")
+    chunks = [entries[start:start + shard_size] for start in range(0, len(entries), shard_size)]
+    return [Shard(index=index, count=len(chunks), entries=chunk) for index, chunk in enumerate(chunks)]
+
+
+class ShardQueue(Protocol):
+    """Delivers shard events to worker invocations."""
+
+    def send(self, event: dict) -> None:
+        ...
+
+
+class InProcessShardQueue:
+    """
+    Runs each shard in the current process. Used locally and in tests; pass a
+    worker such as handler.handle, or omit it to only record the events.
+    """
+
+    def __init__(self, worker: Optional[Callable[[dict, Any], Any]] = None) -> None:
+        self.worker = worker
+        self.sent: list[dict] = []
+
+    def send(self, event: dict) -> None:
+        self.sent.append(event)
+        if self.worker is not None:
+            self.worker(event, None)
+
+
+class LambdaShardQueue:
+    """Fans shards out as asynchronous invocations of a worker Lambda function."""
+
+    def __init__(self, function_name: str) -> None:
+        from aws_accessors.aws_session import AWSSession
+        self.function_name = function_name
+        self.lambda_client = AWSSession.get_client('lambda')
+
+    def send(self, event: dict) -> None:
+        self.lambda_client.invoke(
+            FunctionName=self.function_name,
+            InvocationType='Event',
+            Payload=json.dumps(event).encode('utf-8')
+        )
+
+
+def default_shard_queue() -> ShardQueue:
+    """
+    Fan out to SHARD_WORKER_FUNCTION (default: this function) when running in
+    Lambda, and in-process otherwise.
+    """
+    function_name = os.getenv('SHARD_WORKER_FUNCTION', os.getenv('AWS_LAMBDA_FUNCTION_NAME'))
+    if function_name:
+        return LambdaShardQueue(function_name)
+    return InProcessShardQueue()
+
+
+def fan_out(entries: list[CatalogEntry], queue: ShardQueue, shard_size: int = DEFAULT_SHARD_SIZE) -> list[Shard]:
+    """
+    Split the catalog and send one event per shard.
+
+    Args:
+        entries: Catalog entries
+        queue: Where to send shard events
+        shard_size: Maximum entries per shard
+
+    Returns:
+        The shards that were sent
+    """
+    shards = shard_catalog(entries, shard_size)
+    for shard in shards:
+        queue.send(shard.to_event())
+    print(f"Fanned out {len(entries)} catalog entries to {len(shards)} shards")
+    return shards
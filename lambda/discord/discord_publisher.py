@@ -1,16 +1,307 @@
-import requests
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
 from models.product import Product
+from observability.metrics import Outcome, timed
 
-def publish(webhook_url: str, product: Product) -> None:
-    payload = {
-        "embeds": [
-            {
-                "title": "Stock Alert!",
-                "description": str(product),
-                "url": product.url,
-                "color": 5763719
-            }
-        ]
+if TYPE_CHECKING:
+    import requests
+
+# Discord accepts at most 10 embeds per webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+EMBED_COLOR = 5763719
+REQUEST_TIMEOUT_SECONDS = 30
+MAX_RETRIES = 5
+# Webhooks allow roughly 5 requests per 2 seconds until headers tell us otherwise
+DEFAULT_BUCKET_CAPACITY = 5
+DEFAULT_BUCKET_REFILL_SECONDS = 2.0
+
+
+def build_embed(product: Product, title: str = "Stock Alert!") -> dict:
+    return {
+        "title": title,
+        "description": str(product),
+        "url": product.url,
+        "color": EMBED_COLOR
+    }
+
+
+def build_digest_embed(products: list[Product], max_lines: int = 25, title: Optional[str] = None) -> dict:
+    """
+    Summarize many alerts in one embed, one line per product.
+    """
+    lines = [f"[{product.name}]({product.url}) at {product.store.name}: ${product.price}" for product in products[:max_lines]]
+    if len(products) > max_lines:
+        lines.append(f"...and {len(products) - max_lines} more")
+    return {
+        "title": title or f"Stock Alert Digest: {len(products)} products in stock",
+        "description": "\n".join(lines),
+        "color": EMBED_COLOR
     }
-    response = requests.post(webhook_url, json=payload, timeout=30)
-    response.raise_for_status()
+
+
+def _header_number(headers, name: str) -> Optional[float]:
+    """
+    A numeric header, or None when it is missing or malformed.
+    """
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        print(f"Ignoring malformed Discord header {name}: {value!r}")
+        return None
+
+
+class TokenBucket:
+    """
+    Per-webhook token bucket. Refills continuously at capacity per
+    refill_seconds; Discord's X-RateLimit-* and Retry-After headers override
+    the local estimate whenever a response carries them.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_BUCKET_CAPACITY,
+                 refill_seconds: float = DEFAULT_BUCKET_REFILL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.capacity: float = capacity
+        self.refill_seconds: float = refill_seconds
+        self._clock = clock
+        self._tokens: float = capacity
+        self._updated: float = clock()
+        self._blocked_until: float = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        rate = self.capacity / self.refill_seconds
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0 when a token was taken, otherwise the seconds to wait before trying again
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) * self.refill_seconds / self.capacity
+
+    def acquire(self, sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Block until a token is available.
+        """
+        while True:
+            wait = self.reserve()
+            if wait <= 0:
+                return
+            sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        with self._lock:
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def update_from_headers(self, headers) -> None:
+        """
+        Adopt the server's view of the bucket from X-RateLimit-* headers.
+        """
+        limit = _header_number(headers, 'X-RateLimit-Limit')
+        remaining = _header_number(headers, 'X-RateLimit-Remaining')
+        reset_after = _header_number(headers, 'X-RateLimit-Reset-After')
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if limit is not None:
+                self.capacity = max(1, int(limit))
+            if reset_after is not None:
+                self.refill_seconds = max(reset_after, 0.001)
+            if remaining is not None:
+                self._tokens = min(self.capacity, remaining)
+                if self._tokens < 1 and reset_after is not None:
+                    self._blocked_until = max(self._blocked_until, now + reset_after)
+
+
+def _retry_after_seconds(response: "requests.Response") -> float:
+    header = _header_number(response.headers, 'Retry-After')
+    if header is not None:
+        return header
+    try:
+        body = response.json()
+        return float(body.get('retry_after', 1.0)) if isinstance(body, dict) else 1.0
+    except (TypeError, ValueError):
+        return 1.0
+
+
+class DiscordPublisher:
+    """
+    Sends product alerts to Discord webhooks over one keep-alive session,
+    packing up to 10 embeds into each message and pacing every webhook with
+    its own token bucket.
+    """
+
+    def __init__(self, session: Optional["requests.Session"] = None,
+                 sleep: Callable[[float], None] = time.sleep) -> None:
+        if session is None:
+            # requests is imported on first use to keep it off the cold-start path
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+        self._session: "requests.Session" = session
+        self._sleep = sleep
+        self._buckets: dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+    def bucket(self, webhook_url: str) -> TokenBucket:
+        with self._buckets_lock:
+            if webhook_url not in self._buckets:
+                self._buckets[webhook_url] = TokenBucket()
+            return self._buckets[webhook_url]
+
+    def _post(self, webhook_url: str, embeds: list[dict]) -> None:
+        bucket = self.bucket(webhook_url)
+        for _ in range(MAX_RETRIES + 1):
+            bucket.acquire(self._sleep)
+            with timed('discord.post') as span:
+                response = self._session.post(webhook_url, json={"embeds": embeds}, timeout=REQUEST_TIMEOUT_SECONDS)
+                span.bytes = len(response.request.body or b'')
+                if response.status_code == 429:
+                    span.outcome = Outcome.BLOCKED
+                elif response.status_code >= 400:
+                    span.outcome = Outcome.ERROR
+            bucket.update_from_headers(response.headers)
+            if response.status_code == 429:
+                retry_after = _retry_after_seconds(response)
+                print(f"Discord rate limited webhook, retrying in {retry_after:.2f}s")
+                bucket.block_for(retry_after)
+                continue
+            response.raise_for_status()
+            return
+        import requests
+        raise requests.HTTPError(f"Discord webhook still rate limited after {MAX_RETRIES} retries")
+
+    def send_embeds(self, webhook_url: str, embeds: list[dict]) -> int:
+        """
+        Send embeds in as few messages as possible.
+
+        Returns:
+            Number of webhook messages sent
+        """
+        messages = 0
+        for start in range(0, len(embeds), MAX_EMBEDS_PER_MESSAGE):
+            self._post(webhook_url, embeds[start:start + MAX_EMBEDS_PER_MESSAGE])
+            messages += 1
+        return messages
+
+    def publish_products(self, webhook_url: str, products: Iterable[Product]) -> int:
+        return self.send_embeds(webhook_url, [build_embed(product) for product in products])
+
+
+class BackgroundPublisher:
+    """
+    Drains alerts on a daemon thread so scraping never waits on Discord.
+    Whatever is queued when the thread wakes is grouped per webhook before
+    sending, so a restock wave becomes a few 10-embed messages.
+    """
+
+    def __init__(self, publisher: Optional[DiscordPublisher] = None) -> None:
+        self._publisher: DiscordPublisher = publisher or get_publisher()
+        self._queue: "queue.Queue[tuple[str, list[dict]]]" = queue.Queue()
+        self.errors: list[Exception] = []
+        self._thread = threading.Thread(target=self._run, name='discord-publisher', daemon=True)
+        self._thread.start()
+
+    def submit(self, webhook_url: str, products: Iterable[Product], title: str = "Stock Alert!") -> None:
+        embeds = [build_embed(product, title) for product in products]
+        if embeds:
+            self._queue.put((webhook_url, embeds))
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            grouped: dict[str, list[dict]] = {}
+            for webhook_url, embeds in batch:
+                grouped.setdefault(webhook_url, []).extend(embeds)
+            try:
+                for webhook_url, embeds in grouped.items():
+                    try:
+                        self._publisher.send_embeds(webhook_url, embeds)
+                    except Exception as e:
+                        # Any failure must leave the thread alive, or flush() would wait forever
+                        print(f"Failed to publish {len(embeds)} alerts to Discord: {str(e)}")
+                        self.errors.append(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self) -> list[Exception]:
+        """
+        Block until everything submitted so far has been sent or has failed.
+
+        Returns:
+            Errors raised since the previous flush
+        """
+        self._queue.join()
+        errors, self.errors = self.errors, []
+        return errors
+
+
+_publisher: Optional[DiscordPublisher] = None
+_background_publisher: Optional[BackgroundPublisher] = None
+_publisher_lock = threading.Lock()
+_background_publisher_lock = threading.Lock()
+
+
+def get_publisher() -> DiscordPublisher:
+    """
+    Return the process-wide publisher so warm invocations reuse its connections and rate-limit state.
+    """
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = DiscordPublisher()
+        return _publisher
+
+
+def get_background_publisher() -> BackgroundPublisher:
+    """
+    Return the process-wide background publisher, starting it on first use.
+    """
+    global _background_publisher
+    with _background_publisher_lock:
+        if _background_publisher is None:
+            _background_publisher = BackgroundPublisher()
+        return _background_publisher
+
+
+def flush_background_publisher() -> None:
+    """
+    Wait for queued alerts to be delivered; Lambda freezes the process once the handler returns.
+    """
+    with _background_publisher_lock:
+        publisher = _background_publisher
+    if publisher is not None:
+        publisher.flush()
+
+
+def publish(webhook_url: str, product: Product) -> None:
+    """
+    Send a single product alert synchronously.
+    """
+    get_publisher().publish_products(webhook_url, [product])
@@ -1,112 +1,297 @@
 import os
-from typing import List
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 
-from aws_accessors import dynamodb_accessor, ssm_accessor
-from discord.discord_publisher import publish as discord_publish
+from aws_accessors import dynamodb_accessor, price_history_accessor, ssm_accessor
+from aws_accessors.price_history_accessor import to_cents
+from catalog.catalog import CatalogEntry, load_catalog
+from catalog.polling import get_polling_scheduler
+from catalog.sharding import DEFAULT_SHARD_SIZE, Shard, default_shard_queue, fan_out, is_shard_event
+from discord.discord_publisher import flush_background_publisher, get_background_publisher
 from models.product import Product
-from models.store import Store
-from product_resolvers.amazon_resolver import AmazonResolver
-from product_resolvers.newegg_resolver import NeweggResolver
-
-# Product configuration
-PRODUCT_ID = "NVIDIA-RTX-3090TI-FE"
-PRODUCT_TITLE = "NVIDIA GeForce RTX 3090 TI Founders Edition"
-AMAZON_URL = "https://www.amazon.com/Nvidia-RTX-3090-TI-Founders/dp/B09X4JVZB5"
-NEWEGG_URL = "https://www.newegg.com/p/1FT-0004-007S1"
-
-def find_product_availability() -> List[Product]:
-    """
-    Finds the availability of a product across multiple retailers.
-    Returns a list of Product objects, one for each retailer.
-    """
-    products = []
-
-    # Check Amazon
-    amazon_resolver = AmazonResolver(
-        product_id=PRODUCT_ID,
-        product_url=AMAZON_URL,
-        product_title=PRODUCT_TITLE
-    )
-    products.append(amazon_resolver.resolve())
-
-    # Check Newegg
-    newegg_resolver = NeweggResolver(
-        product_id=PRODUCT_ID,
-        product_url=NEWEGG_URL,
-        product_title=PRODUCT_TITLE
-    )
-    products.append(newegg_resolver.resolve())
+from notifications.outbox import (
+    DEFAULT_CHANNEL,
+    EMBED_TITLES,
+    DigestPolicy,
+    NotificationKind,
+    OutboxDrainer,
+    make_notification,
+    outbox_store_from_env,
+)
+from notifications.subscriptions import SubscriptionIndex, load_subscription_index
+from observability.metrics import get_metrics, log_event, timed
+from observability.profiling import profile_invocation
+from product_resolvers.registry import resolvers_for_entries
+from transitions.engine import StateKey, TransitionKind, plan_transitions, rule_for, state_key
 
+def warm_browser_enabled() -> bool:
+    return os.getenv('WARM_BROWSER_ENABLED', 'false').lower() == 'true'
+
+if warm_browser_enabled():
+    # Launch Chromium during init; warm invocations reuse it after a health check
+    from product_resolvers.warm_browser import start_warm_browser
+    start_warm_browser()
+
+def find_product_availability(entries: List[CatalogEntry]) -> List[Product]:
+    """
+    Finds the availability of catalog products across multiple retailers.
+    Stores are resolved concurrently, over plain HTTP where possible and
+    otherwise on one shared browser, which WARM_BROWSER_ENABLED keeps
+    alive across invocations.
+    Returns a list of Product objects, one for each (product, retailer) pair.
+    """
+    # Playwright and requests load here rather than at import, keeping them off the cold-start path
+    from product_resolvers.http_fetcher import fetch_tier_tracker
+    from product_resolvers.circuit_breaker import get_breaker_board
+    from product_resolvers.politeness import get_politeness_scheduler
+    resolvers = resolvers_for_entries(entries)
+    if warm_browser_enabled():
+        from product_resolvers.warm_browser import resolve_on_warm_browser
+        products = resolve_on_warm_browser(resolvers)
+    else:
+        from product_resolvers.resolution_scheduler import resolve_concurrently
+        products = resolve_concurrently(resolvers)
+    log_event('fetch_tiers', by_store=fetch_tier_tracker.summary())
+    log_event('pacing', by_store=get_politeness_scheduler().summary())
+    open_stores = get_breaker_board().open_stores()
+    if open_stores:
+        log_event('circuit_open', stores=[store.name for store in open_stores])
     return products
 
-def publish_to_discord(products: List[Product]) -> None:
+def scraped_products(products: List[Product]) -> List[Product]:
+    """
+    Drops failed, blocked and skipped scrapes. They carry no observation, so
+    they must never be recorded or compared with the stored state.
+    """
+    unscraped = [product for product in products if not product.scraped]
+    if unscraped:
+        by_status = Counter(product.status.value for product in unscraped)
+        log_event('unscraped', count=len(unscraped), by_status=dict(by_status))
+    return [product for product in products if product.scraped]
+
+def resolve_channel_webhook(channel: str) -> str:
+    """
+    Maps a channel to its webhook URL. The default channel uses
+    DISCORD_WEBHOOK_URL_ARN; any other channel names the Parameter Store
+    parameter that holds its webhook.
+    """
+    if channel == DEFAULT_CHANNEL:
+        return ssm_accessor.retrieve_parameter(os.getenv('DISCORD_WEBHOOK_URL_ARN'))
+    return ssm_accessor.retrieve_parameter(channel)
+
+def publish_to_discord(products: List[Product], channel: str = DEFAULT_CHANNEL,
+                       kind: NotificationKind = NotificationKind.RESTOCK) -> None:
+    """
+    Queues in-stock products for one channel, titled for the kind of alert.
+    Delivery happens on a background thread in batched messages; handle()
+    waits for it before returning.
+    """
+    in_stock_products = [product for product in products if product.in_stock]
+    if not in_stock_products:
+        return
+    get_background_publisher().submit(resolve_channel_webhook(channel), in_stock_products, EMBED_TITLES[kind])
+
+def notify_restocks(restocks: List[Tuple[Product, Optional[Product]]], subscriptions: SubscriptionIndex) -> None:
+    """
+    Announces restocked products to every subscribed channel, given
+    (product, previous state) pairs. Alerts are recorded in the outbox when
+    one is configured, so they survive a timeout before delivery; otherwise
+    each channel gets one batched publish.
+    """
+    notify_subscribers(NotificationKind.RESTOCK, restocks, subscriptions)
+
+def notify_subscribers(kind: NotificationKind, changes: List[Tuple[Product, Optional[Product]]],
+                       subscriptions: SubscriptionIndex) -> None:
+    """
+    Announces (product, previous state) pairs of one kind to every subscribed channel.
+    """
+    if not changes:
+        return
+    previous_by_key = {(product.id, product.store): previous for product, previous in changes}
+    deliveries = subscriptions.deliveries(product for product, _ in changes)
+    outbox = outbox_store_from_env()
+    if outbox is None:
+        # One GetParameters call for every subscriber webhook not cached yet
+        ssm_accessor.prefetch_parameters(channel for channel in deliveries if channel != DEFAULT_CHANNEL)
+    for channel, products in deliveries.items():
+        if outbox is None:
+            publish_to_discord(products, channel, kind=kind)
+            continue
+        for product in products:
+            previous = previous_by_key[(product.id, product.store)]
+            if not outbox.enqueue(make_notification(kind, product, previous, channel)):
+                log_event('outbox_duplicate', kind=kind.value, part_id=product.id, store=product.store.name,
+                          channel=channel)
+
+def drain_outbox() -> None:
+    """
+    Delivers pending outbox notifications, including any left by an earlier run.
+    """
+    outbox = outbox_store_from_env()
+    if outbox is None:
+        return
+    OutboxDrainer(outbox, resolve_channel_webhook, digest=DigestPolicy.from_env()).drain()
+
+def record_price_history(products: List[Product]) -> bool:
+    """
+    Appends the observed prices to the price history. History is best effort:
+    a failure is logged and never holds back alerts or state writes.
+    Returns whether the history now includes these prices.
+    """
+    if os.getenv('PRICE_HISTORY_ENABLED', 'false').lower() != 'true':
+        return False
+    try:
+        price_history_accessor.record_prices(products)
+        return True
+    except Exception as e:
+        log_event('price_history_failed', count=len(products), error=str(e))
+        return False
+
+def notify_deals(products: List[Product], kinds: Dict[StateKey, TransitionKind],
+                 subscriptions: SubscriptionIndex) -> int:
     """
-    Publishes product information to Discord.
+    Announces in-stock products whose new price is a deal against their daily
+    price history. Only products whose price changed or that came back in
+    stock in this run are checked, so a standing deal is announced once.
+    Best effort like the history itself. Returns the number of deals found.
     """
-    # Retrieve webhook from Parameter Store
-    discord_webhook_url_arn = os.getenv('DISCORD_WEBHOOK_URL_ARN')
-    discord_webhook_url = ssm_accessor.retrieve_parameter(discord_webhook_url_arn)
+    changed = {state_key(product): product for product in products
+               if product.in_stock and product.price is not None
+               and kinds.get(state_key(product)) in (TransitionKind.PRICE_CHANGE, TransitionKind.RESTOCK)}
+    if not changed:
+        return 0
+    try:
+        # numpy is only imported once there is a price to analyse
+        from analytics.deals import find_deals, matrix_from_daily_rollups
+        keys = list(changed)
+        # The price just observed, not the day's lowest rollup, which may be a dip that has recovered
+        current = [to_cents(changed[key].price) for key in keys]
+        deals = find_deals(matrix_from_daily_rollups(keys), current=current)
+    except Exception as e:
+        log_event('deal_check_failed', count=len(changed), error=str(e))
+        return 0
+    for deal in deals:
+        log_event('deal', part_id=deal.part_id, store=deal.store_id, price_cents=deal.price_cents,
+                  median_cents=deal.median_cents, drop_pct=round(deal.drop_pct, 1), all_time_low=deal.all_time_low)
+    notify_subscribers(NotificationKind.DEAL, [(changed[(deal.part_id, deal.store_id)], None) for deal in deals],
+                       subscriptions)
+    return len(deals)
 
+def conditional_transition_kind(product: Product, transition: dynamodb_accessor.StateTransition) -> TransitionKind:
+    """
+    Classifies a conditional update the way the transition table would.
+    """
+    if not transition.changed:
+        return TransitionKind.UNCHANGED
+    if transition.restocked:
+        return TransitionKind.RESTOCK
+    return rule_for(product, transition.previous).kind
+
+def record_conditional_transitions(products: List[Product],
+                                   subscriptions: SubscriptionIndex) -> Dict[StateKey, TransitionKind]:
+    """
+    Records each product with a single conditional UpdateItem and publishes
+    products that came back in stock, without reading prior state first.
+    Returns the transition of each product.
+    """
+    restocks: List[Tuple[Product, Optional[Product]]] = []
+    kinds: Dict[StateKey, TransitionKind] = {}
     for product in products:
-        if product.in_stock:
-            message = (
-                f"🎮 **{product.title}**\n"
-                f"💰 Price: ${product.price:.2f}\n"
-                f"🏪 Store: {product.store}\n"
-                f"🔗 {product.url}"
-            )
-            discord_publish(discord_webhook_url, message)
+        transition = dynamodb_accessor.record_transition(product)
+        kinds[state_key(product)] = conditional_transition_kind(product, transition)
+        if not transition.changed:
+            continue
+        if transition.price_dropped:
+            log_event('price_drop', part_id=product.id, store=product.store.name,
+                      previous_price=transition.previous.price, price=product.price)
+        if transition.restocked:
+            log_event('restock', part_id=product.id, store=product.store.name)
+            restocks.append((product, transition.previous))
+    # Unchanged products are only counted, as on the read-then-write path
+    log_event('transitions', counts=dict(Counter(kind.value for kind in kinds.values())))
+    notify_restocks(restocks, subscriptions)
+    return kinds
+
+def compare_and_record(products: List[Product], subscriptions: SubscriptionIndex) -> Dict[StateKey, TransitionKind]:
+    """
+    Reads the prior state of every product, classifies each one against it
+    with the transition table, then saves changes and publishes products
+    that came back in stock. Returns the transition of each product.
+    """
+    # Load all prior state in one batched read before comparing
+    previous_products = dynamodb_accessor.batch_get_items(state_key(product) for product in products)
+    plan = plan_transitions(products, previous_products)
+    log_event('transitions', counts={kind.value: count for kind, count in plan.counts().items()})
+
+    # Changed states are written in the background and flushed once every alert is recorded
+    write_buffer = dynamodb_accessor.WriteBuffer(previous_products)
+    for product in plan.writes:
+        write_buffer.add(product)
+
+    # Alerts are recorded before the new state so a timeout in between cannot lose them
+    notify_restocks(plan.restocks, subscriptions)
+    write_buffer.flush()
+    return {state_key(transition.product): transition.kind for transition in plan.transitions}
 
 def handle(event, context):
     """
     Entry point for the Lambda function.
+    Times the whole invocation, optionally profiles it (PROFILE_INVOCATION),
+    and writes the phase metrics collected along the way before returning.
     """
-    products = find_product_availability()
-    previous_amazon = dynamodb_accessor.query_item(PRODUCT_ID, Store.AMAZON.name)
-    previous_newegg = dynamodb_accessor.query_item(PRODUCT_ID, Store.NEWEGG.name)
+    with profile_invocation():
+        try:
+            with timed('invocation'):
+                process_event(event)
+        finally:
+            get_metrics().flush()
 
-    for product in products:
-        if product.store == Store.AMAZON.name:
-            if previous_amazon is None:
-                print("First run for this product on Amazon - save to DynamoDB")
-                dynamodb_accessor.put_item(product)
-                # Only publish if product is in stock
-                if product.in_stock:
-                    publish_to_discord([product])
-                    print("Case 2: Product is initially in stock on Amazon. Published to Discord")
-                else:
-                    print("Case 1: Product is initially out of stock on Amazon. Do not publish to Discord")
-            else:
-                if product.in_stock and not previous_amazon.in_stock:
-                    print("Case 6: Product was previously out of stock on Amazon. Save to DB and publish to Discord")
-                    dynamodb_accessor.put_item(product)
-                    publish_to_discord([product])
-                elif product.in_stock and previous_amazon.in_stock:
-                    print("Case 3: Product was already in stock on Amazon. Do not save to DB or publish")
-                elif not product.in_stock and previous_amazon.in_stock:
-                    print("Case 4: Product was previously in stock on Amazon. Save to DB, do not publish.")
-                    dynamodb_accessor.put_item(product)
-                else:
-                    print("Case 5: Product was already out of stock on Amazon. Do not save to DB or publish")
-        elif product.store == Store.NEWEGG.name:
-            if previous_newegg is None:
-                print("First run for this product on Newegg - save to DynamoDB")
-                dynamodb_accessor.put_item(product)
-                # Only publish if product is in stock
-                if product.in_stock:
-                    publish_to_discord([product])
-                    print("Case 2: Product is initially in stock on Newegg. Published to Discord")
-                else:
-                    print("Case 1: Product is initially out of stock on Newegg. Do not publish to Discord")
-            else:
-                if product.in_stock and not previous_newegg.in_stock:
-                    print("Case 6: Product was previously out of stock on Newegg. Save to DB and publish to Discord")
-                    dynamodb_accessor.put_item(product)
-                    publish_to_discord([product])
-                elif product.in_stock and previous_newegg.in_stock:
-                    print("Case 3: Product was already in stock on Newegg. Do not save to DB or publish")
-                elif not product.in_stock and previous_newegg.in_stock:
-                    print("Case 4: Product was previously in stock on Newegg. Save to DB, do not publish.")
-                    dynamodb_accessor.put_item(product)
-                else:
-                    print("Case 5: Product was already out of stock on Newegg. Do not save to DB or publish")
+def process_event(event) -> None:
+    """
+    A scheduled event loads the catalog. With POLL_SCHEDULE set, only the
+    (product, store) pairs that are due are kept, and each is rescheduled
+    from what its check saw. When FAN_OUT_ENABLED is set and the catalog is
+    larger than SHARD_SIZE, it is split into shards that are sent to worker
+    invocations; a shard event processes only its own entries.
+    """
+    # Served from the warm cache after the first invocation
+    ssm_accessor.prefetch_parameters([os.getenv('DISCORD_WEBHOOK_URL_ARN')])
+    scheduler = get_polling_scheduler()
+
+    if is_shard_event(event):
+        shard = Shard.from_event(event)
+        log_event('shard', index=shard.index, count=shard.count, entries=len(shard.entries))
+        entries = shard.entries
+    else:
+        entries = load_catalog()
+        if scheduler is not None:
+            entries = scheduler.select(entries)
+            if not entries:
+                log_event('nothing_due')
+                drain_outbox()
+                flush_background_publisher()
+                return
+        shard_size = int(os.getenv('SHARD_SIZE', DEFAULT_SHARD_SIZE))
+        if os.getenv('FAN_OUT_ENABLED', 'false').lower() == 'true' and len(entries) > shard_size:
+            fan_out(entries, default_shard_queue(), shard_size)
+            return
+
+    resolved = find_product_availability(entries)
+    products = scraped_products(resolved)
+    # Loaded once: it routes the restock alerts and sets each product's polling priority
+    subscriptions = load_subscription_index()
+
+    if os.getenv('STATE_WRITE_MODE', 'batch').lower() == 'conditional':
+        kinds = record_conditional_transitions(products, subscriptions)
+    else:
+        kinds = compare_and_record(products, subscriptions)
+    if scheduler is not None:
+        scheduler.record(resolved, kinds, subscriptions.priority_for)
+
+    drain_outbox()
+    flush_background_publisher()
+    # After alerting, so history writes add no latency to restock alerts
+    if record_price_history(products) and os.getenv('DEAL_ALERTS_ENABLED', 'false').lower() == 'true':
+        if notify_deals(products, kinds, subscriptions):
+            drain_outbox()
+            flush_background_publisher()
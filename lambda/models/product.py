@@ -1,7 +1,19 @@
 from dataclasses import dataclass
 from decimal import Decimal
+from enum import Enum
+from typing import Optional
 from models.store import Store
 
+class ScrapeStatus(str, Enum):
+    """Outcome of reading one product page."""
+    OK = "OK"
+    # Timed out, failed to load, or the page did not yield a trustworthy stock state
+    FAILED = "FAILED"
+    # The retailer rate limited us or served a bot check
+    BLOCKED = "BLOCKED"
+    # Not attempted because the store's or URL's circuit breaker was open
+    SKIPPED = "SKIPPED"
+
 @dataclass
 class Product:
     id: str
@@ -10,6 +22,13 @@ class Product:
     url: str
     store: Store
     in_stock: bool
+    currency: Optional[str] = None
+    # Anything but OK means price and in_stock are placeholders, not observations
+    status: ScrapeStatus = ScrapeStatus.OK
+
+    @property
+    def scraped(self) -> bool:
+        return self.status == ScrapeStatus.OK
 
     def __str__(self) -> str:
         status = "IN STOCK" if self.in_stock else "OUT OF STOCK"
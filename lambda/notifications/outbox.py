@@ -0,0 +1,339 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from enum import Enum
+from typing import Callable, Optional, Protocol
+from discord.discord_publisher import DiscordPublisher, build_digest_embed, build_embed, get_publisher
+from models.product import Product
+from models.store import Store
+from observability.metrics import log_event
+
+# Outbox configuration
+OUTBOX_STORE_NONE = 'none'
+OUTBOX_STORE_MEMORY = 'memory'
+OUTBOX_STORE_DYNAMODB = 'dynamodb'
+# Channel used when a notification has no explicit destination
+DEFAULT_CHANNEL = 'default'
+DEFAULT_LEASE_SECONDS = 120
+
+
+class NotificationKind(str, Enum):
+    """Why a notification was raised."""
+    RESTOCK = "RESTOCK"
+    # Price well below its recent history; see analytics.deals
+    DEAL = "DEAL"
+
+
+EMBED_TITLES: dict[NotificationKind, str] = {
+    NotificationKind.RESTOCK: "Stock Alert!",
+    NotificationKind.DEAL: "Deal Alert!",
+}
+# Formatted with the number of products in the digest
+DIGEST_TITLES: dict[NotificationKind, str] = {
+    NotificationKind.RESTOCK: "Stock Alert Digest: {count} products in stock",
+    NotificationKind.DEAL: "Deal Alert Digest: {count} products below their usual price",
+}
+
+
+def _product_to_payload(product: Product) -> dict:
+    return {
+        'PartId': product.id,
+        'StoreId': product.store.name,
+        'Name': product.name,
+        # Stored as text so it round-trips through DynamoDB and JSON unchanged
+        'Price': str(product.price) if product.price is not None else None,
+        'Url': product.url,
+        'InStock': product.in_stock
+    }
+
+
+def _product_from_payload(payload: dict) -> Product:
+    return Product(
+        id=payload['PartId'],
+        store=Store(payload['StoreId']),
+        name=payload['Name'],
+        price=Decimal(payload['Price']) if payload.get('Price') is not None else None,
+        url=payload['Url'],
+        in_stock=payload['InStock']
+    )
+
+
+def notification_id(kind: NotificationKind, product: Product, previous: Optional[Product], channel: str) -> str:
+    """
+    Deterministic id of a state transition. A run that is retried before its
+    state write lands computes the same id, so the notification is stored once.
+    The id repeats when the same transition happens again later, so stores only
+    deduplicate against records that are still pending.
+    """
+    previous_state = None if previous is None else [str(previous.price), previous.in_stock]
+    key = json.dumps([kind.value, channel, product.id, product.store.name,
+                      previous_state, [str(product.price), product.in_stock]])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class NotificationRecord:
+    notification_id: str
+    channel: str
+    kind: NotificationKind
+    product: Product
+    # Epoch seconds
+    created_at: int
+
+    def to_dict(self) -> dict:
+        return {
+            'NotificationId': self.notification_id,
+            'Channel': self.channel,
+            'PendingChannel': self.channel,
+            'Kind': self.kind.value,
+            'Product': _product_to_payload(self.product),
+            'CreatedAt': self.created_at
+        }
+
+    @classmethod
+    def from_dict(cls, item: dict) -> "NotificationRecord":
+        return cls(
+            notification_id=item['NotificationId'],
+            channel=item['Channel'],
+            kind=NotificationKind(item['Kind']),
+            product=_product_from_payload(item['Product']),
+            created_at=int(item['CreatedAt'])
+        )
+
+
+def make_notification(
+    kind: NotificationKind,
+    product: Product,
+    previous: Optional[Product],
+    channel: str = DEFAULT_CHANNEL,
+    now: Optional[int] = None
+) -> NotificationRecord:
+    return NotificationRecord(
+        notification_id=notification_id(kind, product, previous, channel),
+        channel=channel,
+        kind=kind,
+        product=product,
+        created_at=int(time.time()) if now is None else now
+    )
+
+
+class OutboxStore(Protocol):
+    """Durable storage for notifications that have not been delivered yet."""
+
+    def enqueue(self, record: NotificationRecord) -> bool:
+        """Store a record; False if one with the same id is still pending. A sent record with the id is replaced."""
+        ...
+
+    def pending(self) -> list[NotificationRecord]:
+        ...
+
+    def claim(self, record_id: str, lease_until: int, now: int) -> bool:
+        """Lease a pending record; False if it was sent or is leased elsewhere."""
+        ...
+
+    def mark_sent(self, record_id: str, now: int) -> None:
+        ...
+
+    def release(self, record_id: str) -> None:
+        ...
+
+
+class InMemoryOutboxStore:
+    """Outbox kept in process memory. Used locally and in tests."""
+
+    def __init__(self) -> None:
+        self.records: dict[str, NotificationRecord] = {}
+        self.sent: dict[str, int] = {}
+        self._leases: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, record: NotificationRecord) -> bool:
+        with self._lock:
+            if record.notification_id in self.records and record.notification_id not in self.sent:
+                return False
+            self.records[record.notification_id] = record
+            self.sent.pop(record.notification_id, None)
+            return True
+
+    def pending(self) -> list[NotificationRecord]:
+        with self._lock:
+            return [record for record_id, record in self.records.items() if record_id not in self.sent]
+
+    def claim(self, record_id: str, lease_until: int, now: int) -> bool:
+        with self._lock:
+            if record_id in self.sent or self._leases.get(record_id, 0) >= now:
+                return False
+            self._leases[record_id] = lease_until
+            return True
+
+    def mark_sent(self, record_id: str, now: int) -> None:
+        with self._lock:
+            self.sent[record_id] = now
+            self._leases.pop(record_id, None)
+
+    def release(self, record_id: str) -> None:
+        with self._lock:
+            self._leases.pop(record_id, None)
+
+
+class DynamoDBOutboxStore:
+    """Outbox in the OutboxTable, shared by every invocation."""
+
+    def __init__(self) -> None:
+        # Imported here so runs without an outbox never touch DynamoDB
+        from aws_accessors import outbox_accessor
+        self._accessor = outbox_accessor
+
+    def enqueue(self, record: NotificationRecord) -> bool:
+        return self._accessor.put_record(record.to_dict())
+
+    def pending(self) -> list[NotificationRecord]:
+        return [NotificationRecord.from_dict(item) for item in self._accessor.scan_pending()]
+
+    def claim(self, record_id: str, lease_until: int, now: int) -> bool:
+        return self._accessor.claim(record_id, lease_until, now)
+
+    def mark_sent(self, record_id: str, now: int) -> None:
+        self._accessor.mark_sent(record_id, now)
+
+    def release(self, record_id: str) -> None:
+        self._accessor.release(record_id)
+
+
+@dataclass(frozen=True)
+class DigestPolicy:
+    """
+    How pending notifications for one channel are coalesced. Records wait
+    until the oldest one is window_seconds old; min_items or more are then
+    sent as a single summary instead of one embed each.
+    """
+    window_seconds: int = 0
+    min_items: int = 5
+    max_lines: int = 25
+
+    @classmethod
+    def from_env(cls) -> "DigestPolicy":
+        return cls(
+            window_seconds=int(os.getenv('DIGEST_WINDOW_SECONDS', '0')),
+            min_items=int(os.getenv('DIGEST_MIN_ITEMS', '5'))
+        )
+
+
+@dataclass
+class DrainResult:
+    # Notifications delivered
+    sent: int = 0
+    # Summary messages used to deliver them
+    digests: int = 0
+    # Notifications held back by a digest window
+    deferred: int = 0
+    failed: int = 0
+    channels: list[str] = field(default_factory=list)
+
+
+class OutboxDrainer:
+    """
+    Delivers pending notifications. Records are leased before sending and
+    marked sent afterwards, so concurrent drainers never send the same record
+    twice and a crash leaves it pending for the next drain. A crash between
+    sending and marking can still repeat that one message.
+    """
+
+    def __init__(
+        self,
+        store: OutboxStore,
+        resolve_webhook: Callable[[str], str],
+        publisher: Optional[DiscordPublisher] = None,
+        digest: DigestPolicy = DigestPolicy(),
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        """
+        Args:
+            store: Where notifications are kept
+            resolve_webhook: Maps a channel to its webhook URL
+            publisher: Discord publisher; the process-wide one when omitted
+            digest: Coalescing policy
+            lease_seconds: How long a claimed record is reserved for this drainer
+            clock: Returns epoch seconds
+        """
+        self.store = store
+        self.resolve_webhook = resolve_webhook
+        self.publisher = publisher or get_publisher()
+        self.digest = digest
+        self.lease_seconds = lease_seconds
+        self.clock = clock
+
+    def drain(self) -> DrainResult:
+        now = int(self.clock())
+        result = DrainResult()
+        by_channel: dict[str, list[NotificationRecord]] = {}
+        for record in self.store.pending():
+            by_channel.setdefault(record.channel, []).append(record)
+
+        for channel, records in by_channel.items():
+            records.sort(key=lambda record: record.created_at)
+            if now - records[0].created_at < self.digest.window_seconds:
+                result.deferred += len(records)
+                continue
+            claimed = [record for record in records
+                       if self.store.claim(record.notification_id, now + self.lease_seconds, now)]
+            if not claimed:
+                continue
+            self._deliver(channel, claimed, now, result)
+        log_event('outbox_drained', sent=result.sent, digests=result.digests, deferred=result.deferred,
+                  failed=result.failed)
+        return result
+
+    def _deliver(self, channel: str, records: list[NotificationRecord], now: int, result: DrainResult) -> None:
+        by_kind: dict[NotificationKind, list[Product]] = {}
+        for record in records:
+            by_kind.setdefault(record.kind, []).append(record.product)
+        # Each kind gets its own digest, so a summary never calls deals restocks
+        embeds: list[dict] = []
+        digests = 0
+        for kind, products in by_kind.items():
+            if len(products) >= self.digest.min_items:
+                title = DIGEST_TITLES[kind].format(count=len(products))
+                embeds.append(build_digest_embed(products, self.digest.max_lines, title))
+                digests += 1
+            else:
+                embeds.extend(build_embed(product, EMBED_TITLES[kind]) for product in products)
+        try:
+            self.publisher.send_embeds(self.resolve_webhook(channel), embeds)
+        except Exception as e:
+            # Released rather than left leased, so the next drain retries them at once
+            log_event('outbox_delivery_failed', channel=channel, count=len(records), error=str(e))
+            for record in records:
+                self.store.release(record.notification_id)
+            result.failed += len(records)
+            return
+        for record in records:
+            self.store.mark_sent(record.notification_id, now)
+        result.sent += len(records)
+        result.digests += digests
+        result.channels.append(channel)
+
+
+_memory_store: Optional[InMemoryOutboxStore] = None
+
+
+def outbox_store_from_env() -> Optional[OutboxStore]:
+    """
+    The outbox named by OUTBOX_STORE: "dynamodb", "memory", or "none" to publish directly.
+    """
+    global _memory_store
+    source = os.getenv('OUTBOX_STORE', OUTBOX_STORE_NONE).lower()
+    if source == OUTBOX_STORE_NONE:
+        return None
+    if source == OUTBOX_STORE_DYNAMODB:
+        return DynamoDBOutboxStore()
+    if source == OUTBOX_STORE_MEMORY:
+        if _memory_store is None:
+            _memory_store = InMemoryOutboxStore()
+        return _memory_store
+    raise ValueError(f"Unknown OUTBOX_STORE: {source}")
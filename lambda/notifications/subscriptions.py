@@ -0,0 +1,189 @@
+import json
+import os
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Iterable, Optional
+from models.product import Product
+from models.store import Store
+from notifications.outbox import DEFAULT_CHANNEL
+
+# Subscription configuration
+SUBSCRIPTION_SOURCE_NONE = 'none'
+SUBSCRIPTION_SOURCE_FILE = 'file'
+SUBSCRIPTION_SOURCE_DYNAMODB = 'dynamodb'
+DEFAULT_SUBSCRIPTIONS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'subscriptions.json')
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """One subscriber's interest in a product."""
+    subscriber_id: str
+    # Outbox channel: the SSM parameter holding the webhook URL, or "default"
+    channel: str
+    product_id: str
+    # None watches every store
+    store: Optional[Store] = None
+    # Only alert at or below this price; None alerts at any price
+    max_price: Optional[Decimal] = None
+    # Weight of this subscriber when deciding how often the product is polled
+    priority: int = 1
+
+    def accepts(self, product: Product) -> bool:
+        if self.store is not None and product.store != self.store:
+            return False
+        if self.max_price is None:
+            return True
+        return product.price is not None and Decimal(str(product.price)) <= self.max_price
+
+    def to_dict(self) -> dict:
+        item: dict = {'subscriber': self.subscriber_id, 'channel': self.channel, 'product': self.product_id}
+        if self.store is not None:
+            item['store'] = self.store.name
+        if self.max_price is not None:
+            item['max_price'] = str(self.max_price)
+        if self.priority != 1:
+            item['priority'] = self.priority
+        return item
+
+    @classmethod
+    def from_dict(cls, item: dict) -> "Subscription":
+        """
+        Raises:
+            ValueError: If a field is missing or the store is unknown
+        """
+        try:
+            store_name = item.get('store')
+            if store_name is not None and store_name not in Store.__members__:
+                raise ValueError(f"Unknown store {store_name}")
+            max_price = item.get('max_price')
+            return cls(
+                subscriber_id=str(item['subscriber']),
+                channel=str(item.get('channel', DEFAULT_CHANNEL)),
+                product_id=str(item['product']),
+                store=Store[store_name] if store_name is not None else None,
+                max_price=Decimal(str(max_price)) if max_price is not None else None,
+                priority=int(item.get('priority', 1))
+            )
+        except KeyError as e:
+            raise ValueError(f"Subscription is missing {e}") from e
+
+
+class SubscriptionIndex:
+    """
+    Subscriptions indexed by (product_id, store), with None as the store for
+    subscriptions that watch every store. Looking up a product costs two
+    dictionary reads regardless of how many subscriptions exist.
+    """
+
+    def __init__(self, subscriptions: Iterable[Subscription] = (), fallback_channel: Optional[str] = None) -> None:
+        """
+        Args:
+            subscriptions: Initial subscriptions
+            fallback_channel: Channel for products nobody subscribed to; None drops them
+        """
+        self._by_key: dict[tuple[str, Optional[Store]], list[Subscription]] = {}
+        self.fallback_channel: Optional[str] = fallback_channel
+        for subscription in subscriptions:
+            self.add(subscription)
+
+    def add(self, subscription: Subscription) -> None:
+        self._by_key.setdefault((subscription.product_id, subscription.store), []).append(subscription)
+
+    def __len__(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._by_key.values())
+
+    def subscriptions_for(self, product: Product) -> list[Subscription]:
+        candidates = self._by_key.get((product.id, product.store), []) + self._by_key.get((product.id, None), [])
+        return [subscription for subscription in candidates if subscription.accepts(product)]
+
+    def priority_for(self, product_id: str, store: Store) -> int:
+        """
+        Summed priority of every subscription watching a product at a store; 0 when nobody does.
+        """
+        candidates = self._by_key.get((product_id, store), []) + self._by_key.get((product_id, None), [])
+        return sum(subscription.priority for subscription in candidates)
+
+    def channels_for(self, product: Product) -> list[str]:
+        channels = list(dict.fromkeys(subscription.channel for subscription in self.subscriptions_for(product)))
+        if not channels and self.fallback_channel is not None and not self._watched(product):
+            return [self.fallback_channel]
+        return channels
+
+    def _watched(self, product: Product) -> bool:
+        return (product.id, product.store) in self._by_key or (product.id, None) in self._by_key
+
+    def deliveries(self, products: Iterable[Product]) -> dict[str, list[Product]]:
+        """
+        Group a batch of changed products by destination channel. Each channel
+        gets every product once however many of its subscribers match, so
+        delivery costs one batched send per channel.
+
+        Args:
+            products: Products whose state change should be announced
+
+        Returns:
+            Products to announce, keyed by channel
+        """
+        grouped: dict[str, list[Product]] = {}
+        for product in products:
+            for channel in self.channels_for(product):
+                grouped.setdefault(channel, []).append(product)
+        return grouped
+
+
+def parse_subscriptions(document: Any) -> list[Subscription]:
+    """
+    Parse a subscription document: {"subscriptions": [{"subscriber": ...,
+    "channel": ..., "product": ..., "store": ..., "max_price": ..., "priority": ...}]}.
+    Invalid entries are skipped.
+    """
+    items = document.get('subscriptions', []) if isinstance(document, dict) else document
+    subscriptions: list[Subscription] = []
+    for item in items or []:
+        try:
+            subscriptions.append(Subscription.from_dict(item))
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Skipping invalid subscription {item}: {str(e)}")
+    return subscriptions
+
+
+def load_subscriptions_file(path: str) -> list[Subscription]:
+    """
+    Read subscriptions from a JSON or YAML file.
+
+    Args:
+        path: Path to a .json, .yaml or .yml file
+
+    Returns:
+        List of subscriptions
+    """
+    with open(path, encoding='utf-8') as subscriptions_file:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("PyYAML is required to load YAML subscriptions") from e
+            document = yaml.safe_load(subscriptions_file)
+        else:
+            document = json.load(subscriptions_file)
+    subscriptions = parse_subscriptions(document)
+    print(f"Loaded {len(subscriptions)} subscriptions from {path}")
+    return subscriptions
+
+
+def load_subscription_index() -> SubscriptionIndex:
+    """
+    Build the index from the source named by SUBSCRIPTION_SOURCE: "none"
+    (every alert goes to the default channel), "file" (SUBSCRIPTIONS_PATH,
+    default subscriptions.json) or "dynamodb".
+    """
+    source = os.getenv('SUBSCRIPTION_SOURCE', SUBSCRIPTION_SOURCE_NONE).lower()
+    if source == SUBSCRIPTION_SOURCE_NONE:
+        return SubscriptionIndex(fallback_channel=DEFAULT_CHANNEL)
+    if source == SUBSCRIPTION_SOURCE_FILE:
+        return SubscriptionIndex(load_subscriptions_file(os.getenv('SUBSCRIPTIONS_PATH', DEFAULT_SUBSCRIPTIONS_PATH)))
+    if source == SUBSCRIPTION_SOURCE_DYNAMODB:
+        # Imported here so runs without subscriptions never touch DynamoDB
+        from aws_accessors import subscription_accessor
+        return SubscriptionIndex(subscription_accessor.scan_subscriptions())
+    raise ValueError(f"Unknown SUBSCRIPTION_SOURCE: {source}")
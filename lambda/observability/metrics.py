@@ -0,0 +1,300 @@
+import asyncio
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Optional, Union
+from models.product import ScrapeStatus
+from models.store import Store
+
+DEFAULT_NAMESPACE = 'PcPartsScraper'
+# Store dimension for phases that are not tied to one retailer
+ALL_STORES = 'ALL'
+# CloudWatch reads at most 100 values per metric from one EMF document
+EMF_MAX_VALUES = 100
+# Upper bounds, in milliseconds, of the latency histogram in the summary log
+HISTOGRAM_BUCKETS_MS: tuple[float, ...] = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class Outcome(str, Enum):
+    SUCCESS = "SUCCESS"
+    ERROR = "ERROR"
+    TIMEOUT = "TIMEOUT"
+    # The remote side rate limited us or served a bot check
+    BLOCKED = "BLOCKED"
+    # An open circuit breaker meant nothing was attempted
+    SKIPPED = "SKIPPED"
+
+
+def is_timeout(error: BaseException) -> bool:
+    # Playwright, requests and asyncio each define their own timeout class; matching by name keeps them unimported
+    return any(cls.__name__ in ('TimeoutError', 'Timeout') for cls in type(error).__mro__)
+
+
+def outcome_for_status(status: ScrapeStatus, timed_out: bool = False) -> Outcome:
+    if status == ScrapeStatus.OK:
+        return Outcome.SUCCESS
+    if status == ScrapeStatus.BLOCKED:
+        return Outcome.BLOCKED
+    if status == ScrapeStatus.SKIPPED:
+        return Outcome.SKIPPED
+    return Outcome.TIMEOUT if timed_out else Outcome.ERROR
+
+
+@dataclass
+class Span:
+    """One timed phase. Code inside the timer may set the outcome and the bytes transferred."""
+    phase: str
+    store: str
+    outcome: Outcome = Outcome.SUCCESS
+    bytes: int = 0
+
+    def fail(self, error: BaseException) -> None:
+        self.outcome = Outcome.TIMEOUT if is_timeout(error) else Outcome.ERROR
+
+
+@dataclass
+class PhaseStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    outcomes: Counter = field(default_factory=Counter)
+    bytes: int = 0
+
+    def percentile(self, percentile: float) -> float:
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))] if ordered else 0.0
+
+    def histogram(self) -> dict[str, int]:
+        buckets: Counter = Counter()
+        for latency in self.latencies_ms:
+            bound = next((bound for bound in HISTOGRAM_BUCKETS_MS if latency <= bound), None)
+            buckets[f"le_{bound:g}" if bound is not None else "inf"] += 1
+        return dict(buckets)
+
+
+Sink = Callable[[str], None]
+
+
+def stdout_sink(line: str) -> None:
+    sys.stdout.write(line + '\n')
+    sys.stdout.flush()
+
+
+def file_sink(path: str) -> Sink:
+    lock = threading.Lock()
+
+    def write(line: str) -> None:
+        with lock, open(path, 'a', encoding='utf-8') as out:
+            out.write(line + '\n')
+    return write
+
+
+def null_sink(line: str) -> None:
+    pass
+
+
+def sink_from_env() -> Sink:
+    """
+    Where METRICS_OUTPUT sends logs and metrics: "stdout" (CloudWatch reads
+    EMF from the Lambda log), "file:<path>" to append to a local file, or "none".
+
+    Raises:
+        ValueError: If the value is none of these
+    """
+    output = os.getenv('METRICS_OUTPUT', 'stdout')
+    if output == 'stdout':
+        return stdout_sink
+    if output == 'none':
+        return null_sink
+    if output.startswith('file:'):
+        return file_sink(output[len('file:'):])
+    raise ValueError(f"Unknown METRICS_OUTPUT: {output}")
+
+
+class MetricsRecorder:
+    """
+    Collects timed phases per (phase, store) during an invocation. flush()
+    writes a structured JSON summary line per phase and store, then the same
+    numbers as CloudWatch Embedded Metric Format documents, and starts over.
+    """
+
+    def __init__(
+        self,
+        namespace: str = DEFAULT_NAMESPACE,
+        sink: Sink = stdout_sink,
+        enabled: bool = True,
+        log_spans: bool = False,
+        clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        """
+        Args:
+            namespace: CloudWatch namespace of the EMF metrics
+            sink: Receives one JSON document per call
+            enabled: When False, timers cost a clock read and record nothing
+            log_spans: Also log every span as it ends, not just the summaries
+            clock: Seconds clock used by the timers
+        """
+        self.namespace: str = namespace
+        self.sink: Sink = sink
+        self.enabled: bool = enabled
+        self.log_spans: bool = log_spans
+        self.clock: Callable[[], float] = clock
+        self._phases: dict[tuple[str, str], PhaseStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, span: Span, seconds: float) -> None:
+        if not self.enabled:
+            return
+        latency_ms = seconds * 1000
+        with self._lock:
+            stats = self._phases.setdefault((span.phase, span.store), PhaseStats())
+            stats.latencies_ms.append(latency_ms)
+            stats.outcomes[span.outcome] += 1
+            stats.bytes += span.bytes
+        if self.log_spans:
+            self.log('span', phase=span.phase, store=span.store, outcome=span.outcome.value,
+                     latency_ms=round(latency_ms, 3), bytes=span.bytes)
+
+    def log(self, event: str, **fields: Any) -> None:
+        """
+        Write one structured log line.
+        """
+        self.sink(json.dumps({'timestamp': int(time.time() * 1000), 'event': event, **fields}, default=str))
+
+    def snapshot(self) -> dict[tuple[str, str], PhaseStats]:
+        with self._lock:
+            return {key: PhaseStats(list(stats.latencies_ms), Counter(stats.outcomes), stats.bytes)
+                    for key, stats in self._phases.items()}
+
+    def emf_documents(self, timestamp_ms: Optional[int] = None) -> list[dict]:
+        """
+        The collected phases as EMF documents with Phase and Store dimensions.
+        Latencies beyond the first 100 spill into further documents that carry only the latency metric.
+        """
+        timestamp_ms = timestamp_ms if timestamp_ms is not None else int(time.time() * 1000)
+        documents: list[dict] = []
+        for (phase, store), stats in sorted(self.snapshot().items()):
+            for start in range(0, max(len(stats.latencies_ms), 1), EMF_MAX_VALUES):
+                metrics = [{'Name': 'Latency', 'Unit': 'Milliseconds'}]
+                document: dict[str, Any] = {
+                    'Phase': phase,
+                    'Store': store,
+                    'Latency': [round(value, 3) for value in stats.latencies_ms[start:start + EMF_MAX_VALUES]],
+                }
+                if start == 0:
+                    for outcome in Outcome:
+                        name = outcome.value.capitalize()
+                        metrics.append({'Name': name, 'Unit': 'Count'})
+                        document[name] = stats.outcomes.get(outcome, 0)
+                    metrics.append({'Name': 'Bytes', 'Unit': 'Bytes'})
+                    document['Bytes'] = stats.bytes
+                document['_aws'] = {
+                    'Timestamp': timestamp_ms,
+                    'CloudWatchMetrics': [{
+                        'Namespace': self.namespace,
+                        'Dimensions': [['Phase', 'Store']],
+                        'Metrics': metrics,
+                    }],
+                }
+                documents.append(document)
+        return documents
+
+    def flush(self) -> None:
+        """
+        Write the phase summaries and EMF metrics collected so far, then reset.
+        """
+        if not self.enabled:
+            return
+        for (phase, store), stats in sorted(self.snapshot().items()):
+            self.log('phase_summary', phase=phase, store=store, count=len(stats.latencies_ms),
+                     p50_ms=round(stats.percentile(50), 3), p95_ms=round(stats.percentile(95), 3),
+                     max_ms=round(max(stats.latencies_ms, default=0.0), 3),
+                     outcomes={outcome.value: count for outcome, count in stats.outcomes.items()},
+                     bytes=stats.bytes, histogram=stats.histogram())
+        for document in self.emf_documents():
+            self.sink(json.dumps(document))
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._phases.clear()
+
+
+class timed:
+    """
+    Time a phase, as a context manager yielding its Span or as a decorator
+    for sync and async functions. An exception marks the span as an error,
+    or a timeout when it is one, and propagates.
+
+        with timed('goto', Store.AMAZON) as span:
+            response = page.goto(url)
+            span.bytes = ...
+
+        @timed('dynamodb.batch_get')
+        def batch_get_items(...): ...
+    """
+
+    def __init__(self, phase: str, store: Union[Store, str, None] = None) -> None:
+        self.phase: str = phase
+        self.store: str = store.name if isinstance(store, Store) else (store or ALL_STORES)
+        self._span: Optional[Span] = None
+        self._start: float = 0.0
+
+    def __enter__(self) -> Span:
+        self._span = Span(self.phase, self.store)
+        self._start = get_metrics().clock()
+        return self._span
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        metrics = get_metrics()
+        if exc_value is not None and self._span.outcome == Outcome.SUCCESS:
+            self._span.fail(exc_value)
+        metrics.record(self._span, metrics.clock() - self._start)
+
+    def __call__(self, func: Callable) -> Callable:
+        phase, store = self.phase, self.store
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timed(phase, store):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(phase, store):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+_metrics: Optional[MetricsRecorder] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRecorder:
+    """
+    Return the process-wide recorder, configured from METRICS_ENABLED,
+    METRICS_NAMESPACE, METRICS_OUTPUT and METRICS_LOG_SPANS.
+    """
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = MetricsRecorder(
+                    namespace=os.getenv('METRICS_NAMESPACE', DEFAULT_NAMESPACE),
+                    sink=sink_from_env(),
+                    enabled=os.getenv('METRICS_ENABLED', 'true').lower() == 'true',
+                    log_spans=os.getenv('METRICS_LOG_SPANS', 'false').lower() == 'true'
+                )
+    return _metrics
+
+
+def log_event(event: str, **fields: Any) -> None:
+    """
+    Write a structured JSON log line through the metrics sink.
+    """
+    get_metrics().log(event, **fields)
@@ -0,0 +1,76 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from observability.metrics import log_event
+
+PROFILERS = ('cprofile', 'pyinstrument')
+# Functions shown from the cProfile report in the log
+TOP_FUNCTIONS = 30
+
+_profiled: bool = False
+
+
+@contextmanager
+def profile_invocation() -> Iterator[None]:
+    """
+    Profile the first invocation of this process when PROFILE_INVOCATION names
+    a profiler ("cprofile" or "pyinstrument"). The report is logged and saved
+    under PROFILE_OUTPUT_DIR (default /tmp). Both profilers follow the thread
+    running the event loop, not the worker threads behind asyncio.to_thread.
+
+    Raises:
+        ValueError: If PROFILE_INVOCATION names an unknown profiler
+    """
+    global _profiled
+    profiler = os.getenv('PROFILE_INVOCATION', 'none').lower()
+    if profiler == 'none' or _profiled:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown PROFILE_INVOCATION: {profiler}")
+    _profiled = True
+    output_dir = os.getenv('PROFILE_OUTPUT_DIR', '/tmp')
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"profile-{int(time.time())}")
+    if profiler == 'cprofile':
+        with _cprofile(path):
+            yield
+    else:
+        with _pyinstrument(path):
+            yield
+
+
+@contextmanager
+def _cprofile(path: str) -> Iterator[None]:
+    import cProfile
+    import io
+    import pstats
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(f"{path}.prof")
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        log_event('profile', profiler='cprofile', path=f"{path}.prof", report=report.getvalue())
+
+
+@contextmanager
+def _pyinstrument(path: str) -> Iterator[None]:
+    # Not bundled with the Lambda; add it to the deployment to use this profiler
+    from pyinstrument import Profiler
+
+    profiler = Profiler(async_mode='enabled')
+    profiler.start()
+    try:
+        yield
+    finally:
+        profiler.stop()
+        with open(f"{path}.html", 'w', encoding='utf-8') as out:
+            out.write(profiler.output_html())
+        log_event('profile', profiler='pyinstrument', path=f"{path}.html", report=profiler.output_text())
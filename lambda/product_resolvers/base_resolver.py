@@ -0,0 +1,322 @@
+import asyncio
+from enum import Enum
+from typing import Optional
+from playwright.sync_api import TimeoutError, Error, Page
+from playwright.async_api import Page as AsyncPage
+from models.store import Store
+from models.product import Product, ScrapeStatus
+from observability.metrics import log_event, outcome_for_status, timed
+from product_resolvers.browser_pool import BrowserPool, AsyncBrowserPool
+from product_resolvers.extraction import (
+    ExtractionResult,
+    ExtractionSpec,
+    SelectorRule,
+    extract_from_html,
+    extract_from_page,
+    extract_from_page_async,
+)
+from product_resolvers.http_fetcher import (
+    BOT_WALL_STATUS_CODES,
+    BlockSignal,
+    FetchTier,
+    detect_block,
+    fetch_page,
+    fetch_tier_tracker,
+)
+from product_resolvers.route_policy import RoutePolicy, DEFAULT_ROUTE_POLICY
+
+class FetchMode(str, Enum):
+    """Which fetch tiers a resolver may use."""
+    BROWSER_ONLY = "BROWSER_ONLY"
+    # Plain HTTP GET first, falling back to the browser when fields are missing or a bot wall is hit
+    TIERED = "TIERED"
+
+class BaseResolver:
+    """
+    Shared navigation, extraction and error handling for store resolvers.
+
+    Subclasses declare their store and an ExtractionSpec; the same spec drives
+    the HTTP fast path and both the blocking resolve() and the asyncio
+    resolve_async() browser paths, where it runs as a single page.evaluate.
+    """
+
+    store_name: Store
+    SPEC: ExtractionSpec = ExtractionSpec()
+
+    FETCH_MODE: FetchMode = FetchMode.TIERED
+    # Store-specific lowercase text that marks a bot check page
+    BOT_WALL_MARKERS: tuple[str, ...] = ()
+
+    # Requests aborted before they leave the browser
+    ROUTE_POLICY: RoutePolicy = DEFAULT_ROUTE_POLICY
+    # Load state passed to page.goto
+    WAIT_UNTIL: str = 'domcontentloaded'
+    # When the first read is incomplete, wait for any of these; None waits for any rule in the spec
+    WAIT_FOR_SELECTORS: Optional[tuple[SelectorRule, ...]] = None
+    SELECTOR_WAIT_TIMEOUT_MS: int = 5000
+
+    def __init__(self, product_id: str, product_url: str, product_title: str) -> None:
+        """
+        Initialize the resolver.
+
+        Args:
+            product_id: Unique identifier for the product
+            product_url: Product page URL
+            product_title: Product title
+        """
+        self.product_id: str = product_id
+        self.product_url: str = product_url
+        self.product_title: str = product_title
+        # Set when the retailer rate limited us or served a bot check; read by the politeness scheduler
+        self.block_signal: Optional[BlockSignal] = None
+        # Set when the browser timed out, so the resolve metric counts a timeout rather than an error
+        self.timed_out: bool = False
+
+    def _wait_selectors(self) -> tuple[SelectorRule, ...]:
+        if self.WAIT_FOR_SELECTORS is not None:
+            return self.WAIT_FOR_SELECTORS
+        return self.SPEC.wait_rules
+
+    def _wait_for_content(self, page: Page) -> None:
+        """
+        Wait until any selector the extraction needs is attached to the page.
+        A timeout is not fatal; extraction then runs against whatever has rendered.
+
+        Args:
+            page: Playwright page object
+        """
+        selectors = self._wait_selectors()
+        if not selectors:
+            return
+        combined = page.locator(selectors[0].playwright_selector)
+        for rule in selectors[1:]:
+            combined = combined.or_(page.locator(rule.playwright_selector))
+        try:
+            combined.first.wait_for(state='attached', timeout=self.SELECTOR_WAIT_TIMEOUT_MS)
+        except TimeoutError:
+            log_event('selector_wait_timeout', store=self.store_name.name, url=self.product_url)
+
+    async def _wait_for_content_async(self, page: AsyncPage) -> None:
+        """
+        Async counterpart of _wait_for_content.
+        """
+        selectors = self._wait_selectors()
+        if not selectors:
+            return
+        combined = page.locator(selectors[0].playwright_selector)
+        for rule in selectors[1:]:
+            combined = combined.or_(page.locator(rule.playwright_selector))
+        try:
+            await combined.first.wait_for(state='attached', timeout=self.SELECTOR_WAIT_TIMEOUT_MS)
+        except TimeoutError:
+            log_event('selector_wait_timeout', store=self.store_name.name, url=self.product_url)
+
+    def _try_http(self) -> Optional[Product]:
+        """
+        Try to resolve the product from server-rendered HTML.
+
+        Returns:
+            Product if the HTML held everything we need, None to fall back to the browser
+        """
+        page = fetch_page(self.product_url, store=self.store_name)
+        if page is None:
+            return None
+        if page.status_code in BOT_WALL_STATUS_CODES:
+            self.block_signal = detect_block(page.status_code, page.html)
+            log_event('http_fallback', store=self.store_name.name, url=self.product_url, reason='bot_wall',
+                      status_code=page.status_code)
+            return None
+        with timed('http.extract', self.store_name):
+            result = extract_from_html(page.html, self.SPEC)
+        if result is None or not result.complete:
+            # Page text is only checked for bot wall markers once extraction failed, as on the browser path;
+            # product pages routinely mention words like "captcha" in scripts and footers
+            self.block_signal = detect_block(page.status_code, page.html, self.BOT_WALL_MARKERS)
+            log_event('http_fallback', store=self.store_name.name, url=self.product_url, reason='incomplete',
+                      signals=result.signals if result is not None else [])
+            return None
+        self.block_signal = None
+        return self._create_product_from_result(result)
+
+    def _http_enabled(self) -> bool:
+        return self.FETCH_MODE == FetchMode.TIERED and fetch_tier_tracker.should_try_http(self.store_name)
+
+    def resolve(self, browser_pool: Optional[BrowserPool] = None) -> Product:
+        """
+        Resolve product information, trying plain HTTP first when the fetch
+        mode allows and falling back to the blocking Playwright API.
+
+        Args:
+            browser_pool: Shared browser pool; a private pool is used when omitted
+
+        Returns:
+            Product object with price and availability information
+        """
+        with timed('resolve', self.store_name) as span:
+            product = self._resolve_tiers(browser_pool)
+            span.outcome = outcome_for_status(product.status, self.timed_out)
+        return product
+
+    def _resolve_tiers(self, browser_pool: Optional[BrowserPool]) -> Product:
+        http_attempted = self._http_enabled()
+        if http_attempted:
+            product = self._try_http()
+            if product is not None:
+                fetch_tier_tracker.record(self.store_name, FetchTier.HTTP)
+                return product
+        fetch_tier_tracker.record(self.store_name, FetchTier.BROWSER, http_attempted)
+        return self._resolve_browser(browser_pool)
+
+    def _resolve_browser(self, browser_pool: Optional[BrowserPool] = None) -> Product:
+        if browser_pool is None:
+            with BrowserPool() as pool:
+                return self._resolve_browser(pool)
+
+        try:
+            with browser_pool.page() as page:
+                # Skip heavy resources and read everything in one round-trip once the DOM is ready
+                self.ROUTE_POLICY.apply(page)
+                with timed('browser.goto', self.store_name) as span:
+                    response = page.goto(self.product_url, wait_until=self.WAIT_UNTIL)
+                    span.bytes = self._document_size(response)
+                with timed('browser.extract', self.store_name):
+                    result = extract_from_page(page, self.SPEC)
+                if not result.complete:
+                    # Client-rendered content: wait for any element we read, then read again
+                    with timed('browser.wait', self.store_name):
+                        self._wait_for_content(page)
+                    with timed('browser.extract', self.store_name):
+                        result = extract_from_page(page, self.SPEC)
+                self.block_signal = None if result.complete else detect_block(
+                    response.status if response is not None else None, page.content(), self.BOT_WALL_MARKERS)
+                return self._create_product_from_result(result)
+        except Exception as e:
+            return self._handle_resolve_error(e)
+
+    async def resolve_async(self, browser_pool: AsyncBrowserPool) -> Product:
+        """
+        Resolve product information, trying plain HTTP first when the fetch
+        mode allows and falling back to the asyncio Playwright API.
+
+        Args:
+            browser_pool: Shared async browser pool
+
+        Returns:
+            Product object with price and availability information
+        """
+        with timed('resolve', self.store_name) as span:
+            product = await self._resolve_tiers_async(browser_pool)
+            span.outcome = outcome_for_status(product.status, self.timed_out)
+        return product
+
+    async def _resolve_tiers_async(self, browser_pool: AsyncBrowserPool) -> Product:
+        http_attempted = self._http_enabled()
+        if http_attempted:
+            # requests is blocking; run it on a worker thread so other pages keep going
+            product = await asyncio.to_thread(self._try_http)
+            if product is not None:
+                fetch_tier_tracker.record(self.store_name, FetchTier.HTTP)
+                return product
+        fetch_tier_tracker.record(self.store_name, FetchTier.BROWSER, http_attempted)
+        return await self._resolve_browser_async(browser_pool)
+
+    async def _resolve_browser_async(self, browser_pool: AsyncBrowserPool) -> Product:
+        try:
+            async with browser_pool.page() as page:
+                await self.ROUTE_POLICY.apply_async(page)
+                with timed('browser.goto', self.store_name) as span:
+                    response = await page.goto(self.product_url, wait_until=self.WAIT_UNTIL)
+                    span.bytes = self._document_size(response)
+                with timed('browser.extract', self.store_name):
+                    result = await extract_from_page_async(page, self.SPEC)
+                if not result.complete:
+                    with timed('browser.wait', self.store_name):
+                        await self._wait_for_content_async(page)
+                    with timed('browser.extract', self.store_name):
+                        result = await extract_from_page_async(page, self.SPEC)
+                self.block_signal = None if result.complete else detect_block(
+                    response.status if response is not None else None, await page.content(), self.BOT_WALL_MARKERS)
+                return self._create_product_from_result(result)
+        except Exception as e:
+            return self._handle_resolve_error(e)
+
+    @staticmethod
+    def _document_size(response) -> int:
+        """
+        Bytes of the main document as declared by the server; subresources are not counted.
+        """
+        if response is None:
+            return 0
+        try:
+            return int(response.headers.get('content-length', 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def _handle_resolve_error(self, error: Exception) -> Product:
+        """
+        Log an expected scraping error and return an error product.
+        Unexpected exceptions are re-raised.
+        """
+        if isinstance(error, TimeoutError):
+            self.timed_out = True
+            reason = 'timeout'
+        elif isinstance(error, Error):
+            reason = 'playwright'
+        elif isinstance(error, ValueError):
+            reason = 'parse'
+        elif isinstance(error, ConnectionError):
+            reason = 'network'
+        else:
+            raise error
+        log_event('resolve_failed', store=self.store_name.name, url=self.product_url, reason=reason, error=str(error))
+        return self._create_error_product()
+
+    def _create_product(
+        self,
+        price: Optional[float],
+        in_stock: bool,
+        currency: Optional[str] = None,
+        status: ScrapeStatus = ScrapeStatus.OK
+    ) -> Product:
+        return Product(
+            id=self.product_id,
+            name=self.product_title,
+            url=self.product_url,
+            price=price,
+            in_stock=in_stock,
+            store=self.store_name,
+            currency=currency,
+            status=status
+        )
+
+    def _create_product_from_result(self, result: ExtractionResult) -> Product:
+        if not result.complete:
+            # A page we could not fully read says nothing about stock; never report it as out of stock
+            log_event('stock_unreadable', store=self.store_name.name, url=self.product_url, signals=result.signals)
+            return self._create_error_product(
+                ScrapeStatus.BLOCKED if self.block_signal is not None else ScrapeStatus.FAILED)
+        return self._create_product(result.price, result.in_stock, result.currency)
+
+    def _create_error_product(self, status: ScrapeStatus = ScrapeStatus.FAILED) -> Product:
+        """
+        Create a Product object for error cases.
+
+        Args:
+            status: Why no observation was made
+
+        Returns:
+            Product object with placeholder values and a non-OK status
+        """
+        return self._create_product(None, False, status=status)
+
+    def failed_product(self) -> Product:
+        """
+        Placeholder for a product whose resolution raised an unexpected error.
+        """
+        return self._create_error_product(ScrapeStatus.FAILED)
+
+    def skipped_product(self) -> Product:
+        """
+        Placeholder for a product that was not resolved because its circuit breaker is open.
+        """
+        return self._create_error_product(ScrapeStatus.SKIPPED)
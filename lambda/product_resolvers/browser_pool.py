@@ -0,0 +1,454 @@
+import asyncio
+import os
+from contextlib import contextmanager, asynccontextmanager
+from typing import AsyncIterator, Callable, Iterator, Optional
+from playwright.sync_api import sync_playwright, Playwright, Browser, BrowserContext, Page
+from playwright.async_api import async_playwright
+from playwright.async_api import (
+    Playwright as AsyncPlaywright,
+    Browser as AsyncBrowser,
+    BrowserContext as AsyncBrowserContext,
+    Page as AsyncPage,
+)
+from observability.metrics import timed
+
+# Browser configuration shared by every resolver
+CHROMIUM_ARGS: list[str] = ["--disable-gpu", "--single-process"]
+DEFAULT_TIMEOUT_MS: int = 10000
+DEFAULT_MAX_PAGES_PER_CONTEXT: int = 20
+DEFAULT_USER_AGENT: str = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+)
+# Warm browser recycling
+DEFAULT_MAX_PAGES_PER_BROWSER: int = 500
+DEFAULT_MAX_MEMORY_GROWTH_MB: int = 512
+HEALTH_CHECK_TIMEOUT_SECONDS: float = 5.0
+
+
+class BrowserPool:
+    """
+    Owns a single Chromium instance shared by all resolvers in one run.
+
+    Chromium is launched lazily on the first page request, so a launch failure
+    surfaces inside the resolver that asked for the page. Each resolver gets a
+    fresh page; the underlying browser context is recycled after
+    max_pages_per_context pages to bound cookie and cache growth.
+    """
+
+    def __init__(
+        self,
+        max_pages_per_context: int = DEFAULT_MAX_PAGES_PER_CONTEXT,
+        default_timeout_ms: int = DEFAULT_TIMEOUT_MS,
+        user_agent: str = DEFAULT_USER_AGENT,
+        headless: bool = True
+    ) -> None:
+        """
+        Initialize the browser pool.
+
+        Args:
+            max_pages_per_context: Number of pages served by a context before it is replaced
+            default_timeout_ms: Default Playwright timeout applied to every page
+            user_agent: User agent used by every context
+            headless: Whether to launch Chromium headless
+        """
+        if max_pages_per_context < 1:
+            raise ValueError("max_pages_per_context must be at least 1")
+        self.max_pages_per_context: int = max_pages_per_context
+        self.default_timeout_ms: int = default_timeout_ms
+        self.user_agent: str = user_agent
+        self.headless: bool = headless
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._context: Optional[BrowserContext] = None
+        self._context_pages: int = 0
+        self.launch_count: int = 0
+        self.pages_served: int = 0
+
+    def __enter__(self) -> "BrowserPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    def _ensure_browser(self) -> Browser:
+        """
+        Launch Chromium if it is not already running.
+
+        Returns:
+            The shared browser instance
+        """
+        if self._browser is None or not self._browser.is_connected():
+            with timed('browser.launch'):
+                if self._playwright is None:
+                    self._playwright = sync_playwright().start()
+                self._browser = self._playwright.chromium.launch(
+                    args=CHROMIUM_ARGS,
+                    headless=self.headless
+                )
+            self._context = None
+            self._context_pages = 0
+            self.launch_count += 1
+            print(f"Launched Chromium (launch #{self.launch_count})")
+        return self._browser
+
+    def _ensure_context(self) -> BrowserContext:
+        """
+        Return the current browser context, replacing it once it has served
+        max_pages_per_context pages.
+
+        Returns:
+            A browser context ready to open a page
+        """
+        browser = self._ensure_browser()
+        if self._context is not None and self._context_pages >= self.max_pages_per_context:
+            self._close_context()
+        if self._context is None:
+            self._context = browser.new_context(user_agent=self.user_agent)
+            self._context.set_default_timeout(self.default_timeout_ms)
+            self._context_pages = 0
+        return self._context
+
+    def _close_context(self) -> None:
+        if self._context is not None:
+            try:
+                self._context.close()
+            except Exception as e:
+                print(f"Error closing browser context: {str(e)}")
+            self._context = None
+            self._context_pages = 0
+
+    @contextmanager
+    def page(self) -> Iterator[Page]:
+        """
+        Hand out a fresh page from the shared browser. The page is closed when
+        the with-block exits.
+
+        Yields:
+            Playwright page object
+        """
+        context = self._ensure_context()
+        page = context.new_page()
+        self._context_pages += 1
+        self.pages_served += 1
+        try:
+            yield page
+        finally:
+            try:
+                page.close()
+            except Exception as e:
+                print(f"Error closing page: {str(e)}")
+
+    def close(self) -> None:
+        """
+        Shut down the context, browser and Playwright driver. Safe to call more than once.
+        """
+        self._close_context()
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception as e:
+                print(f"Error closing browser: {str(e)}")
+            self._browser = None
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception as e:
+                print(f"Error stopping Playwright: {str(e)}")
+            self._playwright = None
+
+
+class AsyncBrowserPool:
+    """
+    asyncio counterpart of BrowserPool for concurrent resolution.
+
+    Many pages can be open at once. A context that has served
+    max_pages_per_context pages stops receiving new pages and is closed once
+    its last open page is released.
+    """
+
+    def __init__(
+        self,
+        max_pages_per_context: int = DEFAULT_MAX_PAGES_PER_CONTEXT,
+        default_timeout_ms: int = DEFAULT_TIMEOUT_MS,
+        user_agent: str = DEFAULT_USER_AGENT,
+        headless: bool = True
+    ) -> None:
+        """
+        Initialize the async browser pool.
+
+        Args:
+            max_pages_per_context: Number of pages served by a context before it is replaced
+            default_timeout_ms: Default Playwright timeout applied to every page
+            user_agent: User agent used by every context
+            headless: Whether to launch Chromium headless
+        """
+        if max_pages_per_context < 1:
+            raise ValueError("max_pages_per_context must be at least 1")
+        self.max_pages_per_context: int = max_pages_per_context
+        self.default_timeout_ms: int = default_timeout_ms
+        self.user_agent: str = user_agent
+        self.headless: bool = headless
+        self._playwright: Optional[AsyncPlaywright] = None
+        self._browser: Optional[AsyncBrowser] = None
+        self._context: Optional[AsyncBrowserContext] = None
+        self._context_pages: int = 0
+        self._open_pages: dict[AsyncBrowserContext, int] = {}
+        self._retired: set[AsyncBrowserContext] = set()
+        self._lock: asyncio.Lock = asyncio.Lock()
+        self.launch_count: int = 0
+        self.pages_served: int = 0
+
+    async def __aenter__(self) -> "AsyncBrowserPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def _ensure_browser(self) -> AsyncBrowser:
+        if self._browser is None or not self._browser.is_connected():
+            with timed('browser.launch'):
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(
+                    args=CHROMIUM_ARGS,
+                    headless=self.headless
+                )
+            self._context = None
+            self._context_pages = 0
+            self._open_pages.clear()
+            self._retired.clear()
+            self.launch_count += 1
+            print(f"Launched Chromium (launch #{self.launch_count})")
+        return self._browser
+
+    async def _acquire_context(self) -> AsyncBrowserContext:
+        """
+        Reserve a page slot in the current context, rotating it when it is used up.
+
+        Returns:
+            A browser context ready to open a page
+        """
+        async with self._lock:
+            browser = await self._ensure_browser()
+            if self._context is not None and self._context_pages >= self.max_pages_per_context:
+                retiring = self._context
+                self._context = None
+                if self._open_pages.get(retiring, 0) == 0:
+                    await self._close_context(retiring)
+                else:
+                    self._retired.add(retiring)
+            if self._context is None:
+                self._context = await browser.new_context(user_agent=self.user_agent)
+                self._context.set_default_timeout(self.default_timeout_ms)
+                self._context_pages = 0
+            self._context_pages += 1
+            self._open_pages[self._context] = self._open_pages.get(self._context, 0) + 1
+            return self._context
+
+    async def _release_context(self, context: AsyncBrowserContext) -> None:
+        async with self._lock:
+            self._open_pages[context] = self._open_pages.get(context, 1) - 1
+            if context in self._retired and self._open_pages[context] <= 0:
+                self._retired.discard(context)
+                await self._close_context(context)
+
+    async def _close_context(self, context: AsyncBrowserContext) -> None:
+        self._open_pages.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            print(f"Error closing browser context: {str(e)}")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[AsyncPage]:
+        """
+        Hand out a fresh page from the shared browser. The page is closed when
+        the async with-block exits.
+
+        Yields:
+            Playwright async page object
+        """
+        context = await self._acquire_context()
+        try:
+            page = await context.new_page()
+            self.pages_served += 1
+            try:
+                yield page
+            finally:
+                try:
+                    await page.close()
+                except Exception as e:
+                    print(f"Error closing page: {str(e)}")
+        finally:
+            await self._release_context(context)
+
+    async def _close_browser(self) -> None:
+        contexts = set(self._retired)
+        if self._context is not None:
+            contexts.add(self._context)
+        for context in contexts:
+            await self._close_context(context)
+        self._context = None
+        self._retired.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                print(f"Error closing browser: {str(e)}")
+            self._browser = None
+
+    async def close(self) -> None:
+        """
+        Shut down every context, the browser and the Playwright driver. Safe to call more than once.
+        """
+        await self._close_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                print(f"Error stopping Playwright: {str(e)}")
+            self._playwright = None
+
+
+def process_tree_rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Resident memory of a process and all of its descendants, read from /proc.
+
+    Args:
+        pid: Root process; defaults to this process
+
+    Returns:
+        Bytes, or None where /proc is unavailable
+    """
+    root = os.getpid() if pid is None else pid
+    children: dict[int, list[int]] = {}
+    rss_pages: dict[int, int] = {}
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return None
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', encoding='utf-8') as stat_file:
+                # The command name may contain spaces, so fields are counted from its closing parenthesis
+                fields = stat_file.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss_pages[int(entry)] = int(fields[21])
+    if root not in rss_pages:
+        return None
+    total = 0
+    pending = [root]
+    while pending:
+        process = pending.pop()
+        total += rss_pages.get(process, 0)
+        pending.extend(children.get(process, []))
+    return total * os.sysconf('SC_PAGE_SIZE')
+
+
+class WarmAsyncBrowserPool(AsyncBrowserPool):
+    """
+    AsyncBrowserPool that outlives a single run, for reuse across warm Lambda
+    invocations. Leaving an async with-block keeps the driver and browser
+    running; entering one checks that the browser still answers and relaunches
+    it if not. Chromium is also recycled once it has served
+    max_pages_per_browser pages or the process tree has grown by more than
+    max_memory_growth_mb since launch.
+
+    Async Playwright objects belong to the event loop that created them, so
+    every run must use the same loop.
+    """
+
+    def __init__(
+        self,
+        max_pages_per_browser: int = DEFAULT_MAX_PAGES_PER_BROWSER,
+        max_memory_growth_mb: Optional[int] = DEFAULT_MAX_MEMORY_GROWTH_MB,
+        memory_probe: Callable[[], Optional[int]] = process_tree_rss_bytes,
+        **kwargs
+    ) -> None:
+        """
+        Initialize the warm browser pool.
+
+        Args:
+            max_pages_per_browser: Pages served before Chromium is relaunched
+            max_memory_growth_mb: Memory growth since launch that triggers a relaunch; None disables the check
+            memory_probe: Returns the current memory use in bytes, or None if unknown
+            **kwargs: Passed to AsyncBrowserPool
+        """
+        super().__init__(**kwargs)
+        self.max_pages_per_browser: int = max_pages_per_browser
+        self.max_memory_growth_mb: Optional[int] = max_memory_growth_mb
+        self._memory_probe = memory_probe
+        self._pages_at_launch: int = 0
+        self._memory_at_launch: Optional[int] = None
+        self.recycle_count: int = 0
+
+    async def __aenter__(self) -> "WarmAsyncBrowserPool":
+        if not await self.health_check():
+            print("Warm Chromium failed its health check, relaunching")
+            await self.close()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        reason = self.recycle_reason()
+        if reason is not None:
+            print(f"Recycling warm Chromium: {reason}")
+            self.recycle_count += 1
+            # The driver stays up; the next page launches a fresh browser
+            await self._close_browser()
+
+    async def _ensure_browser(self) -> AsyncBrowser:
+        launches = self.launch_count
+        browser = await super()._ensure_browser()
+        if self.launch_count != launches:
+            self._pages_at_launch = self.pages_served
+            self._memory_at_launch = self._memory_probe()
+        return browser
+
+    async def start(self) -> None:
+        """
+        Launch the driver and browser now instead of on the first page.
+        """
+        async with self._lock:
+            await self._ensure_browser()
+
+    async def health_check(self) -> bool:
+        """
+        Check that the browser is connected and can still open a context.
+
+        Returns:
+            False if the browser should be relaunched; True when none is running yet
+        """
+        if self._browser is None:
+            return True
+        if not self._browser.is_connected():
+            return False
+        try:
+            context = await asyncio.wait_for(self._browser.new_context(), HEALTH_CHECK_TIMEOUT_SECONDS)
+            await context.close()
+            return True
+        except Exception as e:
+            print(f"Warm Chromium health check failed: {str(e)}")
+            return False
+
+    def recycle_reason(self) -> Optional[str]:
+        """
+        Returns:
+            Why the browser should be relaunched before the next run, or None
+        """
+        if self._browser is None:
+            return None
+        pages = self.pages_served - self._pages_at_launch
+        if pages >= self.max_pages_per_browser:
+            return f"served {pages} pages"
+        if self.max_memory_growth_mb is not None and self._memory_at_launch is not None:
+            current = self._memory_probe()
+            if current is not None:
+                growth_mb = (current - self._memory_at_launch) / (1024 * 1024)
+                if growth_mb >= self.max_memory_growth_mb:
+                    return f"memory grew by {growth_mb:.0f} MB"
+        return None
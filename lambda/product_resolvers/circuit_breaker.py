@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from enum import Enum
+from typing import Callable, Optional
+from models.product import Product, ScrapeStatus
+from models.store import Store
+
+# Circuit breaker defaults
+DEFAULT_STORE_FAILURE_THRESHOLD: int = 5
+DEFAULT_URL_FAILURE_THRESHOLD: int = 3
+DEFAULT_RESET_SECONDS: float = 900.0
+
+
+class BreakerState(str, Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    # One probe is let through to see whether the target recovered
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures and rejects work until
+    reset_seconds have passed. The first request after that is a probe: its
+    success closes the breaker, its failure opens it for another period.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float = DEFAULT_RESET_SECONDS,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold: int = failure_threshold
+        self.reset_seconds: float = reset_seconds
+        self._clock = clock
+        self.state: BreakerState = BreakerState.CLOSED
+        self.consecutive_failures: int = 0
+        self._opened_at: float = 0.0
+        self._probing: bool = False
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may go ahead, starting a probe if the open period has passed.
+        """
+        if self.state == BreakerState.CLOSED:
+            return True
+        if self.state == BreakerState.OPEN and self._clock() - self._opened_at >= self.reset_seconds:
+            self.state = BreakerState.HALF_OPEN
+            self._probing = False
+        if self.state == BreakerState.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def cancel_probe(self) -> None:
+        """
+        Hand back a probe granted by allow() that was never used.
+        """
+        self._probing = False
+
+    def record_success(self) -> None:
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == BreakerState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = BreakerState.OPEN
+            self._opened_at = self._clock()
+            self._probing = False
+
+
+class BreakerBoard:
+    """
+    One breaker per store and one per product URL. A store breaker opens when
+    the store keeps failing across different products; a URL breaker opens
+    for a single page that keeps failing while the rest of the store works.
+    Both must allow a resolution for it to run.
+    """
+
+    def __init__(
+        self,
+        store_failure_threshold: int = DEFAULT_STORE_FAILURE_THRESHOLD,
+        url_failure_threshold: int = DEFAULT_URL_FAILURE_THRESHOLD,
+        reset_seconds: float = DEFAULT_RESET_SECONDS,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        self.store_failure_threshold: int = store_failure_threshold
+        self.url_failure_threshold: int = url_failure_threshold
+        self.reset_seconds: float = reset_seconds
+        self._clock = clock
+        self._stores: dict[Store, CircuitBreaker] = {}
+        self._urls: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _store_breaker(self, store: Store) -> CircuitBreaker:
+        if store not in self._stores:
+            self._stores[store] = CircuitBreaker(self.store_failure_threshold, self.reset_seconds, self._clock)
+        return self._stores[store]
+
+    def _url_breaker(self, url: str) -> CircuitBreaker:
+        if url not in self._urls:
+            self._urls[url] = CircuitBreaker(self.url_failure_threshold, self.reset_seconds, self._clock)
+        return self._urls[url]
+
+    def allow(self, store: Store, url: str) -> bool:
+        with self._lock:
+            store_breaker = self._store_breaker(store)
+            if not store_breaker.allow():
+                return False
+            if not self._url_breaker(url).allow():
+                store_breaker.cancel_probe()
+                return False
+            return True
+
+    def record(self, product: Product) -> None:
+        """
+        Feed a resolution outcome to the product's store and URL breakers. Skipped products are ignored.
+        """
+        if product.status == ScrapeStatus.SKIPPED:
+            return
+        with self._lock:
+            store_breaker = self._store_breaker(product.store)
+            url_breaker = self._url_breaker(product.url)
+            if product.scraped:
+                store_breaker.record_success()
+                url_breaker.record_success()
+                return
+            was_open = store_breaker.state == BreakerState.OPEN
+            store_breaker.record_failure()
+            url_breaker.record_failure()
+            if store_breaker.state == BreakerState.OPEN and not was_open:
+                print(f"Circuit open for {product.store.name} after {store_breaker.consecutive_failures} "
+                      f"consecutive failures; skipping it for {self.reset_seconds:.0f}s")
+
+    def open_stores(self) -> list[Store]:
+        with self._lock:
+            return [store for store, breaker in self._stores.items() if breaker.state != BreakerState.CLOSED]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stores.clear()
+            self._urls.clear()
+
+
+_breaker_board: Optional[BreakerBoard] = None
+
+
+def get_breaker_board() -> BreakerBoard:
+    """
+    Return the process-wide board, configured from BREAKER_STORE_FAILURES,
+    BREAKER_URL_FAILURES and BREAKER_RESET_SECONDS. Warm invocations keep
+    breakers open across sweeps.
+    """
+    global _breaker_board
+    if _breaker_board is None:
+        _breaker_board = BreakerBoard(
+            store_failure_threshold=int(os.getenv('BREAKER_STORE_FAILURES', DEFAULT_STORE_FAILURE_THRESHOLD)),
+            url_failure_threshold=int(os.getenv('BREAKER_URL_FAILURES', DEFAULT_URL_FAILURE_THRESHOLD)),
+            reset_seconds=float(os.getenv('BREAKER_RESET_SECONDS', DEFAULT_RESET_SECONDS))
+        )
+    return _breaker_board
@@ -0,0 +1,264 @@
+import json
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Optional
+import lxml.html
+from lxml.etree import ParserError
+from cssselect import SelectorError
+from product_resolvers.structured_data import (
+    EmbeddedStateRule,
+    StructuredOffer,
+    extract_structured_from_document,
+    offer_from_page_payload,
+)
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+    from playwright.async_api import Page as AsyncPage
+
+@dataclass(frozen=True)
+class SelectorRule:
+    """
+    A CSS selector, optionally narrowed to elements whose text contains a
+    case-insensitive substring. Rules are evaluated the same way by the
+    browser and the HTML parser.
+    """
+    css: str
+    text: Optional[str] = None
+
+    @property
+    def playwright_selector(self) -> str:
+        if self.text is None:
+            return self.css
+        return f'{self.css}:has-text("{self.text}")'
+
+
+@dataclass(frozen=True)
+class ExtractionSpec:
+    """
+    Everything a resolver reads from a product page. Structured data is
+    consulted first; selector rules fill in whatever it did not provide.
+    """
+    # Rules tried in order until one yields a parsable price
+    price_rules: tuple[SelectorRule, ...] = ()
+    # Any match means the product is out of stock
+    unavailable_rules: tuple[SelectorRule, ...] = ()
+    # Any match (after the unavailable checks) means the product is in stock
+    available_rules: tuple[SelectorRule, ...] = ()
+    # Retailer state objects read alongside JSON-LD
+    embedded_state_rules: tuple[EmbeddedStateRule, ...] = ()
+
+    @property
+    def wait_rules(self) -> tuple[SelectorRule, ...]:
+        return self.price_rules + self.unavailable_rules + self.available_rules
+
+    @cached_property
+    def page_script(self) -> str:
+        """
+        The spec compiled into one JavaScript function for page.evaluate. It
+        returns raw price texts, matched stock signals, JSON-LD bodies and
+        serialized state objects so that all parsing happens in Python, exactly
+        as on the HTTP path.
+        """
+        spec = {
+            'price': [{'css': rule.css, 'text': rule.text} for rule in self.price_rules],
+            'unavailable': [{'css': rule.css, 'text': rule.text} for rule in self.unavailable_rules],
+            'available': [{'css': rule.css, 'text': rule.text} for rule in self.available_rules],
+            'variables': [rule.variable for rule in self.embedded_state_rules],
+        }
+        return _PAGE_SCRIPT_TEMPLATE.replace('__SPEC__', json.dumps(spec))
+
+
+# Evaluated in the page; __SPEC__ is replaced with the JSON-encoded spec
+_PAGE_SCRIPT_TEMPLATE: str = """
+() => {
+    const spec = __SPEC__;
+    const matches = (rule) => {
+        let elements;
+        try {
+            elements = Array.from(document.querySelectorAll(rule.css));
+        } catch (e) {
+            return [];
+        }
+        if (rule.text === null) {
+            return elements;
+        }
+        const needle = rule.text.toLowerCase();
+        return elements.filter((el) => (el.textContent || '').toLowerCase().includes(needle));
+    };
+    const label = (rule) => rule.text === null ? rule.css : `${rule.css}:has-text("${rule.text}")`;
+
+    const priceTexts = [];
+    for (const rule of spec.price) {
+        const found = matches(rule);
+        if (found.length > 0) {
+            priceTexts.push([rule.css, found[0].innerText || found[0].textContent || '']);
+        }
+    }
+    const unavailable = spec.unavailable.filter((rule) => matches(rule).length > 0).map(label);
+    const available = spec.available.filter((rule) => matches(rule).length > 0).map(label);
+
+    const jsonLd = Array.from(document.querySelectorAll('script[type="application/ld+json"]'))
+        .map((script) => script.textContent);
+    const state = {};
+    for (const name of spec.variables) {
+        try {
+            if (window[name] !== undefined) {
+                state[name] = JSON.stringify(window[name]);
+            }
+        } catch (e) {}
+    }
+    return {priceTexts, unavailable, available, jsonLd, state};
+}
+"""
+
+
+@dataclass
+class ExtractionResult:
+    """Values read from a page, plus whether they are complete enough to trust."""
+    price: Optional[float]
+    in_stock: bool
+    # True when structured data or an unavailable or available rule gave the stock state
+    availability_found: bool
+    currency: Optional[str] = None
+    # Which sources produced the values, e.g. "structured" or "unavailable:#outOfStock"
+    signals: list[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        """
+        An in-stock result needs a price; an out-of-stock result needs an explicit unavailable signal.
+        """
+        if not self.availability_found:
+            return False
+        return self.price is not None or not self.in_stock
+
+
+def parse_price(price_text: str) -> float:
+    """
+    Convert a displayed price such as "$1,999.99" to a float.
+
+    Raises:
+        ValueError: If the text is not a price
+    """
+    return float(price_text.replace('$', '').replace(',', '').strip())
+
+
+def _build_result(
+    offer: Optional[StructuredOffer],
+    price_texts: list[tuple[str, str]],
+    unavailable: list[str],
+    available: list[str]
+) -> ExtractionResult:
+    """
+    Combine structured data with selector matches, preferring the structured values.
+
+    Args:
+        offer: Structured data, if any
+        price_texts: (css, text) for each price rule that matched, in rule order
+        unavailable: Labels of the unavailable rules that matched
+        available: Labels of the available rules that matched
+    """
+    if offer is not None and offer.complete:
+        return ExtractionResult(price=offer.price, in_stock=offer.in_stock, availability_found=True,
+                                currency=offer.currency, signals=['structured'])
+
+    signals: list[str] = []
+    price: Optional[float] = offer.price if offer is not None else None
+    currency: Optional[str] = offer.currency if offer is not None else None
+    if price is not None:
+        signals.append('structured:price')
+    else:
+        for css, text in price_texts:
+            try:
+                price = parse_price(text)
+                signals.append(f'price:{css}')
+                break
+            except ValueError as e:
+                print(f"Failed to extract price with selector {css}: {str(e)}")
+
+    if offer is not None and offer.in_stock is not None:
+        signals.append('structured:availability')
+        return ExtractionResult(price, offer.in_stock, True, currency, signals)
+    if unavailable:
+        signals.extend(f'unavailable:{label}' for label in unavailable)
+        return ExtractionResult(price, False, True, currency, signals)
+    if available:
+        signals.extend(f'available:{label}' for label in available)
+        return ExtractionResult(price, True, True, currency, signals)
+    return ExtractionResult(price, False, False, currency, signals)
+
+
+def _matches(document: lxml.html.HtmlElement, rule: SelectorRule) -> list[lxml.html.HtmlElement]:
+    try:
+        elements = document.cssselect(rule.css)
+    except SelectorError as e:
+        print(f"Invalid selector {rule.css}: {str(e)}")
+        return []
+    if rule.text is None:
+        return elements
+    needle = rule.text.lower()
+    return [element for element in elements if needle in element.text_content().lower()]
+
+
+def extract_from_html(html: str, spec: ExtractionSpec) -> Optional[ExtractionResult]:
+    """
+    Read price and availability from server-rendered HTML with a single parse.
+
+    Args:
+        html: Page source
+        spec: What to read
+
+    Returns:
+        ExtractionResult, or None if the HTML could not be parsed
+    """
+    try:
+        document = lxml.html.fromstring(html)
+    except (ParserError, ValueError) as e:
+        print(f"Failed to parse HTML: {str(e)}")
+        return None
+
+    offer = extract_structured_from_document(document, spec.embedded_state_rules)
+    if offer is not None and offer.complete:
+        return _build_result(offer, [], [], [])
+
+    price_texts: list[tuple[str, str]] = []
+    for rule in spec.price_rules:
+        elements = _matches(document, rule)
+        if elements:
+            price_texts.append((rule.css, elements[0].text_content()))
+    unavailable = [rule.playwright_selector for rule in spec.unavailable_rules if _matches(document, rule)]
+    available = [rule.playwright_selector for rule in spec.available_rules if _matches(document, rule)]
+    return _build_result(offer, price_texts, unavailable, available)
+
+
+def _result_from_payload(payload: Any, spec: ExtractionSpec) -> ExtractionResult:
+    payload = payload if isinstance(payload, dict) else {}
+    offer = offer_from_page_payload(payload.get('jsonLd') or [], payload.get('state') or {},
+                                    spec.embedded_state_rules)
+    price_texts = [(css, text) for css, text in payload.get('priceTexts') or []]
+    return _build_result(offer, price_texts, payload.get('unavailable') or [], payload.get('available') or [])
+
+
+def extract_from_page(page: "Page", spec: ExtractionSpec) -> ExtractionResult:
+    """
+    Read price and availability from a live page in one page.evaluate round-trip.
+
+    Args:
+        page: Playwright page object
+        spec: What to read
+
+    Returns:
+        ExtractionResult
+
+    Raises:
+        playwright.sync_api.Error: If the page could not be evaluated
+    """
+    return _result_from_payload(page.evaluate(spec.page_script), spec)
+
+
+async def extract_from_page_async(page: "AsyncPage", spec: ExtractionSpec) -> ExtractionResult:
+    """
+    Async counterpart of extract_from_page.
+    """
+    return _result_from_payload(await page.evaluate(spec.page_script), spec)
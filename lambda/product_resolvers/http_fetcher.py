@@ -0,0 +1,175 @@
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from models.store import Store
+from observability.metrics import log_event, timed
+from product_resolvers.browser_pool import DEFAULT_USER_AGENT
+
+# HTTP configuration
+HTTP_TIMEOUT_SECONDS: float = 10.0
+HTTP_POOL_CONNECTIONS: int = 10
+HTTP_POOL_MAXSIZE: int = 32
+DEFAULT_HEADERS: dict[str, str] = {
+    'User-Agent': DEFAULT_USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+# Status codes and page text that mean we were served a bot check instead of the product
+BOT_WALL_STATUS_CODES: frozenset[int] = frozenset({403, 429, 503})
+# Subset that asks us to slow down rather than prove we are human
+RATE_LIMIT_STATUS_CODES: frozenset[int] = frozenset({429, 503})
+BOT_WALL_MARKERS: tuple[str, ...] = (
+    'captcha',
+    'robot check',
+    'are you a human',
+    'verify you are human',
+    'unusual traffic',
+    'access denied',
+)
+
+
+class FetchTier(str, Enum):
+    """How a product page was fetched."""
+    HTTP = "HTTP"
+    BROWSER = "BROWSER"
+
+
+class BlockSignal(str, Enum):
+    """How a retailer pushed back on a request."""
+    RATE_LIMITED = "RATE_LIMITED"
+    CAPTCHA = "CAPTCHA"
+
+
+@dataclass
+class HttpPage:
+    url: str
+    status_code: int
+    html: str
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session, creating it on first use.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+
+def fetch_page(url: str, timeout: float = HTTP_TIMEOUT_SECONDS, store: Optional[Store] = None) -> Optional[HttpPage]:
+    """
+    Fetch a page with a plain HTTP GET.
+
+    Args:
+        url: Page URL
+        timeout: Request timeout in seconds
+        store: Store the fetch is timed under
+
+    Returns:
+        HttpPage, or None if the request failed
+    """
+    with timed('http.fetch', store) as span:
+        try:
+            response = get_session().get(url, timeout=timeout)
+        except requests.RequestException as e:
+            span.fail(e)
+            log_event('http_error', store=store.name if store is not None else None, url=url, error=str(e))
+            return None
+        span.bytes = len(response.content)
+        return HttpPage(url=response.url, status_code=response.status_code, html=response.text)
+
+
+def detect_block(status_code: Optional[int], html: str, extra_markers: tuple[str, ...] = ()) -> Optional[BlockSignal]:
+    """
+    Classify a response that is a bot check rather than the product page.
+
+    Args:
+        status_code: HTTP status, if known
+        html: Response body
+        extra_markers: Store-specific lowercase text markers
+
+    Returns:
+        The kind of block, or None for a normal page
+    """
+    if status_code in RATE_LIMIT_STATUS_CODES:
+        return BlockSignal.RATE_LIMITED
+    if status_code in BOT_WALL_STATUS_CODES:
+        return BlockSignal.CAPTCHA
+    text = html.lower()
+    if any(marker in text for marker in BOT_WALL_MARKERS + extra_markers):
+        return BlockSignal.CAPTCHA
+    return None
+
+
+class FetchTierTracker:
+    """
+    Remembers which tier served each store. After fallback_threshold
+    consecutive HTTP misses a store goes straight to the browser, re-probing
+    HTTP every reprobe_interval resolutions in case the store changed.
+    """
+
+    def __init__(self, fallback_threshold: int = 3, reprobe_interval: int = 25) -> None:
+        self.fallback_threshold: int = fallback_threshold
+        self.reprobe_interval: int = reprobe_interval
+        self._consecutive_fallbacks: dict[Store, int] = {}
+        self._skipped: dict[Store, int] = {}
+        self._counts: dict[Store, dict[FetchTier, int]] = {}
+        self._lock = threading.Lock()
+
+    def should_try_http(self, store: Store) -> bool:
+        with self._lock:
+            if self._consecutive_fallbacks.get(store, 0) < self.fallback_threshold:
+                return True
+            skipped = self._skipped.get(store, 0) + 1
+            if skipped >= self.reprobe_interval:
+                self._skipped[store] = 0
+                return True
+            self._skipped[store] = skipped
+            return False
+
+    def record(self, store: Store, tier: FetchTier, http_attempted: bool = True) -> None:
+        """
+        Record the tier that produced a result.
+
+        Args:
+            store: Store that was resolved
+            tier: Tier that produced the result
+            http_attempted: Whether an HTTP attempt preceded a browser result
+        """
+        with self._lock:
+            store_counts = self._counts.setdefault(store, {})
+            store_counts[tier] = store_counts.get(tier, 0) + 1
+            if tier == FetchTier.HTTP:
+                self._consecutive_fallbacks[store] = 0
+                self._skipped[store] = 0
+            elif http_attempted:
+                self._consecutive_fallbacks[store] = self._consecutive_fallbacks.get(store, 0) + 1
+
+    def summary(self) -> dict[Store, dict[FetchTier, int]]:
+        with self._lock:
+            return {store: dict(counts) for store, counts in self._counts.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._consecutive_fallbacks.clear()
+            self._skipped.clear()
+            self._counts.clear()
+
+
+# Kept at module scope so warm Lambda invocations keep what they learned
+fetch_tier_tracker = FetchTierTracker()
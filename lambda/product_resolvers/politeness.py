@@ -0,0 +1,231 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields, replace
+from typing import AsyncIterator, Awaitable, Callable, Optional
+from models.store import Store
+from product_resolvers.base_resolver import BaseResolver
+from product_resolvers.http_fetcher import BlockSignal
+
+# Rounding slack so a refill that lands a hair under one token still counts
+TOKEN_EPSILON = 1e-9
+
+
+@dataclass(frozen=True)
+class PolitenessPolicy:
+    """How hard one retailer may be hit."""
+    requests_per_second: float = 1.0
+    # Requests that may start back to back after an idle spell
+    burst: int = 2
+    max_concurrency: int = 3
+    # Rate multiplier applied on every block
+    backoff_factor: float = 0.5
+    min_requests_per_second: float = 0.05
+    # Whole-store pause after a block, doubled for each consecutive block
+    cooldown_seconds: float = 5.0
+    max_cooldown_seconds: float = 120.0
+    # Fraction of requests_per_second regained per clean response
+    recovery_step: float = 0.1
+
+
+DEFAULT_POLITENESS_POLICIES: dict[Store, PolitenessPolicy] = {
+    Store.AMAZON: PolitenessPolicy(requests_per_second=0.5, burst=2, max_concurrency=2),
+    Store.NEWEGG: PolitenessPolicy(requests_per_second=1.0, burst=3, max_concurrency=3),
+    Store.CANADA_COMPUTERS: PolitenessPolicy(requests_per_second=1.0, burst=3, max_concurrency=3),
+}
+
+
+class StoreThrottle:
+    """
+    Token bucket plus concurrency cap for one store, adapted with AIMD: each
+    block halves the rate and the cap and pauses the store, each clean
+    response wins back a step of rate and one slot of concurrency.
+    """
+
+    def __init__(self, policy: PolitenessPolicy, clock: Callable[[], float] = time.monotonic) -> None:
+        self.policy: PolitenessPolicy = policy
+        self._clock = clock
+        self.rate: float = policy.requests_per_second
+        self.concurrency: int = policy.max_concurrency
+        self.in_flight: int = 0
+        self.consecutive_blocks: int = 0
+        self.blocks: int = 0
+        self._tokens: float = float(policy.burst)
+        self._updated: float = clock()
+        self._blocked_until: float = 0.0
+        self._slot_freed: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _condition(self) -> asyncio.Condition:
+        # asyncio primitives belong to one loop; learned pacing outlives it across invocations
+        loop = asyncio.get_running_loop()
+        if self._slot_freed is None or self._loop is not loop:
+            self._slot_freed = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._slot_freed
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(float(self.policy.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take a token if the store is not cooling down and one is available.
+
+        Returns:
+            0 when a token was taken, otherwise the seconds to wait before trying again
+        """
+        now = self._clock()
+        self._refill(now)
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._tokens >= 1 - TOKEN_EPSILON:
+            self._tokens = max(0.0, self._tokens - 1)
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    async def acquire(self, sleep: Callable[[float], Awaitable[None]] = asyncio.sleep) -> None:
+        """
+        Wait for a concurrency slot and a token.
+        """
+        condition = self._condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.concurrency)
+            self.in_flight += 1
+        try:
+            while True:
+                wait = self.reserve()
+                if wait <= 0:
+                    return
+                await sleep(wait)
+        except BaseException:
+            await self.abandon()
+            raise
+
+    async def release(self, signal: Optional[BlockSignal] = None) -> None:
+        """
+        Give back a slot and adapt to how the retailer answered.
+
+        Args:
+            signal: Block seen by the request, or None if it went through
+        """
+        if signal is None:
+            self.consecutive_blocks = 0
+            self.rate = min(self.policy.requests_per_second,
+                            self.rate + self.policy.requests_per_second * self.policy.recovery_step)
+            self.concurrency = min(self.policy.max_concurrency, self.concurrency + 1)
+        else:
+            self.consecutive_blocks += 1
+            self.blocks += 1
+            self.rate = max(self.policy.min_requests_per_second, self.rate * self.policy.backoff_factor)
+            self.concurrency = max(1, self.concurrency // 2)
+            cooldown = min(self.policy.max_cooldown_seconds,
+                           self.policy.cooldown_seconds * 2 ** (self.consecutive_blocks - 1))
+            now = self._clock()
+            self._refill(now)
+            self._tokens = 0.0
+            self._blocked_until = max(self._blocked_until, now + cooldown)
+        await self.abandon()
+
+    async def abandon(self) -> None:
+        """
+        Give back a slot without adapting, for requests that never got an answer.
+        """
+        condition = self._condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+
+class PolitenessScheduler:
+    """
+    Per-store throttles shared by every resolution. A store that is cooling
+    down holds no global slot while it waits, so other stores use the
+    capacity it gave up.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[dict[Store, PolitenessPolicy]] = None,
+        default_policy: PolitenessPolicy = PolitenessPolicy(),
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Args:
+            policies: Policy per store; stores not listed use default_policy
+            default_policy: Fallback policy
+            clock: Monotonic clock in seconds
+        """
+        self.policies: dict[Store, PolitenessPolicy] = dict(DEFAULT_POLITENESS_POLICIES if policies is None else policies)
+        self.default_policy: PolitenessPolicy = default_policy
+        self._clock = clock
+        self._throttles: dict[Store, StoreThrottle] = {}
+
+    def throttle(self, store: Store) -> StoreThrottle:
+        if store not in self._throttles:
+            self._throttles[store] = StoreThrottle(self.policies.get(store, self.default_policy), self._clock)
+        return self._throttles[store]
+
+    def reset(self) -> None:
+        self._throttles.clear()
+
+    @asynccontextmanager
+    async def slot(self, resolver: BaseResolver) -> AsyncIterator[None]:
+        """
+        Hold a paced slot for one resolution, then feed its block signal back to the store.
+        """
+        throttle = self.throttle(resolver.store_name)
+        await throttle.acquire()
+        try:
+            yield
+        except BaseException:
+            await throttle.abandon()
+            raise
+        await throttle.release(resolver.block_signal)
+        if resolver.block_signal is not None:
+            print(f"{resolver.store_name.name} pushed back ({resolver.block_signal.value}); "
+                  f"pacing at {throttle.rate:.2f} req/s with {throttle.concurrency} in flight")
+
+    def summary(self) -> dict[Store, dict[str, float]]:
+        return {
+            store: {'rate': throttle.rate, 'concurrency': throttle.concurrency, 'blocks': throttle.blocks}
+            for store, throttle in self._throttles.items()
+        }
+
+
+def policies_from_env() -> dict[Store, PolitenessPolicy]:
+    """
+    Default policies overridden by POLITENESS_POLICIES, a JSON object keyed by
+    store name, e.g. {"AMAZON": {"requests_per_second": 0.25}}.
+
+    Raises:
+        ValueError: If a store or field name is unknown
+    """
+    policies = dict(DEFAULT_POLITENESS_POLICIES)
+    overrides = json.loads(os.getenv('POLITENESS_POLICIES', '{}'))
+    known_fields = {policy_field.name for policy_field in fields(PolitenessPolicy)}
+    for store_name, values in overrides.items():
+        if store_name not in Store.__members__:
+            raise ValueError(f"Unknown store {store_name} in POLITENESS_POLICIES")
+        unknown = set(values) - known_fields
+        if unknown:
+            raise ValueError(f"Unknown politeness settings for {store_name}: {sorted(unknown)}")
+        store = Store[store_name]
+        policies[store] = replace(policies.get(store, PolitenessPolicy()), **values)
+    return policies
+
+
+_politeness_scheduler: Optional[PolitenessScheduler] = None
+
+
+def get_politeness_scheduler() -> PolitenessScheduler:
+    """
+    Return the process-wide scheduler so warm invocations keep the pacing they learned.
+    """
+    global _politeness_scheduler
+    if _politeness_scheduler is None:
+        _politeness_scheduler = PolitenessScheduler(policies_from_env())
+    return _politeness_scheduler
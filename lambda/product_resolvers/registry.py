@@ -0,0 +1,60 @@
+import importlib
+from typing import TYPE_CHECKING, Iterable, Optional
+from catalog.catalog import CatalogEntry
+from models.store import Store
+
+if TYPE_CHECKING:
+    from product_resolvers.base_resolver import BaseResolver
+
+# "module:Class" per store; a resolver module is imported only when its store appears in the catalog
+RESOLVER_CLASSES: dict[Store, str] = {
+    Store.AMAZON: 'product_resolvers.amazon_resolver:AmazonResolver',
+    Store.NEWEGG: 'product_resolvers.newegg_resolver:NeweggResolver',
+    Store.CANADA_COMPUTERS: 'product_resolvers.cc_resolver:CanadaComputersResolver',
+}
+
+_loaded: dict[Store, type["BaseResolver"]] = {}
+
+
+def resolver_class_for(store: Store) -> Optional[type["BaseResolver"]]:
+    """
+    Import and return the resolver class registered for a store.
+
+    Args:
+        store: Retailer
+
+    Returns:
+        Resolver class, or None if no resolver is registered
+    """
+    if store not in _loaded:
+        path = RESOLVER_CLASSES.get(store)
+        if path is None:
+            return None
+        module_name, _, class_name = path.partition(':')
+        _loaded[store] = getattr(importlib.import_module(module_name), class_name)
+    return _loaded[store]
+
+
+def resolvers_for_entries(entries: Iterable[CatalogEntry]) -> list["BaseResolver"]:
+    """
+    Build one resolver per (product, store) pair in the catalog.
+
+    Args:
+        entries: Catalog entries
+
+    Returns:
+        List of resolvers
+    """
+    resolvers: list["BaseResolver"] = []
+    for entry in entries:
+        for store, url in entry.urls.items():
+            resolver_class = resolver_class_for(store)
+            if resolver_class is None:
+                print(f"No resolver for store {store.name}, skipping {entry.product_id}")
+                continue
+            resolvers.append(resolver_class(
+                product_id=entry.product_id,
+                product_url=url,
+                product_title=entry.title
+            ))
+    return resolvers
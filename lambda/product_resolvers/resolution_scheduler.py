@@ -0,0 +1,174 @@
+import asyncio
+import os
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Iterable, Optional
+from models.product import Product
+from models.store import Store
+from observability.metrics import log_event
+from product_resolvers.base_resolver import BaseResolver
+from product_resolvers.browser_pool import AsyncBrowserPool
+from product_resolvers.circuit_breaker import BreakerBoard, get_breaker_board
+from product_resolvers.politeness import PolitenessScheduler, get_politeness_scheduler
+
+# Default concurrency limits
+DEFAULT_GLOBAL_CONCURRENCY: int = 8
+DEFAULT_PER_STORE_CONCURRENCY: int = 3
+
+@dataclass
+class ConcurrencyLimits:
+    """Upper bounds on simultaneously open pages."""
+    global_limit: int = DEFAULT_GLOBAL_CONCURRENCY
+    default_per_store: int = DEFAULT_PER_STORE_CONCURRENCY
+    per_store: dict[Store, int] = field(default_factory=dict)
+
+    def for_store(self, store: Store) -> int:
+        return self.per_store.get(store, self.default_per_store)
+
+    @classmethod
+    def from_env(cls) -> "ConcurrencyLimits":
+        """
+        Limits from GLOBAL_CONCURRENCY and PER_STORE_CONCURRENCY, falling back to the defaults.
+        """
+        return cls(
+            global_limit=int(os.getenv('GLOBAL_CONCURRENCY', DEFAULT_GLOBAL_CONCURRENCY)),
+            default_per_store=int(os.getenv('PER_STORE_CONCURRENCY', DEFAULT_PER_STORE_CONCURRENCY))
+        )
+
+
+class ResolutionScheduler:
+    """
+    Runs many resolvers concurrently on one shared async browser, bounded by a
+    global page limit and a per-store page limit, and optionally paced per
+    retailer by a PolitenessScheduler. With a BreakerBoard, products whose
+    store or URL circuit is open are returned as skipped without a request.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[ConcurrencyLimits] = None,
+        browser_pool_factory: Callable[[], AsyncBrowserPool] = AsyncBrowserPool,
+        politeness: Optional[PolitenessScheduler] = None,
+        breakers: Optional[BreakerBoard] = None
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            limits: Concurrency limits; read from the environment when omitted
+            browser_pool_factory: Builds the browser pool for each run
+            politeness: Per-retailer pacing; requests are not paced when omitted
+            breakers: Per-store and per-URL circuit breakers; nothing is skipped when omitted
+        """
+        self.limits: ConcurrencyLimits = limits or ConcurrencyLimits.from_env()
+        self.browser_pool_factory: Callable[[], AsyncBrowserPool] = browser_pool_factory
+        self.politeness: Optional[PolitenessScheduler] = politeness
+        self.breakers: Optional[BreakerBoard] = breakers
+
+    async def iter_results(self, resolvers: Iterable[BaseResolver]) -> AsyncIterator[Product]:
+        """
+        Resolve every product and yield each result as soon as it completes.
+
+        Args:
+            resolvers: Resolvers to run
+
+        Yields:
+            Product objects in completion order
+        """
+        resolvers = list(resolvers)
+        if not resolvers:
+            return
+
+        global_semaphore = asyncio.Semaphore(self.limits.global_limit)
+        store_semaphores: dict[Store, asyncio.Semaphore] = {}
+        for resolver in resolvers:
+            if resolver.store_name not in store_semaphores:
+                store_semaphores[resolver.store_name] = asyncio.Semaphore(
+                    self.limits.for_store(resolver.store_name))
+
+        async with self.browser_pool_factory() as browser_pool:
+            async def run(resolver: BaseResolver) -> Product:
+                paced = self.politeness.slot(resolver) if self.politeness is not None else nullcontext()
+                # Take the store slot and wait out pacing first so one slow store cannot hold global slots
+                async with store_semaphores[resolver.store_name]:
+                    # Checked once the store slot is ours, so failures earlier in this sweep count
+                    if self.breakers is not None and not self.breakers.allow(resolver.store_name, resolver.product_url):
+                        return resolver.skipped_product()
+                    async with paced:
+                        async with global_semaphore:
+                            try:
+                                product = await resolver.resolve_async(browser_pool)
+                            except Exception as e:
+                                # One broken page must not abort the sweep and lose every result so far
+                                log_event('resolve_error', store=resolver.store_name.name,
+                                          url=resolver.product_url, error=repr(e))
+                                product = resolver.failed_product()
+                    if self.breakers is not None:
+                        self.breakers.record(product)
+                    return product
+
+            tasks = [asyncio.create_task(run(resolver)) for resolver in resolvers]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def resolve_all(
+        self,
+        resolvers: Iterable[BaseResolver],
+        on_result: Optional[Callable[[Product], None]] = None
+    ) -> list[Product]:
+        """
+        Resolve every product concurrently.
+
+        Args:
+            resolvers: Resolvers to run
+            on_result: Optional callback invoked with each product as it completes
+
+        Returns:
+            List of Product objects in completion order
+        """
+        products: list[Product] = []
+        async for product in self.iter_results(resolvers):
+            if on_result is not None:
+                on_result(product)
+            products.append(product)
+        return products
+
+    def run(
+        self,
+        resolvers: Iterable[BaseResolver],
+        on_result: Optional[Callable[[Product], None]] = None
+    ) -> list[Product]:
+        """
+        Blocking wrapper around resolve_all for synchronous callers such as the Lambda handler.
+        """
+        return asyncio.run(self.resolve_all(resolvers, on_result))
+
+
+def resolve_concurrently(
+    resolvers: Iterable[BaseResolver],
+    limits: Optional[ConcurrencyLimits] = None,
+    on_result: Optional[Callable[[Product], None]] = None,
+    politeness: Optional[PolitenessScheduler] = None,
+    breakers: Optional[BreakerBoard] = None
+) -> list[Product]:
+    """
+    Resolve products concurrently from synchronous code.
+
+    Args:
+        resolvers: Resolvers to run
+        limits: Concurrency limits; read from the environment when omitted
+        on_result: Optional callback invoked with each product as it completes
+        politeness: Per-retailer pacing; the process-wide scheduler when omitted
+        breakers: Circuit breakers; the process-wide board when omitted
+
+    Returns:
+        List of Product objects in completion order
+    """
+    scheduler = ResolutionScheduler(limits, politeness=politeness or get_politeness_scheduler(),
+                                    breakers=breakers or get_breaker_board())
+    return scheduler.run(resolvers, on_result)
@@ -0,0 +1,119 @@
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page, Route
+    from playwright.async_api import Page as AsyncPage, Route as AsyncRoute
+
+# Resource types that are never needed to read a price or stock state
+HEAVY_RESOURCE_TYPES: frozenset[str] = frozenset({
+    'image',
+    'media',
+    'font',
+    'stylesheet',
+})
+
+# Ad, analytics and beacon hosts seen across retailer pages
+TRACKER_DOMAINS: frozenset[str] = frozenset({
+    'google-analytics.com',
+    'googletagmanager.com',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'doubleclick.net',
+    'facebook.net',
+    'facebook.com',
+    'bat.bing.com',
+    'scorecardresearch.com',
+    'criteo.com',
+    'criteo.net',
+    'nr-data.net',
+    'newrelic.com',
+    'hotjar.com',
+    'adobedtm.com',
+    'demdex.net',
+    'omtrdc.net',
+    'quantserve.com',
+    'taboola.com',
+    'outbrain.com',
+})
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """
+    Decides which requests a page may make. Blocked requests are aborted
+    before they leave the browser.
+    """
+    blocked_resource_types: frozenset[str] = HEAVY_RESOURCE_TYPES
+    blocked_domains: frozenset[str] = field(default=TRACKER_DOMAINS)
+
+    def with_blocked_domains(self, *domains: str) -> "RoutePolicy":
+        """
+        Return a copy of this policy that also blocks the given domains.
+        """
+        return RoutePolicy(
+            blocked_resource_types=self.blocked_resource_types,
+            blocked_domains=self.blocked_domains | frozenset(domains)
+        )
+
+    @property
+    def blocks_anything(self) -> bool:
+        return bool(self.blocked_resource_types or self.blocked_domains)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """
+        Check whether a request should be aborted.
+
+        Args:
+            resource_type: Playwright resource type such as "image" or "script"
+            url: Request URL
+
+        Returns:
+            True if the request should be aborted
+        """
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = (urlsplit(url).hostname or '').lower()
+        while host:
+            if host in self.blocked_domains:
+                return True
+            _, _, host = host.partition('.')
+        return False
+
+    def _handle_route(self, route: "Route") -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def _handle_route_async(self, route: "AsyncRoute") -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def apply(self, page: "Page") -> None:
+        """
+        Install this policy on a page before navigation.
+        """
+        if self.blocks_anything:
+            page.route("**/*", self._handle_route)
+
+    async def apply_async(self, page: "AsyncPage") -> None:
+        """
+        Async counterpart of apply.
+        """
+        if self.blocks_anything:
+            await page.route("**/*", self._handle_route_async)
+
+
+# Block heavy resources and common trackers
+DEFAULT_ROUTE_POLICY: RoutePolicy = RoutePolicy()
+# Let every request through, matching a normal browser
+ALLOW_ALL_POLICY: RoutePolicy = RoutePolicy(
+    blocked_resource_types=frozenset(),
+    blocked_domains=frozenset()
+)
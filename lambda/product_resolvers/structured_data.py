@@ -0,0 +1,272 @@
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+import lxml.html
+
+# schema.org availability values (with or without the schema.org prefix)
+IN_STOCK_AVAILABILITY: frozenset[str] = frozenset({
+    'instock',
+    'limitedavailability',
+    'onlineonly',
+})
+OUT_OF_STOCK_AVAILABILITY: frozenset[str] = frozenset({
+    'outofstock',
+    'soldout',
+    'discontinued',
+    'instoreonly',
+    'backorder',
+    'preorder',
+    'presale',
+})
+
+@dataclass(frozen=True)
+class EmbeddedStateRule:
+    """
+    Where a retailer keeps product state in a page-level JavaScript object.
+    The object is searched depth-first for the first matching key.
+    """
+    # Global variable name, e.g. "__initialState__" for window.__initialState__
+    variable: str
+    price_keys: tuple[str, ...]
+    in_stock_keys: tuple[str, ...]
+    currency_keys: tuple[str, ...] = ()
+
+
+@dataclass
+class StructuredOffer:
+    """Price and stock state read from structured data."""
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    in_stock: Optional[bool] = None
+
+    @property
+    def complete(self) -> bool:
+        """
+        Mirrors ExtractionResult.complete: availability is known, and an in-stock offer has a price.
+        """
+        if self.in_stock is None:
+            return False
+        return self.price is not None or not self.in_stock
+
+
+def _to_price(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(str(value).replace('$', '').replace(',', '').strip())
+    except ValueError:
+        return None
+
+
+def _to_in_stock(value: Any) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value > 0
+    if isinstance(value, str):
+        normalized = value.rsplit('/', 1)[-1].strip().lower()
+        if normalized in IN_STOCK_AVAILABILITY or normalized == 'true':
+            return True
+        if normalized in OUT_OF_STOCK_AVAILABILITY or normalized == 'false':
+            return False
+    return None
+
+
+def _walk(node: Any) -> Iterator[dict]:
+    """
+    Yield every JSON object in a document, depth-first.
+    """
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+
+
+def _is_type(node: dict, type_name: str) -> bool:
+    node_type = node.get('@type')
+    if isinstance(node_type, list):
+        return type_name in node_type
+    return node_type == type_name
+
+
+def _offer_from_offers(offers: Any) -> StructuredOffer:
+    """
+    Combine schema.org Offer/AggregateOffer entries: in stock if any offer is,
+    priced at the cheapest in-stock offer (or the cheapest offer otherwise).
+    """
+    if isinstance(offers, dict):
+        offers = [offers]
+    if not isinstance(offers, list):
+        return StructuredOffer()
+
+    parsed: list[tuple[Optional[float], Optional[bool], Optional[str]]] = []
+    for offer in offers:
+        if not isinstance(offer, dict):
+            continue
+        price = _to_price(offer.get('price', offer.get('lowPrice')))
+        if price is None and isinstance(offer.get('priceSpecification'), dict):
+            price = _to_price(offer['priceSpecification'].get('price'))
+        parsed.append((price, _to_in_stock(offer.get('availability')), offer.get('priceCurrency')))
+
+    result = StructuredOffer()
+    stock_states = [in_stock for _, in_stock, _ in parsed if in_stock is not None]
+    if stock_states:
+        result.in_stock = any(stock_states)
+    priced = [entry for entry in parsed if entry[0] is not None]
+    in_stock_priced = [entry for entry in priced if entry[1] is True]
+    candidates = in_stock_priced or priced
+    if candidates:
+        price, _, currency = min(candidates, key=lambda entry: entry[0])
+        result.price = price
+        result.currency = currency
+    return result
+
+
+def offer_from_json_ld(scripts: list[str]) -> Optional[StructuredOffer]:
+    """
+    Read the first schema.org Product offer from JSON-LD script bodies.
+
+    Args:
+        scripts: Text of each application/ld+json script
+
+    Returns:
+        StructuredOffer, or None if no Product with offers was found
+    """
+    for script in scripts:
+        try:
+            document = json.loads(script)
+        except (json.JSONDecodeError, TypeError):
+            continue
+        for node in _walk(document):
+            if _is_type(node, 'Product') and 'offers' in node:
+                return _offer_from_offers(node['offers'])
+    return None
+
+
+def _find_key(document: Any, keys: tuple[str, ...]) -> Any:
+    for node in _walk(document):
+        for key in keys:
+            if key in node and node[key] is not None:
+                return node[key]
+    return None
+
+
+def offer_from_embedded_state(state: Any, rule: EmbeddedStateRule) -> Optional[StructuredOffer]:
+    """
+    Read price and stock state from a retailer's embedded state object.
+
+    Args:
+        state: Parsed state object
+        rule: Keys to look for
+
+    Returns:
+        StructuredOffer, or None if neither price nor stock state was found
+    """
+    price = _to_price(_find_key(state, rule.price_keys))
+    in_stock = _to_in_stock(_find_key(state, rule.in_stock_keys))
+    if price is None and in_stock is None:
+        return None
+    currency = _find_key(state, rule.currency_keys) if rule.currency_keys else None
+    return StructuredOffer(price=price, currency=currency if isinstance(currency, str) else None,
+                           in_stock=in_stock)
+
+
+def _state_from_script(script: str, variable: str) -> Any:
+    """
+    Parse the object literal assigned to a global in an inline script, e.g.
+    window.__initialState__ = {...};
+    """
+    assignment = re.compile(re.escape(variable) + r"""['"]?\]?\s*=\s*(?=\{)""")
+    for match in assignment.finditer(script):
+        try:
+            state, _ = json.JSONDecoder().raw_decode(script, match.end())
+            return state
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def _merge(offers: list[StructuredOffer]) -> Optional[StructuredOffer]:
+    if not offers:
+        return None
+    merged = StructuredOffer()
+    for offer in offers:
+        if merged.price is None:
+            merged.price = offer.price
+            merged.currency = merged.currency or offer.currency
+        if merged.in_stock is None:
+            merged.in_stock = offer.in_stock
+    return merged
+
+
+def extract_structured_from_document(
+    document: lxml.html.HtmlElement,
+    embedded_state_rules: tuple[EmbeddedStateRule, ...] = ()
+) -> Optional[StructuredOffer]:
+    """
+    Read structured data from an already parsed HTML document.
+
+    Args:
+        document: Parsed HTML
+        embedded_state_rules: Retailer state objects to look for
+
+    Returns:
+        StructuredOffer combining JSON-LD and embedded state, or None if neither was present
+    """
+    json_ld = [script.text_content() for script in document.xpath('//script[@type="application/ld+json"]')]
+    states: dict[str, Any] = {}
+    if embedded_state_rules:
+        inline_scripts = [script.text_content() for script in document.xpath('//script[not(@src)]')]
+        for rule in embedded_state_rules:
+            for script in inline_scripts:
+                state = _state_from_script(script, rule.variable)
+                if state is not None:
+                    states[rule.variable] = state
+                    break
+    return _combine(json_ld, states, embedded_state_rules)
+
+
+def _combine(
+    json_ld: list[str],
+    states: dict[str, Any],
+    embedded_state_rules: tuple[EmbeddedStateRule, ...]
+) -> Optional[StructuredOffer]:
+    offers: list[StructuredOffer] = []
+    json_ld_offer = offer_from_json_ld(json_ld)
+    if json_ld_offer is not None:
+        offers.append(json_ld_offer)
+    for rule in embedded_state_rules:
+        if rule.variable in states:
+            state_offer = offer_from_embedded_state(states[rule.variable], rule)
+            if state_offer is not None:
+                offers.append(state_offer)
+    return _merge(offers)
+
+
+def offer_from_page_payload(
+    json_ld: list[str],
+    serialized_states: dict[str, str],
+    embedded_state_rules: tuple[EmbeddedStateRule, ...]
+) -> Optional[StructuredOffer]:
+    """
+    Read structured data collected inside a live page.
+
+    Args:
+        json_ld: Text of each application/ld+json script
+        serialized_states: JSON.stringify output of each embedded state object, keyed by variable
+        embedded_state_rules: Retailer state objects to look for
+
+    Returns:
+        StructuredOffer, or None if no structured data was found
+    """
+    states: dict[str, Any] = {}
+    for name, serialized in serialized_states.items():
+        try:
+            states[name] = json.loads(serialized)
+        except (json.JSONDecodeError, TypeError):
+            continue
+    return _combine(json_ld, states, embedded_state_rules)
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Iterable, Optional, TypeVar
+from models.product import Product
+from product_resolvers.base_resolver import BaseResolver
+from product_resolvers.browser_pool import (
+    DEFAULT_MAX_MEMORY_GROWTH_MB,
+    DEFAULT_MAX_PAGES_PER_BROWSER,
+    WarmAsyncBrowserPool,
+)
+from product_resolvers.circuit_breaker import BreakerBoard, get_breaker_board
+from product_resolvers.politeness import PolitenessScheduler, get_politeness_scheduler
+from product_resolvers.resolution_scheduler import ConcurrencyLimits, ResolutionScheduler
+
+T = TypeVar('T')
+
+# Module scope survives between invocations of a warm Lambda container
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_pool: Optional[WarmAsyncBrowserPool] = None
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+
+def run_warm(awaitable: Awaitable[T]) -> T:
+    """
+    Run a coroutine on the long-lived event loop that owns the warm browser.
+    """
+    return _event_loop().run_until_complete(awaitable)
+
+
+def warm_browser_pool() -> WarmAsyncBrowserPool:
+    """
+    Return the process-wide warm pool, configured from WARM_BROWSER_MAX_PAGES
+    and WARM_BROWSER_MAX_MEMORY_GROWTH_MB (0 disables the memory check).
+    """
+    global _pool
+    if _pool is None:
+        max_memory_growth_mb = int(os.getenv('WARM_BROWSER_MAX_MEMORY_GROWTH_MB', DEFAULT_MAX_MEMORY_GROWTH_MB))
+        _pool = WarmAsyncBrowserPool(
+            max_pages_per_browser=int(os.getenv('WARM_BROWSER_MAX_PAGES', DEFAULT_MAX_PAGES_PER_BROWSER)),
+            max_memory_growth_mb=max_memory_growth_mb or None
+        )
+    return _pool
+
+
+def start_warm_browser() -> None:
+    """
+    Launch Chromium ahead of the first invocation. A failure is logged and
+    left to the first run, which launches lazily.
+    """
+    try:
+        run_warm(warm_browser_pool().start())
+    except Exception as e:
+        print(f"Could not start warm Chromium: {str(e)}")
+
+
+def resolve_on_warm_browser(
+    resolvers: Iterable[BaseResolver],
+    limits: Optional[ConcurrencyLimits] = None,
+    on_result: Optional[Callable[[Product], None]] = None,
+    politeness: Optional[PolitenessScheduler] = None,
+    breakers: Optional[BreakerBoard] = None
+) -> list[Product]:
+    """
+    resolve_concurrently on the warm browser instead of a browser launched for this run.
+
+    Args:
+        resolvers: Resolvers to run
+        limits: Concurrency limits; read from the environment when omitted
+        on_result: Optional callback invoked with each product as it completes
+        politeness: Per-retailer pacing; the process-wide scheduler when omitted
+        breakers: Circuit breakers; the process-wide board when omitted
+
+    Returns:
+        List of Product objects in completion order
+    """
+    scheduler = ResolutionScheduler(limits, browser_pool_factory=warm_browser_pool,
+                                    politeness=politeness or get_politeness_scheduler(),
+                                    breakers=breakers or get_breaker_board())
+    return run_warm(scheduler.resolve_all(resolvers, on_result))
@@ -0,0 +1,116 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal
+from enum import Enum
+from typing import Iterable, Optional
+from models.product import Product
+
+# (part_id, store_id)
+StateKey = tuple[str, str]
+
+
+class TransitionKind(str, Enum):
+    FIRST_SEEN = "FIRST_SEEN"
+    RESTOCK = "RESTOCK"
+    SOLD_OUT = "SOLD_OUT"
+    PRICE_CHANGE = "PRICE_CHANGE"
+    UNCHANGED = "UNCHANGED"
+    # Not scraped, so there is nothing to compare or record
+    ERROR = "ERROR"
+
+
+@dataclass(frozen=True)
+class TransitionRule:
+    kind: TransitionKind
+    write: bool
+    notify: bool
+
+
+# (previous in_stock or None when first seen, current in_stock, price changed) -> rule
+TRANSITION_TABLE: dict[tuple[Optional[bool], bool, bool], TransitionRule] = {
+    (None, True, False): TransitionRule(TransitionKind.FIRST_SEEN, write=True, notify=True),
+    (None, False, False): TransitionRule(TransitionKind.FIRST_SEEN, write=True, notify=False),
+    (False, True, False): TransitionRule(TransitionKind.RESTOCK, write=True, notify=True),
+    (False, True, True): TransitionRule(TransitionKind.RESTOCK, write=True, notify=True),
+    (True, False, False): TransitionRule(TransitionKind.SOLD_OUT, write=True, notify=False),
+    (True, False, True): TransitionRule(TransitionKind.SOLD_OUT, write=True, notify=False),
+    (True, True, True): TransitionRule(TransitionKind.PRICE_CHANGE, write=True, notify=False),
+    (False, False, True): TransitionRule(TransitionKind.PRICE_CHANGE, write=True, notify=False),
+    (True, True, False): TransitionRule(TransitionKind.UNCHANGED, write=False, notify=False),
+    (False, False, False): TransitionRule(TransitionKind.UNCHANGED, write=False, notify=False),
+}
+ERROR_RULE = TransitionRule(TransitionKind.ERROR, write=False, notify=False)
+
+
+@dataclass(frozen=True)
+class Transition:
+    product: Product
+    # Stored state before this sweep; None when the product was first seen
+    previous: Optional[Product]
+    rule: TransitionRule
+
+    @property
+    def kind(self) -> TransitionKind:
+        return self.rule.kind
+
+
+@dataclass
+class TransitionPlan:
+    """Every transition in a sweep, with the writes and alerts they call for."""
+    transitions: list[Transition] = field(default_factory=list)
+    writes: list[Product] = field(default_factory=list)
+    # (product, previous state) pairs, as notify_restocks takes them
+    restocks: list[tuple[Product, Optional[Product]]] = field(default_factory=list)
+
+    def counts(self) -> dict[TransitionKind, int]:
+        return dict(Counter(transition.kind for transition in self.transitions))
+
+    def of_kind(self, kind: TransitionKind) -> list[Transition]:
+        return [transition for transition in self.transitions if transition.kind == kind]
+
+
+def state_key(product: Product) -> StateKey:
+    return product.id, product.store.name
+
+
+def _price(price) -> Optional[Decimal]:
+    # Stored prices come back as Decimal, fresh ones may be floats; str() keeps 1999.99 exact
+    if price is None or isinstance(price, Decimal):
+        return price
+    return Decimal(str(price))
+
+
+def rule_for(product: Product, previous: Optional[Product]) -> TransitionRule:
+    """
+    Look up the rule for one product given its stored state.
+    """
+    if not product.scraped:
+        return ERROR_RULE
+    if previous is None:
+        return TRANSITION_TABLE[(None, product.in_stock, False)]
+    price_changed = _price(product.price) != _price(previous.price)
+    return TRANSITION_TABLE[(previous.in_stock, product.in_stock, price_changed)]
+
+
+def plan_transitions(products: Iterable[Product], previous_by_key: dict[StateKey, Product]) -> TransitionPlan:
+    """
+    Classify a sweep against the stored state in one pass. Every store goes
+    through the same table, so a new retailer needs no changes here.
+
+    Args:
+        products: Freshly resolved products
+        previous_by_key: Stored state keyed by (part_id, store_id), e.g. from batch_get_items
+
+    Returns:
+        The plan: one transition per product, the states to write and the restocks to announce
+    """
+    plan = TransitionPlan()
+    for product in products:
+        previous = previous_by_key.get(state_key(product))
+        rule = rule_for(product, previous)
+        plan.transitions.append(Transition(product, previous, rule))
+        if rule.write:
+            plan.writes.append(product)
+        if rule.notify:
+            plan.restocks.append((product, previous))
+    return plan
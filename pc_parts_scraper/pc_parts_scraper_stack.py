@@ -15,6 +15,10 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# The adaptive schedule runs on a short tick and checks only what is due; without it every run checks everything
+POLL_SCHEDULE = os.getenv('POLL_SCHEDULE', 'dynamodb')
+POLL_TICK_MINUTES = int(os.getenv('POLL_TICK_MINUTES', '5' if POLL_SCHEDULE != 'none' else '60'))
+
 class PcPartsScraperStack(Stack):
 
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
@@ -48,6 +52,48 @@ class PcPartsScraperStack(Stack):
             environment={
                 "DISCORD_WEBHOOK_URL": discord_webhook_url,  # Pass URL directly
                 "DISCORD_WEBHOOK_URL_ARN": webhook_param.parameter_arn,  # Keep ARN for reference
+                # Product catalog: "file" reads catalog.json from the image, "dynamodb" reads CatalogTable
+                "CATALOG_SOURCE": os.getenv('CATALOG_SOURCE', 'file'),
+                # Split large catalogs into shards processed by async self-invocations
+                "FAN_OUT_ENABLED": os.getenv('FAN_OUT_ENABLED', 'false'),
+                "SHARD_SIZE": os.getenv('SHARD_SIZE', '50'),
+                # "batch" reads prior state then batch-writes changes; "conditional" uses one UpdateItem per product
+                "STATE_WRITE_MODE": os.getenv('STATE_WRITE_MODE', 'batch'),
+                # Append every observation to PriceHistoryTable
+                "PRICE_HISTORY_ENABLED": os.getenv('PRICE_HISTORY_ENABLED', 'true'),
+                # Announce price changes that are deals against the daily price history
+                "DEAL_ALERTS_ENABLED": os.getenv('DEAL_ALERTS_ENABLED', 'true'),
+                # Alerts go through OutboxTable; a digest replaces DIGEST_MIN_ITEMS or more alerts per channel
+                "OUTBOX_STORE": os.getenv('OUTBOX_STORE', 'dynamodb'),
+                "DIGEST_WINDOW_SECONDS": os.getenv('DIGEST_WINDOW_SECONDS', '0'),
+                "DIGEST_MIN_ITEMS": os.getenv('DIGEST_MIN_ITEMS', '5'),
+                # "none" sends every alert to the default webhook, "dynamodb" reads SubscriptionTable
+                "SUBSCRIPTION_SOURCE": os.getenv('SUBSCRIPTION_SOURCE', 'none'),
+                # How long warm invocations trust cached Parameter Store values
+                "CONFIG_CACHE_TTL_SECONDS": os.getenv('CONFIG_CACHE_TTL_SECONDS', '300'),
+                # Keep Chromium running between warm invocations, relaunching after this many pages or MB of growth
+                "WARM_BROWSER_ENABLED": os.getenv('WARM_BROWSER_ENABLED', 'false'),
+                "WARM_BROWSER_MAX_PAGES": os.getenv('WARM_BROWSER_MAX_PAGES', '500'),
+                "WARM_BROWSER_MAX_MEMORY_GROWTH_MB": os.getenv('WARM_BROWSER_MAX_MEMORY_GROWTH_MB', '512'),
+                # Pages resolved at once, overall and per store
+                "GLOBAL_CONCURRENCY": os.getenv('GLOBAL_CONCURRENCY', '8'),
+                "PER_STORE_CONCURRENCY": os.getenv('PER_STORE_CONCURRENCY', '3'),
+                # JSON overrides of per-store pacing, e.g. {"AMAZON": {"requests_per_second": 0.25}}
+                "POLITENESS_POLICIES": os.getenv('POLITENESS_POLICIES', '{}'),
+                # Skip a store or URL for BREAKER_RESET_SECONDS after this many consecutive failed scrapes
+                "BREAKER_STORE_FAILURES": os.getenv('BREAKER_STORE_FAILURES', '5'),
+                "BREAKER_URL_FAILURES": os.getenv('BREAKER_URL_FAILURES', '3'),
+                "BREAKER_RESET_SECONDS": os.getenv('BREAKER_RESET_SECONDS', '900'),
+                # Per-phase timings as JSON logs and CloudWatch EMF metrics under this namespace
+                "METRICS_NAMESPACE": os.getenv('METRICS_NAMESPACE', 'PcPartsScraper'),
+                "METRICS_LOG_SPANS": os.getenv('METRICS_LOG_SPANS', 'false'),
+                # "cprofile" or "pyinstrument" profiles the first invocation of each container
+                "PROFILE_INVOCATION": os.getenv('PROFILE_INVOCATION', 'none'),
+                # "dynamodb" gives each product and store its own next check in PollScheduleTable
+                "POLL_SCHEDULE": POLL_SCHEDULE,
+                "POLL_MIN_INTERVAL_SECONDS": os.getenv('POLL_MIN_INTERVAL_SECONDS', str(POLL_TICK_MINUTES * 60)),
+                "POLL_MAX_INTERVAL_SECONDS": os.getenv('POLL_MAX_INTERVAL_SECONDS', '21600'),
+                "POLL_MAX_PER_TICK": os.getenv('POLL_MAX_PER_TICK', '200'),
             },
             code=_lambda.DockerImageCode.from_ecr(
                 repository=stock_notifier_docker_image.repository,
@@ -75,6 +121,14 @@ class PcPartsScraperStack(Stack):
                 ]
             )
         )
+        # Allow the scheduled invocation to fan shards out to itself
+        stock_notifier_lambda.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["lambda:InvokeFunction"],
+                resources=[f"arn:aws:lambda:{self.region}:{self.account}:function:StockNotifierLambda"]
+            )
+        )
         # Stock DynamoDB table
         stock_dynamo_table = _dynamodb.Table(
             self,
@@ -90,21 +144,120 @@ class PcPartsScraperStack(Stack):
             ),
             billing_mode=_dynamodb.BillingMode.PAY_PER_REQUEST
         )
-        # CloudWatch event each minute
-        one_minute_event_rule = events.Rule(
+        # Product catalog table: PartId -> Title and per-store Urls map
+        catalog_dynamo_table = _dynamodb.Table(
+            self,
+            "CatalogTable",
+            table_name="CatalogTable",
+            partition_key=_dynamodb.Attribute(
+                name="PartId",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            billing_mode=_dynamodb.BillingMode.PAY_PER_REQUEST
+        )
+        catalog_dynamo_table.grant_read_data(stock_notifier_lambda)
+        # Price history: SeriesId is PartId#StoreId for raw points and PartId#StoreId#HOUR|DAY for rollups,
+        # Ts is epoch seconds; old rows expire through ExpiresAt
+        price_history_table = _dynamodb.Table(
+            self,
+            "PriceHistoryTable",
+            table_name="PriceHistoryTable",
+            partition_key=_dynamodb.Attribute(
+                name="SeriesId",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            sort_key=_dynamodb.Attribute(
+                name="Ts",
+                type=_dynamodb.AttributeType.NUMBER
+            ),
+            time_to_live_attribute="ExpiresAt",
+            billing_mode=_dynamodb.BillingMode.PAY_PER_REQUEST
+        )
+        price_history_table.grant_read_write_data(stock_notifier_lambda)
+        # Notification outbox: records stay in the sparse PendingIndex until delivered
+        outbox_table = _dynamodb.Table(
+            self,
+            "OutboxTable",
+            table_name="OutboxTable",
+            partition_key=_dynamodb.Attribute(
+                name="NotificationId",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            time_to_live_attribute="ExpiresAt",
+            billing_mode=_dynamodb.BillingMode.PAY_PER_REQUEST
+        )
+        outbox_table.add_global_secondary_index(
+            index_name="PendingIndex",
+            partition_key=_dynamodb.Attribute(
+                name="PendingChannel",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            sort_key=_dynamodb.Attribute(
+                name="CreatedAt",
+                type=_dynamodb.AttributeType.NUMBER
+            )
+        )
+        outbox_table.grant_read_write_data(stock_notifier_lambda)
+        # Subscriptions: PartId -> one item per subscriber, channel and store
+        subscription_table = _dynamodb.Table(
+            self,
+            "SubscriptionTable",
+            table_name="SubscriptionTable",
+            partition_key=_dynamodb.Attribute(
+                name="PartId",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            sort_key=_dynamodb.Attribute(
+                name="SubscriptionId",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            billing_mode=_dynamodb.BillingMode.PAY_PER_REQUEST
+        )
+        subscription_table.grant_read_data(stock_notifier_lambda)
+        # Subscriber channels name Parameter Store parameters that hold their webhook URLs
+        stock_notifier_lambda.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["ssm:GetParameter", "ssm:GetParameters"],
+                resources=[f"arn:aws:ssm:{self.region}:{self.account}:parameter/stock-notifier/webhooks/*"]
+            )
+        )
+        # Polling schedule: one item per PartId and StoreId; DueIndex orders every item by NextCheckAt
+        poll_schedule_table = _dynamodb.Table(
             self,
-            "HourlyRule",
-            schedule=events.Schedule.cron(
-                minute="0",
-                hour="*",
-                month="*",
-                day="*",
-                year="*"
+            "PollScheduleTable",
+            table_name="PollScheduleTable",
+            partition_key=_dynamodb.Attribute(
+                name="PartId",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            sort_key=_dynamodb.Attribute(
+                name="StoreId",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            billing_mode=_dynamodb.BillingMode.PAY_PER_REQUEST
+        )
+        poll_schedule_table.add_global_secondary_index(
+            index_name="DueIndex",
+            partition_key=_dynamodb.Attribute(
+                name="ScheduleBucket",
+                type=_dynamodb.AttributeType.STRING
+            ),
+            sort_key=_dynamodb.Attribute(
+                name="NextCheckAt",
+                type=_dynamodb.AttributeType.NUMBER
             )
         )
+        poll_schedule_table.grant_read_write_data(stock_notifier_lambda)
+        # CloudWatch event every POLL_TICK_MINUTES
+        poll_tick_rule = events.Rule(
+            self,
+            "PollTickRule",
+            schedule=events.Schedule.rate(Duration.minutes(POLL_TICK_MINUTES))
+        )
         # Connects Lambda to CloudWatch event
         stock_notifier_function = targets.LambdaFunction(stock_notifier_lambda)
-        one_minute_event_rule.add_target(stock_notifier_function)
+        poll_tick_rule.add_target(stock_notifier_function)
         # Give Lambda the permissions to read and write to DynamoDB
         stock_dynamo_table.grant_read_write_data(stock_notifier_lambda)
         # Give Lambda the permissions to pull images from ECR
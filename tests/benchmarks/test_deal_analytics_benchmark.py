@@ -0,0 +1,48 @@
+"""
+Benchmark for batch deal detection over a large catalog.
+
+Builds 10,000 series x 90 days of synthetic daily prices with gaps and
+times compute_stats plus find_deals over the whole matrix.
+
+Run with: python -m pytest -s tests/benchmarks/test_deal_analytics_benchmark.py
+"""
+import time
+
+import numpy as np
+
+from analytics.deals import DealCriteria, PriceMatrix, find_deals
+
+PRODUCTS = 10_000
+DAYS = 90
+ITERATIONS = 3
+BUDGET_SECONDS = 1.0
+
+
+def synthetic_matrix() -> PriceMatrix:
+    rng = np.random.default_rng(42)
+    base = rng.uniform(5_000, 200_000, size=(PRODUCTS, 1))
+    noise = rng.normal(1.0, 0.05, size=(PRODUCTS, DAYS))
+    prices = np.round(base * noise)
+    # About a fifth of the days have no observation
+    prices[rng.random((PRODUCTS, DAYS)) < 0.2] = np.nan
+    # Put a sharp drop on the last day of a few hundred products
+    dropped = rng.choice(PRODUCTS, size=300, replace=False)
+    prices[dropped, -1] = np.round(base[dropped, 0] * 0.6)
+    keys = [(f"PART-{i}", 'AMAZON') for i in range(PRODUCTS)]
+    return PriceMatrix(keys=keys, start=0, prices=prices)
+
+
+def test_find_deals_over_10k_products_by_90_days():
+    matrix = synthetic_matrix()
+    criteria = DealCriteria()
+
+    timings = []
+    for _ in range(ITERATIONS):
+        started = time.perf_counter()
+        deals = find_deals(matrix, criteria)
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    print(f"\nfind_deals on {PRODUCTS}x{DAYS}: best {best * 1000:.1f} ms, {len(deals)} candidates")
+    assert len(deals) >= 250
+    assert best < BUDGET_SECONDS
@@ -0,0 +1,68 @@
+"""
+Cold-start benchmark for the Lambda entry point.
+
+Imports handler in a fresh interpreter under -X importtime, reports the
+cumulative import cost of the handler and its heaviest dependencies, and
+checks that boto3, Playwright and requests stay out of the import path
+until a run actually needs them.
+
+Run with: python -m pytest -s tests/benchmarks/test_import_time_benchmark.py
+"""
+import os
+import subprocess
+import sys
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'lambda')
+ITERATIONS = 3
+BUDGET_SECONDS = 0.25
+# Loaded on first use, never by importing the handler
+DEFERRED_MODULES = ('boto3', 'botocore', 'playwright', 'requests', 'numpy')
+
+
+def import_handler() -> tuple[int, dict[str, int], list[str]]:
+    """
+    Import handler in a new interpreter.
+
+    Returns:
+        Cumulative handler import time in microseconds, the cumulative time of
+        each module handler imports directly, and the deferred modules that were loaded
+    """
+    probe = (
+        "import sys, handler; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, WARM_BROWSER_ENABLED='false',
+               DISCORD_WEBHOOK_URL=os.getenv('DISCORD_WEBHOOK_URL', 'https://example.com/webhook'))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=LAMBDA_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    # (depth, module, cumulative us); a module is listed after everything it imports
+    entries: list[tuple[int, str, int]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((len(name) - len(name.lstrip()), name.strip(), int(cumulative_us)))
+    handler_index = next(i for i, (_, name, _) in enumerate(entries) if name == 'handler')
+    handler_depth = entries[handler_index][0]
+    children: dict[str, int] = {}
+    for depth, name, cumulative_us in reversed(entries[:handler_index]):
+        if depth <= handler_depth:
+            break
+        if depth == handler_depth + 2:
+            children[name] = cumulative_us
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return entries[handler_index][2], children, loaded
+
+
+def test_handler_import_stays_light():
+    runs = [import_handler() for _ in range(ITERATIONS)]
+    best = min(handler_us for handler_us, _, _ in runs) / 1_000_000
+
+    _, children, loaded = runs[0]
+    heaviest = sorted(children.items(), key=lambda entry: entry[1], reverse=True)[:5]
+    print(f"\nimport handler: best {best * 1000:.1f} ms; heaviest: "
+          + ", ".join(f"{name} {us / 1000:.1f} ms" for name, us in heaviest))
+    assert loaded == []
+    assert best < BUDGET_SECONDS
@@ -0,0 +1,148 @@
+"""
+Offline resolver benchmark over recorded product pages.
+
+Serves every fixture in tests/fixtures/pages from a local replay server and
+runs the real store resolvers against it with each fetch strategy:
+
+- http: the plain GET fast path only
+- browser: Chromium with the resolver's own route policy
+- browser-allow-all: Chromium loading every recorded subresource
+
+For each strategy it reports per-store latency, extraction correctness and
+pages per second. A page the HTTP tier cannot read is counted as a
+fallback, not a failure, when its fixture says the browser is needed.
+Requests to anything but the replay server are aborted, so the suite never
+touches the network.
+
+Run with: python -m pytest -s tests/benchmarks/test_resolver_replay_benchmark.py
+The browser strategies are skipped when Chromium is not installed.
+"""
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import pytest
+
+from models.product import Product
+from models.store import Store
+from product_resolvers.base_resolver import BaseResolver, FetchMode
+from product_resolvers.browser_pool import BrowserPool
+from product_resolvers.http_fetcher import fetch_tier_tracker
+from product_resolvers.registry import resolver_class_for
+from product_resolvers.route_policy import ALLOW_ALL_POLICY
+from tests.benchmarks.test_route_policy_benchmark import chromium_available
+from tests.replay.fixtures import PageFixture, load_fixtures
+from tests.replay.server import OfflineRoutePolicy, ReplayServer
+
+ITERATIONS = 5
+# Added to every replayed response so the browser and HTTP tiers pay a realistic round trip
+REPLAY_LATENCY_SECONDS = 0.02
+
+
+@dataclass
+class StrategyReport:
+    name: str
+    latencies: dict[Store, list[float]] = field(default_factory=dict)
+    correct: int = 0
+    fallbacks: int = 0
+    wrong: list[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    pages: int = 0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed if self.elapsed else 0.0
+
+
+def replay_resolver(fixture: PageFixture, server: ReplayServer, fetch_mode: FetchMode,
+                    allow_all: bool = False) -> BaseResolver:
+    """
+    The store's registered resolver, pointed at the replay server and kept offline.
+    """
+    resolver_cls = resolver_class_for(fixture.store)
+    policy = ALLOW_ALL_POLICY if allow_all else resolver_cls.ROUTE_POLICY
+    replay_cls = type(f'Replay{resolver_cls.__name__}', (resolver_cls,), {
+        'FETCH_MODE': fetch_mode,
+        'ROUTE_POLICY': OfflineRoutePolicy.wrapping(policy),
+    })
+    return replay_cls(fixture.part_id, server.url_for(fixture), fixture.part_id)
+
+
+def run_strategy(name: str, fixtures: list[PageFixture],
+                 resolve: Callable[[PageFixture], Optional[Product]]) -> StrategyReport:
+    report = StrategyReport(name)
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        for fixture in fixtures:
+            page_start = time.perf_counter()
+            product = resolve(fixture)
+            report.latencies.setdefault(fixture.store, []).append(time.perf_counter() - page_start)
+            report.pages += 1
+            if product is None and not fixture.http_complete:
+                report.fallbacks += 1
+            elif product is not None and fixture.matches(product):
+                report.correct += 1
+            else:
+                report.wrong.append(f"{fixture.name}: {product}")
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def print_report(report: StrategyReport) -> None:
+    print(f"\n{report.name}: {report.pages_per_second:.1f} pages/s, {report.correct} correct, "
+          f"{report.fallbacks} fallbacks, {len(report.wrong)} wrong of {report.pages}")
+    print("  store              p50 ms   max ms")
+    for store, latencies in report.latencies.items():
+        print(f"  {store.name:<17} {statistics.median(latencies) * 1000:7.1f} {max(latencies) * 1000:8.1f}")
+    for failure in sorted(set(report.wrong)):
+        print(f"  WRONG {failure}")
+
+
+@pytest.fixture(scope='module')
+def fixtures() -> list[PageFixture]:
+    return load_fixtures()
+
+
+@pytest.fixture(scope='module')
+def server(fixtures):
+    with ReplayServer(fixtures, latency_seconds=REPLAY_LATENCY_SECONDS) as replay_server:
+        yield replay_server
+
+
+@pytest.fixture(autouse=True)
+def fresh_tier_tracker():
+    fetch_tier_tracker.reset()
+    yield
+    fetch_tier_tracker.reset()
+
+
+def test_every_store_has_fixtures(fixtures):
+    assert {fixture.store for fixture in fixtures} == set(Store)
+
+
+def test_http_strategy_benchmark(fixtures, server):
+    def resolve(fixture: PageFixture) -> Optional[Product]:
+        return replay_resolver(fixture, server, FetchMode.TIERED)._try_http()
+
+    report = run_strategy('http', fixtures, resolve)
+    print_report(report)
+
+    assert report.wrong == []
+    assert server.misses == []
+
+
+@pytest.mark.skipif(not chromium_available(), reason="Chromium is not installed")
+@pytest.mark.parametrize('allow_all', [False, True], ids=['browser', 'browser-allow-all'])
+def test_browser_strategy_benchmark(fixtures, server, allow_all):
+    with BrowserPool() as pool:
+        def resolve(fixture: PageFixture) -> Product:
+            return replay_resolver(fixture, server, FetchMode.BROWSER_ONLY, allow_all).resolve(pool)
+
+        # Warm the browser so launch time is not charged to the first store
+        resolve(fixtures[0])
+        report = run_strategy('browser-allow-all' if allow_all else 'browser', fixtures, resolve)
+    print_report(report)
+
+    assert report.fallbacks == 0
+    assert report.wrong == []
@@ -0,0 +1,155 @@
+"""
+Before/after benchmark for request interception and selector waits.
+
+Serves a synthetic product page with slow images, stylesheet, font and a
+tracker beacon from a local server, then times the legacy strategy
+(every request allowed, wait for networkidle) against the default strategy
+(heavy resources and trackers aborted, wait for the selectors we read).
+
+Run with: python -m pytest -s tests/benchmarks/test_route_policy_benchmark.py
+Skipped when Chromium is not installed.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import pytest
+from playwright.sync_api import sync_playwright, Error
+
+from models.store import Store
+from product_resolvers.base_resolver import BaseResolver, FetchMode
+from product_resolvers.browser_pool import BrowserPool
+from product_resolvers.extraction import ExtractionSpec, SelectorRule
+from product_resolvers.route_policy import ALLOW_ALL_POLICY, DEFAULT_ROUTE_POLICY
+
+ASSET_DELAY_SECONDS = 0.2
+ASSET_BYTES = 50_000
+IMAGE_COUNT = 12
+ITERATIONS = 3
+
+
+def chromium_available() -> bool:
+    try:
+        with sync_playwright() as p:
+            p.chromium.launch(headless=True).close()
+        return True
+    except Error:
+        return False
+
+
+class SyntheticPageServer:
+    """Local server for one heavy product page; counts requests and bytes served."""
+
+    def __init__(self) -> None:
+        self.requests_served = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == '/product':
+                    body = server.product_html().encode()
+                    content_type = 'text/html'
+                else:
+                    time.sleep(ASSET_DELAY_SECONDS)
+                    body = b'x' * ASSET_BYTES
+                    content_type = 'text/css' if self.path.endswith('.css') else 'application/octet-stream'
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('Cache-Control', 'no-store')
+                self.end_headers()
+                self.wfile.write(body)
+                with server._lock:
+                    server.requests_served += 1
+                    server.bytes_served += len(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def product_html(self) -> str:
+        images = ''.join(f'<img src="/img/{i}.png">' for i in range(IMAGE_COUNT))
+        return (
+            '<html><head>'
+            '<link rel="stylesheet" href="/style.css">'
+            '<link rel="preload" as="font" href="/font.woff2" crossorigin>'
+            # "localhost" stands in for a third-party tracker host
+            f'<script async src="http://localhost:{self.port}/beacon.js"></script>'
+            '</head><body>'
+            '<span class="price">$1,299.99</span>'
+            '<button id="add-to-cart">Add to Cart</button>'
+            f'{images}<video src="/clip.mp4" autoplay muted></video>'
+            '</body></html>'
+        )
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}/product'
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests_served = 0
+            self.bytes_served = 0
+
+    def __enter__(self) -> "SyntheticPageServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class LegacyResolver(BaseResolver):
+    store_name = Store.NEWEGG
+    SPEC = ExtractionSpec(
+        price_rules=(SelectorRule('.price'),),
+        available_rules=(SelectorRule('#add-to-cart'),),
+    )
+    FETCH_MODE = FetchMode.BROWSER_ONLY
+    ROUTE_POLICY = ALLOW_ALL_POLICY
+    WAIT_UNTIL = 'networkidle'
+    WAIT_FOR_SELECTORS: Optional[tuple[SelectorRule, ...]] = ()
+
+
+class InterceptingResolver(LegacyResolver):
+    ROUTE_POLICY = DEFAULT_ROUTE_POLICY.with_blocked_domains('localhost')
+    WAIT_UNTIL = 'domcontentloaded'
+    WAIT_FOR_SELECTORS = None
+
+
+def run_strategy(resolver_cls, server: SyntheticPageServer, pool: BrowserPool) -> dict:
+    server.reset()
+    resolver = resolver_cls("BENCH", server.url, "Benchmark Part")
+    start = time.perf_counter()
+    products = [resolver.resolve(pool) for _ in range(ITERATIONS)]
+    elapsed = time.perf_counter() - start
+    assert all(p.price == 1299.99 and p.in_stock for p in products)
+    return {
+        'seconds_per_page': elapsed / ITERATIONS,
+        'requests_per_page': server.requests_served / ITERATIONS,
+        'bytes_per_page': server.bytes_served / ITERATIONS,
+    }
+
+
+@pytest.mark.skipif(not chromium_available(), reason="Chromium is not installed")
+def test_route_policy_benchmark():
+    with SyntheticPageServer() as server, BrowserPool() as pool:
+        # Warm the browser so launch time is not charged to either strategy
+        run_strategy(InterceptingResolver, server, pool)
+        before = run_strategy(LegacyResolver, server, pool)
+        after = run_strategy(InterceptingResolver, server, pool)
+
+    print("\nstrategy      s/page  requests/page  bytes/page")
+    for name, result in [('networkidle', before), ('intercept', after)]:
+        print(f"{name:<12} {result['seconds_per_page']:7.3f} {result['requests_per_page']:14.1f}"
+              f" {result['bytes_per_page']:11.0f}")
+
+    assert after['requests_per_page'] < before['requests_per_page']
+    assert after['seconds_per_page'] < before['seconds_per_page']
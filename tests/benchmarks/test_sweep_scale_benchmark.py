@@ -0,0 +1,53 @@
+"""
+Small end-to-end sweep through the scale harness, so the harness and the
+handler's behaviour at volume are checked on every run. Larger scaling
+curves come from the harness itself:
+
+    python -m tests.load.harness --products 500,2000,5000 --concurrency 8,32
+
+Run with: python -m pytest -s tests/benchmarks/test_sweep_scale_benchmark.py
+"""
+from tests.load.harness import REPORT_HEADER, LoadProfile, format_report, run_profile
+from tests.load.retailer_server import RetailerBehavior
+
+PRODUCTS = 40
+STORES = 3
+
+
+def run(profile: LoadProfile):
+    reports = run_profile(profile)
+    print(f"\n{REPORT_HEADER}")
+    for report in reports:
+        print(format_report(profile, report))
+    return reports
+
+
+def test_clean_sweeps_record_only_flips():
+    profile = LoadProfile(products=PRODUCTS, global_concurrency=8, per_store_concurrency=3, flip_rate=0.2,
+                          retailer=RetailerBehavior(latency_seconds=0.002, jitter_seconds=0.002))
+
+    reports = run(profile)
+
+    for report in reports:
+        assert report.pages == PRODUCTS * STORES
+        assert report.retailer_requests == report.pages
+        assert report.statuses == {'OK': report.pages}
+        # One read for the whole catalog, then only the flipped states are written
+        assert report.dynamodb_calls['BatchGetItem'] == 2
+        assert report.dynamodb_items_written == report.flipped
+        assert report.discord_embeds <= report.flipped
+    # The webhook is read from SSM once and served from the cache afterwards
+    assert [report.ssm_calls for report in reports] == [1, 0]
+
+
+def test_failed_pages_are_never_written():
+    profile = LoadProfile(products=PRODUCTS, global_concurrency=8, per_store_concurrency=3, flip_rate=0.0,
+                          sweeps=1, retailer=RetailerBehavior(latency_seconds=0.002, jitter_seconds=0.002,
+                                                              error_rate=0.2))
+
+    report = run(profile)[0]
+
+    assert report.retailer_errors > 0
+    assert report.statuses['OK'] < report.pages
+    assert report.dynamodb_items_written == 0
+    assert report.discord_messages == 0
@@ -0,0 +1,6 @@
+(function () {
+    var app = document.getElementById('app');
+    app.innerHTML =
+        '<div class="product-price"><ul class="price"><li class="price-current">$<strong>169</strong><sup>.99</sup></li></ul></div>' +
+        '<div class="product-buy"><button class="btn btn-primary btn-wide" type="button">Add to Cart</button></div>';
+})();
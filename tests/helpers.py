@@ -0,0 +1,11 @@
+from decimal import Decimal
+
+from models.product import Product, ScrapeStatus
+from models.store import Store
+
+
+def make_product(part_id: str = 'A', store: Store = Store.AMAZON, price=Decimal('100.00'), in_stock: bool = True,
+                 status: ScrapeStatus = ScrapeStatus.OK) -> Product:
+    """Product for tests; the name and URL are derived from part_id."""
+    return Product(id=part_id, name=f"Part {part_id}", price=price, url=f"https://example.com/{part_id}",
+                   store=store, in_stock=in_stock, status=status)
@@ -0,0 +1,317 @@
+"""
+End-to-end scale harness: runs handle() against a synthetic retailer, an
+in-memory DynamoDB and SSM, and a stub Discord webhook, and reports sweep
+wall time, per-page latency, peak RSS and calls per backend for every
+combination of catalog size and concurrency.
+
+Run with: python -m tests.load.harness --products 500,2000,5000 --concurrency 8,32
+Pages are served over plain HTTP; a page the HTTP tier cannot read (a 429
+or a 500) falls back to Chromium, and fails quickly when it is not installed.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+from unittest.mock import patch
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'lambda')
+if LAMBDA_DIR not in sys.path:
+    sys.path.insert(0, LAMBDA_DIR)
+
+from aws_accessors import ssm_accessor  # noqa: E402
+from models.product import Product  # noqa: E402
+from observability import metrics  # noqa: E402
+from product_resolvers import circuit_breaker, politeness  # noqa: E402
+from product_resolvers.base_resolver import BaseResolver  # noqa: E402
+from product_resolvers.browser_pool import process_tree_rss_bytes  # noqa: E402
+from product_resolvers.http_fetcher import fetch_tier_tracker  # noqa: E402
+from product_resolvers.extraction import extract_from_html  # noqa: E402
+from product_resolvers.registry import resolver_class_for  # noqa: E402
+from tests.load.retailer_server import (  # noqa: E402
+    PAGE_BUILDERS,
+    RetailerBehavior,
+    SyntheticRetailer,
+    product_id,
+    product_price,
+    title,
+)
+from tests.load.standins import DiscordWebhookStub, LocalDynamoDB, LocalSSM, installed_aws_standins  # noqa: E402
+
+WEBHOOK_PARAMETER = 'load-test-discord-webhook'
+RSS_SAMPLE_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class LoadProfile:
+    """One point on a scaling curve."""
+    products: int
+    global_concurrency: int = 8
+    per_store_concurrency: int = 3
+    # Per-store request rate; None leaves the retailer unpaced so concurrency alone sets throughput
+    requests_per_second: Optional[float] = None
+    # Fraction of products whose stock flips before each sweep
+    flip_rate: float = 0.05
+    sweeps: int = 2
+    retailer: RetailerBehavior = RetailerBehavior()
+    dynamodb_latency_seconds: float = 0.005
+    discord_limit: int = 50
+    discord_reset_after_seconds: float = 1.0
+
+
+@dataclass
+class SweepReport:
+    sweep: int
+    pages: int
+    flipped: int
+    wall_seconds: float
+    page_latencies: list[float]
+    peak_rss_bytes: Optional[int]
+    statuses: Counter
+    retailer_requests: int
+    retailer_errors: int
+    retailer_rate_limited: int
+    dynamodb_calls: Counter
+    dynamodb_items_written: int
+    ssm_calls: int
+    discord_messages: int
+    discord_embeds: int
+
+    def latency_percentile(self, percentile: float) -> float:
+        if not self.page_latencies:
+            return 0.0
+        ordered = sorted(self.page_latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.wall_seconds if self.wall_seconds else 0.0
+
+
+class RssSampler:
+    """Samples the RSS of this process and its children (Chromium) on a background thread."""
+
+    def __init__(self, interval_seconds: float = RSS_SAMPLE_SECONDS) -> None:
+        self.interval_seconds: float = interval_seconds
+        self.peak_bytes: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> None:
+        rss = process_tree_rss_bytes()
+        if rss is not None and (self.peak_bytes is None or rss > self.peak_bytes):
+            self.peak_bytes = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def __enter__(self) -> "RssSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+@contextlib.contextmanager
+def timed_resolutions(latencies: list[float]):
+    """
+    Record how long each resolver takes once it holds its slots, i.e. the page latency without queueing.
+    """
+    original = BaseResolver.resolve_async
+
+    async def resolve_async(resolver: BaseResolver, browser_pool) -> Product:
+        start = time.perf_counter()
+        try:
+            return await original(resolver, browser_pool)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    with patch.object(BaseResolver, 'resolve_async', resolve_async):
+        yield
+
+
+def write_catalog(retailer: SyntheticRetailer, directory: str) -> str:
+    products = [
+        {
+            'id': product_id(index),
+            'title': title(index),
+            'urls': {store.name: retailer.url_for(store, index) for store in PAGE_BUILDERS},
+        }
+        for index in range(retailer.product_count)
+    ]
+    path = os.path.join(directory, 'catalog.json')
+    with open(path, 'w') as catalog_file:
+        json.dump({'products': products}, catalog_file)
+    return path
+
+
+def stored_state(retailer: SyntheticRetailer) -> list[Product]:
+    """What a previous sweep would have recorded for the retailer's current stock."""
+    products = []
+    for (store, index), in_stock in retailer.in_stock.items():
+        html = PAGE_BUILDERS[store](title(index), product_price(index), in_stock)
+        result = extract_from_html(html, resolver_class_for(store).SPEC)
+        products.append(Product(id=product_id(index), name=title(index), price=result.price,
+                                url=retailer.url_for(store, index), store=store, in_stock=result.in_stock))
+    return products
+
+
+def profile_environment(profile: LoadProfile, catalog_path: str) -> dict[str, str]:
+    rate = profile.requests_per_second or 1_000_000.0
+    policy = {
+        'requests_per_second': rate,
+        'burst': profile.per_store_concurrency,
+        'max_concurrency': profile.per_store_concurrency,
+        'cooldown_seconds': 0.2,
+        'max_cooldown_seconds': 2.0,
+    }
+    return {
+        'CATALOG_SOURCE': 'file',
+        'CATALOG_PATH': catalog_path,
+        'DISCORD_WEBHOOK_URL_ARN': WEBHOOK_PARAMETER,
+        'FAN_OUT_ENABLED': 'false',
+        'STATE_WRITE_MODE': 'batch',
+        'PRICE_HISTORY_ENABLED': 'false',
+        'OUTBOX_STORE': 'none',
+        'SUBSCRIPTION_SOURCE': 'none',
+        'WARM_BROWSER_ENABLED': 'false',
+        'GLOBAL_CONCURRENCY': str(profile.global_concurrency),
+        'PER_STORE_CONCURRENCY': str(profile.per_store_concurrency),
+        'POLITENESS_POLICIES': json.dumps({store.name: policy for store in PAGE_BUILDERS}),
+    }
+
+
+def reset_process_state() -> None:
+    """Forget what earlier profiles taught the process-wide schedulers, breakers and caches."""
+    fetch_tier_tracker.reset()
+    politeness._politeness_scheduler = None
+    circuit_breaker._breaker_board = None
+    metrics._metrics = None
+    ssm_accessor.parameter_cache.refresh()
+
+
+def run_profile(profile: LoadProfile, verbose: bool = False) -> list[SweepReport]:
+    """
+    Run profile.sweeps sweeps of handle() against freshly started stand-ins.
+    The table starts with the retailer's initial stock, so every sweep is a
+    steady-state sweep that only records what flipped.
+    """
+    reports: list[SweepReport] = []
+    with tempfile.TemporaryDirectory() as directory, \
+            SyntheticRetailer(profile.products, profile.retailer) as retailer, \
+            DiscordWebhookStub(profile.discord_limit, profile.discord_reset_after_seconds) as discord:
+        dynamodb = LocalDynamoDB(profile.dynamodb_latency_seconds)
+        dynamodb.seed(stored_state(retailer))
+        ssm = LocalSSM({WEBHOOK_PARAMETER: discord.url})
+        environment = profile_environment(profile, write_catalog(retailer, directory))
+        with patch.dict(os.environ, environment), installed_aws_standins(dynamodb, ssm):
+            import handler
+            reset_process_state()
+            for sweep in range(profile.sweeps):
+                flipped = retailer.flip_stock(profile.flip_rate)
+                for backend in (retailer, dynamodb, ssm, discord):
+                    backend.reset_counters()
+                latencies: list[float] = []
+                statuses: Counter = Counter()
+                output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+                original_scraped = handler.scraped_products
+
+                def count_statuses(products: list[Product]) -> list[Product]:
+                    statuses.update(product.status.value for product in products)
+                    return original_scraped(products)
+
+                with output, timed_resolutions(latencies), RssSampler() as rss, \
+                        patch.object(handler, 'scraped_products', count_statuses):
+                    start = time.perf_counter()
+                    handler.handle(None, None)
+                    wall_seconds = time.perf_counter() - start
+                reports.append(SweepReport(
+                    sweep=sweep,
+                    pages=len(latencies),
+                    flipped=flipped,
+                    wall_seconds=wall_seconds,
+                    page_latencies=latencies,
+                    peak_rss_bytes=rss.peak_bytes,
+                    statuses=statuses,
+                    retailer_requests=sum(retailer.requests.values()),
+                    retailer_errors=sum(retailer.errors.values()),
+                    retailer_rate_limited=sum(retailer.rate_limited.values()),
+                    dynamodb_calls=Counter(dynamodb.calls),
+                    dynamodb_items_written=dynamodb.items_written,
+                    ssm_calls=sum(ssm.calls.values()),
+                    discord_messages=discord.messages,
+                    discord_embeds=discord.embeds,
+                ))
+    return reports
+
+
+def format_report(profile: LoadProfile, report: SweepReport) -> str:
+    rss = f"{report.peak_rss_bytes / 2 ** 20:.0f}" if report.peak_rss_bytes is not None else "n/a"
+    dynamodb = ' '.join(f"{operation}={count}" for operation, count in sorted(report.dynamodb_calls.items()))
+    return (f"{profile.products:>6} {profile.global_concurrency:>4}/{profile.per_store_concurrency:<3} "
+            f"{report.sweep:>5} {report.wall_seconds:8.2f} {report.pages_per_second:8.1f} "
+            f"{report.latency_percentile(50) * 1000:7.1f} {report.latency_percentile(99) * 1000:7.1f} {rss:>7} "
+            f"retailer={report.retailer_requests} (429={report.retailer_rate_limited} 500={report.retailer_errors}) "
+            f"{dynamodb} written={report.dynamodb_items_written} ssm={report.ssm_calls} "
+            f"discord={report.discord_messages}/{report.discord_embeds} "
+            f"flipped={report.flipped} statuses={dict(report.statuses)}")
+
+
+REPORT_HEADER = "  size conc     sweep   wall s  pages/s  p50 ms  p99 ms  rss MB  backend calls"
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(',') if part]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sweep handle() over synthetic retailers at several scales.")
+    parser.add_argument('--products', type=_int_list, default=[500, 2000, 5000],
+                        help="Comma-separated catalog sizes; each product is sold by every store")
+    parser.add_argument('--concurrency', type=_int_list, default=[8, 32], help="Comma-separated global limits")
+    parser.add_argument('--per-store', type=int, default=None,
+                        help="Per-store limit; a third of the global limit when omitted")
+    parser.add_argument('--requests-per-second', type=float, default=None, help="Per-store pacing")
+    parser.add_argument('--sweeps', type=int, default=2)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--flip-rate', type=float, default=0.05)
+    parser.add_argument('--discord-limit', type=int, default=50, help="Webhook messages per window")
+    parser.add_argument('--verbose', action='store_true', help="Show the handler's own output")
+    args = parser.parse_args(argv)
+
+    behavior = RetailerBehavior(latency_seconds=args.latency_ms / 1000, jitter_seconds=args.jitter_ms / 1000,
+                                error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate)
+    print(REPORT_HEADER)
+    for products in args.products:
+        for concurrency in args.concurrency:
+            profile = LoadProfile(
+                products=products,
+                global_concurrency=concurrency,
+                per_store_concurrency=args.per_store or max(1, concurrency // len(PAGE_BUILDERS)),
+                requests_per_second=args.requests_per_second,
+                flip_rate=args.flip_rate,
+                sweeps=args.sweeps,
+                retailer=behavior,
+                discord_limit=args.discord_limit,
+            )
+            for report in run_profile(profile, args.verbose):
+                print(format_report(profile, report), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Synthetic retailer for load tests: one local HTTP server that serves
+Amazon-, Newegg- and Canada Computers-shaped product pages for any number
+of products, with configurable latency, server errors, rate limiting and
+stock flips between sweeps.
+"""
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from models.store import Store
+
+RETAILER_HOST = '127.0.0.1'
+
+
+@dataclass(frozen=True)
+class RetailerBehavior:
+    """How the synthetic retailer answers."""
+    # Every response waits latency_seconds plus up to jitter_seconds
+    latency_seconds: float = 0.05
+    jitter_seconds: float = 0.02
+    # Fraction of requests answered with a 500 error page
+    error_rate: float = 0.0
+    # Fraction of requests answered with a 429
+    rate_limit_rate: float = 0.0
+    # Fraction of products that start in stock
+    in_stock_rate: float = 0.7
+    seed: int = 0
+
+
+def _amazon_page(title: str, price: int, in_stock: bool) -> str:
+    if in_stock:
+        body = (f'<span class="a-price"><span class="a-price-symbol">$</span>'
+                f'<span class="a-price-whole">{price:,}<span class="a-price-decimal">.</span></span>'
+                f'<span class="a-price-fraction">00</span></span>'
+                '<input id="add-to-cart-button" type="submit" value="Add to Cart">')
+    else:
+        body = '<div id="outOfStock"><span>Currently unavailable.</span></div>'
+    return f'<html><head><title>Amazon.com: {title}</title></head><body><span id="productTitle">{title}</span>{body}</body></html>'
+
+
+def _newegg_page(title: str, price: int, in_stock: bool) -> str:
+    button = ('<button class="btn btn-primary">Add to Cart</button>' if in_stock
+              else '<div class="product-inventory"><strong>OUT OF STOCK.</strong></div>')
+    return (f'<html><head><title>{title} - Newegg.com</title></head><body>'
+            f'<ul class="price"><li class="price-current">$<strong>{price:,}</strong><sup>.00</sup></li></ul>'
+            f'{button}</body></html>')
+
+
+def _canada_computers_page(title: str, price: int, in_stock: bool) -> str:
+    disabled = '' if in_stock else ' disabled'
+    stock = 'In stock online' if in_stock else 'Out of Stock online'
+    return (f'<html><head><title>{title} | Canada Computers</title></head><body>'
+            f'<span class="current-price-value">${price:,}.00</span>'
+            f'<div class="pi-data-stock">{stock}</div>'
+            f'<button class="btn btn-primary buy-now"{disabled}>Buy Now</button></body></html>')
+
+
+PAGE_BUILDERS: dict[Store, Callable[[str, int, bool], str]] = {
+    Store.AMAZON: _amazon_page,
+    Store.NEWEGG: _newegg_page,
+    Store.CANADA_COMPUTERS: _canada_computers_page,
+}
+
+
+def product_id(index: int) -> str:
+    return f"LOAD-{index:05d}"
+
+
+def title(index: int) -> str:
+    return f"Load Test Part {index}"
+
+
+def product_price(index: int) -> int:
+    # Whole dollars, so every resolver reads back exactly what was served
+    return 100 + (index * 37) % 1900
+
+
+class SyntheticRetailer:
+    """
+    Serves /<STORE>/<index> for products 0..product_count-1 at every store.
+    Stock state lives in the server, so a sweep sees whatever flip_stock()
+    last changed.
+    """
+
+    def __init__(self, product_count: int, behavior: RetailerBehavior = RetailerBehavior()) -> None:
+        self.product_count: int = product_count
+        self.behavior: RetailerBehavior = behavior
+        self._random = random.Random(behavior.seed)
+        self.in_stock: dict[tuple[Store, int], bool] = {
+            (store, index): self._random.random() < behavior.in_stock_rate
+            for store in PAGE_BUILDERS for index in range(product_count)
+        }
+        self.requests: dict[Store, int] = {store: 0 for store in PAGE_BUILDERS}
+        self.errors: dict[Store, int] = {store: 0 for store in PAGE_BUILDERS}
+        self.rate_limited: dict[Store, int] = {store: 0 for store in PAGE_BUILDERS}
+        self._lock = threading.Lock()
+        retailer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                retailer._serve(self)
+
+        class Server(ThreadingHTTPServer):
+            # Large enough for the widest concurrency sweep to connect at once
+            request_queue_size = 512
+
+        self.httpd = Server((RETAILER_HOST, 0), Handler)
+        self.port: int = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _route(self, path: str) -> Optional[tuple[Store, int]]:
+        store_name, _, index = path.strip('/').partition('/')
+        if store_name not in Store.__members__ or not index.isdigit():
+            return None
+        store, index = Store[store_name], int(index)
+        if store not in PAGE_BUILDERS or index >= self.product_count:
+            return None
+        return store, index
+
+    def _serve(self, request: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            delay = self.behavior.latency_seconds + self._random.uniform(0, self.behavior.jitter_seconds)
+            roll = self._random.random()
+        time.sleep(delay)
+        route = self._route(request.path)
+        if route is None:
+            self._respond(request, 404, 'Not Found')
+            return
+        store, index = route
+        with self._lock:
+            self.requests[store] += 1
+            if roll < self.behavior.rate_limit_rate:
+                self.rate_limited[store] += 1
+                status = 429
+            elif roll < self.behavior.rate_limit_rate + self.behavior.error_rate:
+                self.errors[store] += 1
+                status = 500
+            else:
+                status = 200
+            in_stock = self.in_stock[(store, index)]
+        if status == 429:
+            self._respond(request, 429, '<html><body>Too Many Requests</body></html>', {'Retry-After': '1'})
+        elif status == 500:
+            self._respond(request, 500, '<html><body>Internal Server Error</body></html>')
+        else:
+            html = PAGE_BUILDERS[store](title(index), product_price(index), in_stock)
+            self._respond(request, 200, html)
+
+    @staticmethod
+    def _respond(request: BaseHTTPRequestHandler, status: int, html: str,
+                 headers: Optional[dict[str, str]] = None) -> None:
+        body = html.encode()
+        request.send_response(status)
+        request.send_header('Content-Type', 'text/html; charset=utf-8')
+        request.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+
+    def url_for(self, store: Store, index: int) -> str:
+        return f'http://{RETAILER_HOST}:{self.port}/{store.name}/{index}'
+
+    def flip_stock(self, rate: float) -> int:
+        """
+        Toggle the stock state of a random fraction of products.
+
+        Returns:
+            Number of products that flipped
+        """
+        with self._lock:
+            keys = [key for key in self.in_stock if self._random.random() < rate]
+            for key in keys:
+                self.in_stock[key] = not self.in_stock[key]
+        return len(keys)
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            for counter in (self.requests, self.errors, self.rate_limited):
+                for store in counter:
+                    counter[store] = 0
+
+    def __enter__(self) -> "SyntheticRetailer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
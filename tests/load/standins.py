@@ -0,0 +1,199 @@
+"""
+Local stand-ins for the backends a sweep talks to: an in-memory DynamoDB
+client, an in-memory SSM client and a Discord webhook served over HTTP.
+The AWS stand-ins are installed in AWSSession's client cache, so the real
+accessors, batching and serialization run unchanged against them.
+"""
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Iterator
+
+from aws_accessors import dynamodb_accessor
+from aws_accessors.aws_session import AWSSession
+from models.product import Product
+
+STUB_HOST = '127.0.0.1'
+
+
+class LocalDynamoDB:
+    """
+    The BatchGetItem and BatchWriteItem subset of the DynamoDB client,
+    keeping items in their wire format. Every call can be slowed by
+    latency_seconds to mimic a network round trip.
+    """
+
+    def __init__(self, latency_seconds: float = 0.0) -> None:
+        self.latency_seconds: float = latency_seconds
+        # (table, PartId, StoreId) -> item in DynamoDB JSON
+        self.items: dict[tuple[str, str, str], dict] = {}
+        self.calls: Counter = Counter()
+        self.items_read: int = 0
+        self.items_written: int = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(table: str, item: dict) -> tuple[str, str, str]:
+        return table, item['PartId']['S'], item['StoreId']['S']
+
+    def _call(self, operation: str) -> None:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        with self._lock:
+            self.calls[operation] += 1
+
+    def batch_get_item(self, RequestItems: dict) -> dict:
+        self._call('BatchGetItem')
+        responses: dict[str, list[dict]] = {}
+        with self._lock:
+            for table, request in RequestItems.items():
+                found = [self.items[self._key(table, key)] for key in request['Keys']
+                         if self._key(table, key) in self.items]
+                responses[table] = found
+                self.items_read += len(found)
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+    def batch_write_item(self, RequestItems: dict) -> dict:
+        self._call('BatchWriteItem')
+        with self._lock:
+            for table, requests in RequestItems.items():
+                for request in requests:
+                    item = request['PutRequest']['Item']
+                    self.items[self._key(table, item)] = item
+                    self.items_written += 1
+        return {'UnprocessedItems': {}}
+
+    def seed(self, products: Iterable[Product]) -> None:
+        """
+        Store product states directly, as if an earlier sweep had written them.
+        """
+        serializer = dynamodb_accessor._serializer()
+        with self._lock:
+            for product in products:
+                item = {name: serializer.serialize(value)
+                        for name, value in dynamodb_accessor.product_to_dict(product).items()}
+                self.items[self._key(dynamodb_accessor.DYNAMODB_TABLE_NAME, item)] = item
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+            self.items_read = 0
+            self.items_written = 0
+
+
+class LocalSSM:
+    """The GetParameters subset of the SSM client."""
+
+    def __init__(self, parameters: dict[str, str]) -> None:
+        self.parameters: dict[str, str] = dict(parameters)
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def get_parameters(self, Names: list[str], WithDecryption: bool = False) -> dict:
+        with self._lock:
+            self.calls['GetParameters'] += 1
+        found = [{'Name': name, 'Value': self.parameters[name]} for name in Names if name in self.parameters]
+        return {'Parameters': found, 'InvalidParameters': [name for name in Names if name not in self.parameters]}
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+
+@contextmanager
+def installed_aws_standins(dynamodb: LocalDynamoDB, ssm: LocalSSM) -> Iterator[None]:
+    """
+    Serve every DynamoDB and SSM client lookup from the stand-ins for the duration of the block.
+    """
+    region = AWSSession.default_region()
+    with AWSSession._lock:
+        AWSSession._clients[('dynamodb', region)] = dynamodb
+        AWSSession._clients[('ssm', region)] = ssm
+    try:
+        yield
+    finally:
+        AWSSession.reset()
+
+
+class DiscordWebhookStub:
+    """
+    Local webhook that accepts every message and answers with Discord-style
+    X-RateLimit headers, so the publisher paces itself as it would in production.
+    """
+
+    def __init__(self, limit: int = 50, reset_after_seconds: float = 1.0) -> None:
+        """
+        Args:
+            limit: Messages allowed per window, reported in X-RateLimit-Limit
+            reset_after_seconds: Window length, reported in X-RateLimit-Reset-After
+        """
+        self.limit: int = limit
+        self.reset_after_seconds: float = reset_after_seconds
+        self.messages: int = 0
+        self.embeds: int = 0
+        self.rate_limited: int = 0
+        self._window_start: float = time.monotonic()
+        self._window_count: int = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                stub._receive(self)
+
+        self.httpd = ThreadingHTTPServer((STUB_HOST, 0), Handler)
+        self.port: int = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _receive(self, request: BaseHTTPRequestHandler) -> None:
+        payload = json.loads(request.rfile.read(int(request.headers.get('Content-Length', 0))) or b'{}')
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.reset_after_seconds:
+                self._window_start, self._window_count = now, 0
+            reset_after = self.reset_after_seconds - (now - self._window_start)
+            if self._window_count >= self.limit:
+                self.rate_limited += 1
+                status, body = 429, json.dumps({'retry_after': reset_after}).encode()
+            else:
+                self._window_count += 1
+                self.messages += 1
+                self.embeds += len(payload.get('embeds', []))
+                status, body = 204, b''
+            remaining = max(0, self.limit - self._window_count)
+        request.send_response(status)
+        request.send_header('X-RateLimit-Limit', str(self.limit))
+        request.send_header('X-RateLimit-Remaining', str(remaining))
+        request.send_header('X-RateLimit-Reset-After', f'{reset_after:.3f}')
+        if status == 429:
+            request.send_header('Retry-After', f'{reset_after:.3f}')
+            request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    @property
+    def url(self) -> str:
+        return f'http://{STUB_HOST}:{self.port}/api/webhooks/load-test'
+
+    def reset_counters(self) -> None:
+        with self._lock:
+            self.messages = 0
+            self.embeds = 0
+            self.rate_limited = 0
+
+    def __enter__(self) -> "DiscordWebhookStub":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
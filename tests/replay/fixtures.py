@@ -0,0 +1,158 @@
+"""
+Recorded product pages for offline resolver tests and benchmarks.
+
+Each fixture is a directory under tests/fixtures/pages holding the page,
+the subresources it needs, and a fixture.json describing them:
+
+    {
+      "store": "NEWEGG",
+      "part_id": "SAMSUNG-990-PRO-2TB",
+      "source_url": "https://www.newegg.com/p/N82E16820147861",
+      "source": "recorded",
+      "resources": {
+        "/": {"file": "index.html", "content_type": "text/html; charset=utf-8"},
+        "/r/0.js": {"file": "r/0.js", "content_type": "application/javascript"}
+      },
+      "expected": {"status": "OK", "price": 169.0, "in_stock": true, "http_complete": false}
+    }
+
+Resource paths are relative to the fixture's root on the replay server.
+"source" is "recorded" for pages captured by tests.replay.recorder and
+"synthetic" for hand-written pages that mimic a retailer layout.
+"http_complete" says whether the server-rendered HTML alone is enough,
+i.e. whether the HTTP tier should resolve the page without the browser.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from models.product import Product, ScrapeStatus
+from models.store import Store
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'fixtures', 'pages')
+MANIFEST_NAME = 'fixture.json'
+DOCUMENT_PATH = '/'
+
+
+@dataclass(frozen=True)
+class RecordedResource:
+    file: str
+    content_type: str
+    status: int = 200
+
+
+@dataclass(frozen=True)
+class PageFixture:
+    name: str
+    directory: str
+    store: Store
+    part_id: str
+    source_url: str
+    source: str
+    resources: dict[str, RecordedResource]
+    expected_status: ScrapeStatus
+    expected_price: Optional[float]
+    expected_in_stock: bool
+    http_complete: bool
+
+    def read(self, path: str) -> Optional[tuple[RecordedResource, bytes]]:
+        """
+        Return a recorded resource and its body, or None if the page never loaded it.
+        """
+        resource = self.resources.get(path)
+        if resource is None:
+            return None
+        with open(os.path.join(self.directory, resource.file), 'rb') as body:
+            return resource, body.read()
+
+    def matches(self, product: Product) -> bool:
+        """
+        Check a resolved product against what the page is known to show.
+        """
+        if product.status != self.expected_status:
+            return False
+        if not product.scraped:
+            return True
+        if product.in_stock != self.expected_in_stock:
+            return False
+        if self.expected_price is None:
+            return True
+        return product.price is not None and abs(float(product.price) - self.expected_price) < 0.005
+
+
+def load_fixture(directory: str) -> PageFixture:
+    with open(os.path.join(directory, MANIFEST_NAME)) as manifest_file:
+        manifest = json.load(manifest_file)
+    expected = manifest['expected']
+    return PageFixture(
+        name=os.path.basename(os.path.normpath(directory)),
+        directory=directory,
+        store=Store[manifest['store']],
+        part_id=manifest['part_id'],
+        source_url=manifest['source_url'],
+        source=manifest.get('source', 'recorded'),
+        resources={path: RecordedResource(**resource) for path, resource in manifest['resources'].items()},
+        expected_status=ScrapeStatus(expected['status']),
+        expected_price=expected.get('price'),
+        expected_in_stock=expected['in_stock'],
+        http_complete=expected['http_complete']
+    )
+
+
+def load_fixtures(root: str = FIXTURES_DIR) -> list[PageFixture]:
+    """
+    Load every fixture under root, sorted by name.
+    """
+    return [
+        load_fixture(os.path.join(root, name))
+        for name in sorted(os.listdir(root))
+        if os.path.isfile(os.path.join(root, name, MANIFEST_NAME))
+    ]
+
+
+def save_fixture(
+    directory: str,
+    store: Store,
+    part_id: str,
+    source_url: str,
+    bodies: dict[str, tuple[str, str, bytes]],
+    expected: dict,
+    source: str = 'recorded'
+) -> PageFixture:
+    """
+    Write a fixture directory.
+
+    Args:
+        directory: Fixture directory, created if missing
+        store: Retailer the page belongs to
+        part_id: Catalog part ID
+        source_url: Live URL the page was captured from
+        bodies: (file, content type, body) keyed by resource path; DOCUMENT_PATH must be present
+        expected: status, price, in_stock and http_complete as described in the module docstring
+        source: "recorded" or "synthetic"
+
+    Returns:
+        The fixture as load_fixture reads it back
+    """
+    if DOCUMENT_PATH not in bodies:
+        raise ValueError("A fixture needs a document at /")
+    resources = {}
+    for path, (file, content_type, body) in bodies.items():
+        file_path = os.path.join(directory, file)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'wb') as out:
+            out.write(body)
+        resources[path] = {'file': file, 'content_type': content_type}
+    manifest = {
+        'store': store.name,
+        'part_id': part_id,
+        'source_url': source_url,
+        'source': source,
+        'resources': resources,
+        'expected': expected,
+    }
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+        manifest_file.write('\n')
+    return load_fixture(directory)
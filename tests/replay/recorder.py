@@ -0,0 +1,142 @@
+"""
+Capture a live product page as a replay fixture.
+
+Loads the page in Chromium with the store resolver's route policy, so only
+the subresources the resolver would let through are kept, saves the
+document plus every script, XHR and fetch response, rewrites references to
+them so they resolve against the replay server, and records what the
+resolver read from the live page as the expected result.
+
+References built at runtime (string concatenation in scripts, escaped
+URLs inside JSON) are not rewritten; check a new fixture with the replay
+benchmark before committing it.
+
+Run with: python -m tests.replay.recorder NEWEGG SAMSUNG-990-PRO-2TB https://www.newegg.com/p/N82E16820147861
+Needs network access and Chromium.
+"""
+import argparse
+import os
+import sys
+from typing import Optional
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'lambda')
+if LAMBDA_DIR not in sys.path:
+    sys.path.insert(0, LAMBDA_DIR)
+
+from models.product import ScrapeStatus  # noqa: E402
+from models.store import Store  # noqa: E402
+from product_resolvers.browser_pool import BrowserPool  # noqa: E402
+from product_resolvers.extraction import extract_from_html, extract_from_page  # noqa: E402
+from product_resolvers.http_fetcher import detect_block  # noqa: E402
+from product_resolvers.registry import resolver_class_for  # noqa: E402
+from tests.replay.fixtures import DOCUMENT_PATH, FIXTURES_DIR, PageFixture, save_fixture  # noqa: E402
+
+# Resource types kept in a fixture; anything else is left for the route policy to drop
+RECORDED_RESOURCE_TYPES: frozenset[str] = frozenset({'script', 'xhr', 'fetch'})
+EXTENSIONS: dict[str, str] = {'script': '.js', 'xhr': '.json', 'fetch': '.json'}
+
+
+def _rewrite(body: bytes, replacements: list[tuple[str, str]]) -> bytes:
+    text = body.decode('utf-8', errors='replace')
+    for original, local in replacements:
+        text = text.replace(original, local)
+    return text.encode('utf-8')
+
+
+def record(store: Store, part_id: str, url: str, name: Optional[str] = None, root: str = FIXTURES_DIR) -> PageFixture:
+    """
+    Record one product page.
+
+    Args:
+        store: Retailer the page belongs to
+        part_id: Catalog part ID
+        url: Live product page URL
+        name: Fixture directory name; defaults to "<store>-<part id>" in lower case
+        root: Directory that holds the fixtures
+
+    Returns:
+        The saved fixture
+    """
+    resolver_cls = resolver_class_for(store)
+    if resolver_cls is None:
+        raise ValueError(f"No resolver registered for {store.name}")
+    resolver = resolver_cls(part_id, url, part_id)
+    name = name or f"{store.name}-{part_id}".lower().replace('_', '-')
+
+    captured: list[tuple[str, str, str, bytes]] = []
+
+    def capture(response) -> None:
+        request = response.request
+        if request.resource_type not in RECORDED_RESOURCE_TYPES or response.status >= 400:
+            return
+        try:
+            captured.append((request.url, request.resource_type, response.headers.get('content-type', ''),
+                             response.body()))
+        except Exception as e:
+            print(f"Could not read {request.url}: {str(e)}")
+
+    with BrowserPool() as pool, pool.page() as page:
+        resolver.ROUTE_POLICY.apply(page)
+        page.on('response', capture)
+        response = page.goto(url, wait_until=resolver.WAIT_UNTIL)
+        if response is None:
+            raise RuntimeError(f"No response for {url}")
+        document = response.body()
+        status_code = response.status
+        document_type = response.headers.get('content-type', 'text/html; charset=utf-8')
+        result = extract_from_page(page, resolver.SPEC)
+        if not result.complete:
+            resolver._wait_for_content(page)
+            result = extract_from_page(page, resolver.SPEC)
+        block = None if result.complete else detect_block(status_code, page.content(), resolver.BOT_WALL_MARKERS)
+
+    origin = url.split('/', 3)[:3]
+    bodies: dict[str, tuple[str, str, bytes]] = {}
+    replacements: list[tuple[str, str]] = []
+    for index, (resource_url, resource_type, content_type, body) in enumerate(captured):
+        file = f"r/{index}{EXTENSIONS[resource_type]}"
+        bodies[f"/{file}"] = (file, content_type or 'application/octet-stream', body)
+        replacements.append((resource_url, file))
+        if resource_url.split('/', 3)[:3] == origin:
+            # Same-origin references are often root-relative in the markup
+            replacements.append(('/' + resource_url.split('/', 3)[3], file))
+    # Longest first so a URL is never partly replaced by a shorter one it contains
+    replacements.sort(key=lambda pair: len(pair[0]), reverse=True)
+
+    document = _rewrite(document, replacements)
+    bodies = {path: (file, content_type, _rewrite(body, replacements) if path.endswith('.js') else body)
+              for path, (file, content_type, body) in bodies.items()}
+    bodies[DOCUMENT_PATH] = ('index.html', document_type, document)
+
+    document_text = document.decode('utf-8', errors='replace')
+    html_result = extract_from_html(document_text, resolver.SPEC)
+    http_complete = (html_result is not None and html_result.complete
+                     and detect_block(status_code, document_text, resolver.BOT_WALL_MARKERS) is None)
+    if result.complete:
+        status = ScrapeStatus.OK
+    else:
+        status = ScrapeStatus.BLOCKED if block is not None else ScrapeStatus.FAILED
+    expected = {
+        'status': status.value,
+        'price': result.price if result.complete else None,
+        'in_stock': result.in_stock if result.complete else False,
+        'http_complete': http_complete,
+    }
+    fixture = save_fixture(os.path.join(root, name), store, part_id, url, bodies, expected)
+    print(f"Recorded {url} as {fixture.name}: {len(bodies)} resources, expected {expected}")
+    return fixture
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Record a product page as a replay fixture.")
+    parser.add_argument('store', choices=[store.name for store in Store])
+    parser.add_argument('part_id')
+    parser.add_argument('url')
+    parser.add_argument('--name', help="Fixture directory name")
+    parser.add_argument('--root', default=FIXTURES_DIR, help="Directory that holds the fixtures")
+    args = parser.parse_args(argv)
+    record(Store[args.store], args.part_id, args.url, args.name, args.root)
+
+
+if __name__ == '__main__':
+    main()
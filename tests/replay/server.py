@@ -0,0 +1,111 @@
+"""
+Serves recorded fixtures over local HTTP so resolvers run unchanged, on
+both the HTTP tier and the browser, without touching the network.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable
+from urllib.parse import urlsplit
+
+from product_resolvers.route_policy import RoutePolicy
+from tests.replay.fixtures import PageFixture
+
+REPLAY_HOST = '127.0.0.1'
+
+
+class ReplayServer:
+    """
+    Local server for a set of fixtures. A fixture's resources are served
+    under /<fixture name>/; anything that was not recorded is a 404, so a
+    page cannot silently reach out to the live site.
+    """
+
+    def __init__(self, fixtures: Iterable[PageFixture], latency_seconds: float = 0.0) -> None:
+        """
+        Args:
+            fixtures: Fixtures to serve
+            latency_seconds: Delay added to every response to mimic a remote server
+        """
+        self.fixtures: dict[str, PageFixture] = {fixture.name: fixture for fixture in fixtures}
+        self.latency_seconds: float = latency_seconds
+        self.requests_served: int = 0
+        self.bytes_served: int = 0
+        self.misses: list[str] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                server._serve(self)
+
+        self.httpd = ThreadingHTTPServer((REPLAY_HOST, 0), Handler)
+        self.port: int = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _serve(self, request: BaseHTTPRequestHandler) -> None:
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        name, _, rest = urlsplit(request.path).path.lstrip('/').partition('/')
+        fixture = self.fixtures.get(name)
+        recorded = fixture.read('/' + rest) if fixture is not None else None
+        if recorded is None:
+            with self._lock:
+                self.misses.append(request.path)
+            request.send_error(404)
+            return
+        resource, body = recorded
+        request.send_response(resource.status)
+        request.send_header('Content-Type', resource.content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.send_header('Cache-Control', 'no-store')
+        request.end_headers()
+        request.wfile.write(body)
+        with self._lock:
+            self.requests_served += 1
+            self.bytes_served += len(body)
+
+    def url_for(self, fixture: PageFixture) -> str:
+        return f'http://{REPLAY_HOST}:{self.port}/{fixture.name}/'
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests_served = 0
+            self.bytes_served = 0
+            self.misses.clear()
+
+    def __enter__(self) -> "ReplayServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@dataclass(frozen=True)
+class OfflineRoutePolicy(RoutePolicy):
+    """
+    A resolver's route policy that additionally aborts every request not
+    bound for the replay server, so recorded pages cannot load live trackers,
+    CDNs or APIs.
+    """
+    allowed_hosts: frozenset[str] = frozenset({REPLAY_HOST})
+
+    @classmethod
+    def wrapping(cls, policy: RoutePolicy) -> "OfflineRoutePolicy":
+        return cls(blocked_resource_types=policy.blocked_resource_types,
+                   blocked_domains=policy.blocked_domains)
+
+    @property
+    def blocks_anything(self) -> bool:
+        return True
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if (urlsplit(url).hostname or '').lower() not in self.allowed_hosts:
+            return True
+        return super().should_block(resource_type, url)
@@ -0,0 +1,212 @@
+from unittest.mock import MagicMock, patch
+from contextlib import contextmanager
+import pytest
+
+from playwright.sync_api import TimeoutError
+from models.product import ScrapeStatus
+from models.store import Store
+from product_resolvers.amazon_resolver import AmazonResolver
+from product_resolvers.newegg_resolver import NeweggResolver
+from product_resolvers.http_fetcher import FetchTier, HttpPage, fetch_tier_tracker
+
+AMAZON_IN_STOCK_HTML = """
+<html><body>
+  <span id="priceblock_ourprice">$1,999.99</span>
+  <input id="add-to-cart-button" type="submit">
+</body></html>
+"""
+
+
+@pytest.fixture(autouse=True)
+def reset_tracker():
+    fetch_tier_tracker.reset()
+    yield
+    fetch_tier_tracker.reset()
+
+
+@pytest.fixture
+def no_http():
+    with patch('product_resolvers.base_resolver.fetch_page', return_value=None) as mock_fetch:
+        yield mock_fetch
+
+
+def make_page(price_texts=None, unavailable=None, available=None, json_ld=None):
+    """Build a mock page whose single evaluate call returns the given extraction payload."""
+    page = MagicMock()
+    page.evaluate.return_value = {
+        'priceTexts': price_texts or [],
+        'unavailable': unavailable or [],
+        'available': available or [],
+        'jsonLd': json_ld or [],
+        'state': {},
+    }
+    return page
+
+
+def make_pool(page):
+    pool = MagicMock()
+
+    @contextmanager
+    def page_cm():
+        yield page
+
+    pool.page.side_effect = page_cm
+    return pool
+
+
+def test_amazon_in_stock_with_price(no_http):
+    page = make_page(price_texts=[['#priceblock_ourprice', '$1,999.99']], available=['#add-to-cart-button'])
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    product = resolver.resolve(make_pool(page))
+
+    assert product.price == 1999.99
+    assert product.in_stock is True
+    assert product.store == Store.AMAZON
+    # Complete on the first read: one round-trip, no selector wait
+    page.evaluate.assert_called_once()
+    page.locator.assert_not_called()
+
+
+def test_newegg_unavailable_selector_wins(no_http):
+    page = make_page(
+        price_texts=[['.price-current strong', '899.00']],
+        unavailable=['.product-inventory:has-text("OUT OF STOCK")'],
+        available=['.btn-primary:has-text("Add to Cart")']
+    )
+    resolver = NeweggResolver("PART", "https://newegg.com/test", "Test Part")
+
+    product = resolver.resolve(make_pool(page))
+
+    assert product.price == 899.00
+    assert product.in_stock is False
+
+
+def test_timeout_returns_error_product(no_http):
+    page = make_page()
+    page.goto.side_effect = TimeoutError("timed out")
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    product = resolver.resolve(make_pool(page))
+
+    assert product.price is None
+    assert product.in_stock is False
+    assert product.status == ScrapeStatus.FAILED
+
+
+def test_unreadable_page_is_not_reported_out_of_stock(no_http):
+    page = make_page(price_texts=[['#priceblock_ourprice', '$1,999.99']])
+    page.goto.return_value.status = 200
+    page.content.return_value = "<html><body>Loading...</body></html>"
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    product = resolver.resolve(make_pool(page))
+
+    assert product.status == ScrapeStatus.FAILED
+    assert not product.scraped
+
+
+def test_captcha_page_is_blocked(no_http):
+    page = make_page()
+    page.goto.return_value.status = 200
+    page.content.return_value = "<html><body>Enter the characters you see below. Robot Check</body></html>"
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    product = resolver.resolve(make_pool(page))
+
+    assert product.status == ScrapeStatus.BLOCKED
+    assert resolver.block_signal is not None
+
+
+@patch('product_resolvers.base_resolver.fetch_page')
+def test_http_tier_skips_browser(mock_fetch):
+    mock_fetch.return_value = HttpPage("https://amazon.com/test", 200, AMAZON_IN_STOCK_HTML)
+    pool = MagicMock()
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    product = resolver.resolve(pool)
+
+    assert product.price == 1999.99
+    assert product.in_stock is True
+    pool.page.assert_not_called()
+    assert fetch_tier_tracker.summary() == {Store.AMAZON: {FetchTier.HTTP: 1}}
+
+
+@patch('product_resolvers.base_resolver.fetch_page')
+def test_bot_wall_falls_back_to_browser(mock_fetch):
+    mock_fetch.return_value = HttpPage(
+        "https://amazon.com/test", 200, "<html><body>Robot Check: enter the captcha</body></html>")
+    page = make_page(price_texts=[['#priceblock_ourprice', '$1,999.99']], available=['#add-to-cart-button'])
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    product = resolver.resolve(make_pool(page))
+
+    assert product.in_stock is True
+    page.goto.assert_called_once()
+    assert fetch_tier_tracker.summary() == {Store.AMAZON: {FetchTier.BROWSER: 1}}
+
+
+@patch('product_resolvers.base_resolver.fetch_page')
+def test_marker_text_on_a_complete_http_page_is_not_a_block(mock_fetch):
+    html = AMAZON_IN_STOCK_HTML.replace('</body>', '<script>loadCaptcha = false;</script></body>')
+    mock_fetch.return_value = HttpPage("https://amazon.com/test", 200, html)
+    pool = MagicMock()
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    product = resolver.resolve(pool)
+
+    assert product.in_stock is True
+    assert resolver.block_signal is None
+    pool.page.assert_not_called()
+
+
+@patch('product_resolvers.base_resolver.fetch_page')
+def test_blocking_status_skips_http_extraction(mock_fetch):
+    mock_fetch.return_value = HttpPage("https://amazon.com/test", 429, AMAZON_IN_STOCK_HTML)
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    assert resolver._try_http() is None
+    assert resolver.block_signal is not None
+
+
+@patch('product_resolvers.base_resolver.fetch_page')
+def test_store_that_always_falls_back_skips_http(mock_fetch):
+    mock_fetch.return_value = HttpPage("https://amazon.com/test", 503, "")
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+    pool = make_pool(make_page(available=['#add-to-cart-button']))
+
+    for _ in range(fetch_tier_tracker.fallback_threshold + 2):
+        resolver.resolve(pool)
+
+    assert mock_fetch.call_count == fetch_tier_tracker.fallback_threshold
+
+
+def test_browser_json_ld_skips_selector_probing(no_http):
+    json_ld = '{"@type": "Product", "offers": {"price": "1999.99", "priceCurrency": "USD", ' \
+              '"availability": "https://schema.org/InStock"}}'
+    page = make_page({}, json_ld=[json_ld])
+    resolver = AmazonResolver("PART", "https://amazon.com/test", "Test Part")
+
+    product = resolver.resolve(make_pool(page))
+
+    assert product.price == 1999.99
+    assert product.in_stock is True
+    assert product.currency == "USD"
+    page.evaluate.assert_called_once()
+
+
+def test_incomplete_first_read_waits_and_reads_again(no_http):
+    page = make_page()
+    page.evaluate.side_effect = [
+        {'priceTexts': [], 'unavailable': [], 'available': [], 'jsonLd': [], 'state': {}},
+        {'priceTexts': [['.price-current strong', '1,049']], 'unavailable': [],
+         'available': ['.btn-primary:has-text("Add to Cart")'], 'jsonLd': [], 'state': {}},
+    ]
+    resolver = NeweggResolver("PART", "https://newegg.com/test", "Test Part")
+
+    product = resolver.resolve(make_pool(page))
+
+    assert product.price == 1049.0
+    assert product.in_stock is True
+    assert page.evaluate.call_count == 2
+    page.locator.assert_called()
@@ -0,0 +1,168 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+
+from product_resolvers.browser_pool import AsyncBrowserPool, BrowserPool, WarmAsyncBrowserPool
+
+
+@pytest.fixture
+def mock_playwright():
+    with patch('product_resolvers.browser_pool.sync_playwright') as mock_sync:
+        playwright = mock_sync.return_value.start.return_value
+        browser = playwright.chromium.launch.return_value
+        browser.is_connected.return_value = True
+        browser.new_context.side_effect = lambda **kwargs: MagicMock()
+        yield playwright
+
+
+def test_browser_launched_once_for_many_pages(mock_playwright):
+    with BrowserPool() as pool:
+        for _ in range(5):
+            with pool.page():
+                pass
+
+    assert mock_playwright.chromium.launch.call_count == 1
+    assert pool.launch_count == 1
+    assert pool.pages_served == 5
+
+
+def test_context_recycled_after_max_pages(mock_playwright):
+    browser = mock_playwright.chromium.launch.return_value
+    with BrowserPool(max_pages_per_context=2) as pool:
+        for _ in range(5):
+            with pool.page():
+                pass
+
+    assert browser.new_context.call_count == 3
+
+
+def test_page_closed_after_use(mock_playwright):
+    with BrowserPool() as pool:
+        with pool.page() as page:
+            pass
+
+    page.close.assert_called_once()
+
+
+def test_close_shuts_down_browser_and_driver(mock_playwright):
+    pool = BrowserPool()
+    with pool.page():
+        pass
+    pool.close()
+    pool.close()
+
+    mock_playwright.chromium.launch.return_value.close.assert_called_once()
+    mock_playwright.stop.assert_called_once()
+
+
+def test_browser_not_launched_until_first_page(mock_playwright):
+    with BrowserPool():
+        pass
+
+    mock_playwright.chromium.launch.assert_not_called()
+
+
+def test_async_pool_retires_context_after_open_pages_release():
+    contexts = []
+
+    def new_context(**kwargs):
+        context = AsyncMock()
+        context.set_default_timeout = MagicMock()
+        contexts.append(context)
+        return context
+
+    with patch('product_resolvers.browser_pool.async_playwright') as mock_async:
+        playwright = AsyncMock()
+        mock_async.return_value.start = AsyncMock(return_value=playwright)
+        browser = playwright.chromium.launch.return_value
+        browser.is_connected = MagicMock(return_value=True)
+        browser.new_context.side_effect = new_context
+
+        async def run():
+            async with AsyncBrowserPool(max_pages_per_context=2) as pool:
+                async def open_page():
+                    async with pool.page():
+                        await asyncio.sleep(0.01)
+                await asyncio.gather(*(open_page() for _ in range(5)))
+                return pool
+
+        pool = asyncio.run(run())
+
+    assert playwright.chromium.launch.call_count == 1
+    assert pool.pages_served == 5
+    assert len(contexts) == 3
+    for context in contexts:
+        context.close.assert_awaited_once()
+
+
+@pytest.fixture
+def mock_async_playwright():
+    def new_context(**kwargs):
+        context = AsyncMock()
+        context.set_default_timeout = MagicMock()
+        return context
+
+    with patch('product_resolvers.browser_pool.async_playwright') as mock_async:
+        playwright = AsyncMock()
+        mock_async.return_value.start = AsyncMock(return_value=playwright)
+        browser = playwright.chromium.launch.return_value
+        browser.is_connected = MagicMock(return_value=True)
+        browser.new_context.side_effect = new_context
+        yield playwright
+
+
+def run_sweeps(pool, sweeps: int, pages: int) -> None:
+    """Simulate warm invocations on one long-lived loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        for _ in range(sweeps):
+            async def sweep():
+                async with pool:
+                    for _ in range(pages):
+                        async with pool.page():
+                            pass
+            loop.run_until_complete(sweep())
+    finally:
+        loop.close()
+
+
+def test_warm_pool_reuses_browser_across_runs(mock_async_playwright):
+    pool = WarmAsyncBrowserPool(memory_probe=lambda: None)
+    run_sweeps(pool, sweeps=3, pages=4)
+
+    assert pool.launch_count == 1
+    assert mock_async_playwright.chromium.launch.return_value.close.await_count == 0
+    mock_async_playwright.stop.assert_not_awaited()
+
+
+def test_warm_pool_relaunches_after_max_pages(mock_async_playwright):
+    pool = WarmAsyncBrowserPool(max_pages_per_browser=5, memory_probe=lambda: None)
+    run_sweeps(pool, sweeps=3, pages=3)
+
+    # Recycled after the second sweep crossed five pages
+    assert pool.recycle_count == 1
+    assert pool.launch_count == 2
+    # The driver is kept; only Chromium restarts
+    assert mock_async_playwright.chromium.launch.call_count == 2
+    mock_async_playwright.stop.assert_not_awaited()
+
+
+def test_warm_pool_relaunches_on_memory_growth(mock_async_playwright):
+    readings = iter([100, 100 + 600 * 1024 * 1024, 200, 200])
+    pool = WarmAsyncBrowserPool(max_memory_growth_mb=512, memory_probe=lambda: next(readings))
+    run_sweeps(pool, sweeps=2, pages=1)
+
+    assert pool.recycle_count == 1
+    assert pool.launch_count == 2
+
+
+def test_warm_pool_relaunches_crashed_browser(mock_async_playwright):
+    browser = mock_async_playwright.chromium.launch.return_value
+    pool = WarmAsyncBrowserPool(memory_probe=lambda: None)
+    run_sweeps(pool, sweeps=1, pages=1)
+    browser.is_connected.return_value = False
+    run_sweeps(pool, sweeps=1, pages=1)
+
+    assert pool.launch_count == 2
+    # A failed health check restarts the driver as well
+    mock_async_playwright.stop.assert_awaited_once()
@@ -0,0 +1,115 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from catalog.catalog import CatalogEntry, load_catalog, load_catalog_file, parse_catalog
+from catalog.sharding import InProcessShardQueue, Shard, fan_out, is_shard_event, shard_catalog
+from handler import handle
+from models.store import Store
+from product_resolvers.amazon_resolver import AmazonResolver
+from product_resolvers.cc_resolver import CanadaComputersResolver
+from product_resolvers.registry import resolvers_for_entries
+
+
+def make_entries(count: int) -> list[CatalogEntry]:
+    return [
+        CatalogEntry(f"PART-{i}", f"Part {i}", {Store.AMAZON: f"https://amazon.com/{i}"})
+        for i in range(count)
+    ]
+
+
+def test_bundled_catalog_loads():
+    entries = load_catalog()
+
+    assert entries[0].product_id == "NVIDIA-RTX-3090TI-FE"
+    assert set(entries[0].urls) == {Store.AMAZON, Store.NEWEGG}
+
+
+def test_yaml_catalog(tmp_path):
+    path = tmp_path / "catalog.yaml"
+    path.write_text(
+        "products:\n"
+        "  - id: RX-7900\n"
+        "    title: Radeon RX 7900\n"
+        "    urls:\n"
+        "      CANADA_COMPUTERS: https://canadacomputers.com/rx7900\n"
+    )
+
+    entries = load_catalog_file(str(path))
+
+    assert entries == [CatalogEntry("RX-7900", "Radeon RX 7900",
+                                    {Store.CANADA_COMPUTERS: "https://canadacomputers.com/rx7900"})]
+
+
+def test_unknown_store_rejected():
+    with pytest.raises(ValueError):
+        parse_catalog({"products": [{"id": "X", "urls": {"BEST_BUY": "https://bestbuy.com"}}]})
+
+
+def test_entry_round_trip():
+    entry = make_entries(1)[0]
+
+    assert CatalogEntry.from_dict(json.loads(json.dumps(entry.to_dict()))) == entry
+
+
+def test_resolvers_built_per_store():
+    entry = CatalogEntry("P", "Part", {Store.AMAZON: "https://a", Store.CANADA_COMPUTERS: "https://c"})
+
+    resolvers = resolvers_for_entries([entry])
+
+    assert sorted(type(r).__name__ for r in resolvers) == [AmazonResolver.__name__, CanadaComputersResolver.__name__]
+
+
+def test_shard_catalog_splits_evenly():
+    shards = shard_catalog(make_entries(7), shard_size=3)
+
+    assert [len(shard.entries) for shard in shards] == [3, 3, 1]
+    assert all(shard.count == 3 for shard in shards)
+
+
+def test_shard_event_round_trip():
+    shard = shard_catalog(make_entries(2), shard_size=5)[0]
+    event = json.loads(json.dumps(shard.to_event()))
+
+    assert is_shard_event(event)
+    assert not is_shard_event({"source": "aws.events"})
+    assert Shard.from_event(event) == shard
+
+
+@patch('handler.find_product_availability', return_value=[])
+@patch('handler.load_catalog')
+@patch('handler.default_shard_queue')
+def test_scheduled_event_fans_out_to_workers(mock_queue, mock_load, mock_find, monkeypatch):
+    monkeypatch.setenv('FAN_OUT_ENABLED', 'true')
+    monkeypatch.setenv('SHARD_SIZE', '4')
+    mock_load.return_value = make_entries(10)
+    queue = InProcessShardQueue(worker=handle)
+    mock_queue.return_value = queue
+
+    handle({"source": "aws.events"}, None)
+
+    assert len(queue.sent) == 3
+    assert mock_find.call_count == 3
+    processed = [entry.product_id for call in mock_find.call_args_list for entry in call.args[0]]
+    assert processed == [f"PART-{i}" for i in range(10)]
+
+
+@patch('handler.find_product_availability', return_value=[])
+@patch('handler.load_catalog')
+def test_small_catalog_processed_locally(mock_load, mock_find, monkeypatch):
+    monkeypatch.setenv('FAN_OUT_ENABLED', 'true')
+    mock_load.return_value = make_entries(3)
+
+    handle({"source": "aws.events"}, None)
+
+    mock_find.assert_called_once_with(mock_load.return_value)
+
+
+def test_fan_out_records_events():
+    queue = InProcessShardQueue()
+
+    shards = fan_out(make_entries(5), queue, shard_size=2)
+
+    assert len(shards) == 3
+    assert [Shard.from_event(event).index for event in queue.sent] == [0, 1, 2]
@@ -0,0 +1,96 @@
+import asyncio
+from decimal import Decimal
+
+from models.product import Product, ScrapeStatus
+from models.store import Store
+from product_resolvers.base_resolver import BaseResolver
+from product_resolvers.circuit_breaker import BreakerBoard, BreakerState, CircuitBreaker
+from product_resolvers.resolution_scheduler import ConcurrencyLimits, ResolutionScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAsyncBrowserPool:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class FakeResolver(BaseResolver):
+    def __init__(self, store: Store, index: int, fails: bool, attempts: list):
+        super().__init__(f"PART-{index}", f"https://example.com/{store.name}/{index}", "Test Part")
+        self.store_name = store
+        self.fails = fails
+        self.attempts = attempts
+
+    async def resolve_async(self, browser_pool) -> Product:
+        await asyncio.sleep(0)
+        self.attempts.append(self.product_id)
+        if self.fails:
+            return self._create_error_product()
+        return self._create_product(Decimal('10.00'), True)
+
+
+def product(url: str, status: ScrapeStatus = ScrapeStatus.OK, store: Store = Store.NEWEGG) -> Product:
+    return Product(id="A", name="A", price=None, url=url, store=store, in_stock=False, status=status)
+
+
+def test_breaker_opens_then_probes_after_reset():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+
+    clock.now += 60
+    # Exactly one probe goes through
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == BreakerState.OPEN
+
+    clock.now += 60
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
+    assert breaker.allow()
+
+
+def test_url_breaker_isolates_one_bad_page():
+    board = BreakerBoard(store_failure_threshold=5, url_failure_threshold=2, clock=FakeClock())
+    for _ in range(2):
+        board.record(product("https://example.com/bad", ScrapeStatus.FAILED))
+        board.record(product("https://example.com/good"))
+
+    assert not board.allow(Store.NEWEGG, "https://example.com/bad")
+    assert board.allow(Store.NEWEGG, "https://example.com/good")
+    assert board.open_stores() == []
+
+
+def test_open_store_skips_rest_of_sweep():
+    attempts = []
+    board = BreakerBoard(store_failure_threshold=3, clock=FakeClock())
+    resolvers = [FakeResolver(Store.AMAZON, i, True, attempts) for i in range(10)]
+    resolvers += [FakeResolver(Store.NEWEGG, i, False, attempts) for i in range(3)]
+    limits = ConcurrencyLimits(default_per_store=1)
+    scheduler = ResolutionScheduler(limits, browser_pool_factory=FakeAsyncBrowserPool, breakers=board)
+
+    products = scheduler.run(resolvers)
+
+    statuses = [p.status for p in products if p.store == Store.AMAZON]
+    assert statuses.count(ScrapeStatus.FAILED) == 3
+    assert statuses.count(ScrapeStatus.SKIPPED) == 7
+    assert len(attempts) == 6
+    assert all(p.scraped for p in products if p.store == Store.NEWEGG)
+    assert board.open_stores() == [Store.AMAZON]
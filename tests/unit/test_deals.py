@@ -0,0 +1,134 @@
+import os
+import warnings
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+
+from analytics import deals
+from analytics.deals import DealCriteria, PriceMatrix, build_price_matrix, compute_stats, find_deals, rolling_min
+from aws_accessors.price_history_accessor import PricePoint
+from notifications.outbox import InMemoryOutboxStore, NotificationKind
+from notifications.subscriptions import SubscriptionIndex
+from tests.helpers import make_product
+
+DAY = 86400
+START = 1_700_006_400  # a day boundary
+
+
+def matrix(rows: dict[str, list[float]]) -> PriceMatrix:
+    return PriceMatrix(keys=[(part_id, 'AMAZON') for part_id in rows], start=START,
+                       prices=np.array(list(rows.values()), dtype=float))
+
+
+def test_build_price_matrix_keeps_daily_minimum():
+    series = {
+        ('A', 'AMAZON'): [
+            PricePoint(START + 100, 1000, True),
+            PricePoint(START + 200, 900, True),
+            PricePoint(START + 2 * DAY, None, False),
+            PricePoint(START + 2 * DAY + 5, 950, True),
+            PricePoint(START + 10 * DAY, 1, True),  # outside the matrix
+        ],
+        ('B', 'NEWEGG'): [],
+    }
+
+    result = build_price_matrix(series, START + 3600, days=3)
+
+    assert result.start == START
+    np.testing.assert_array_equal(result.prices[0], [900, np.nan, 950])
+    assert np.isnan(result.prices[1]).all()
+
+
+def test_stats_use_last_observation_and_window():
+    prices = matrix({'A': [100, 120, np.nan, 80, np.nan]})
+
+    stats = compute_stats(prices, DealCriteria(window_days=3))
+
+    assert stats.current[0] == 80
+    assert stats.window_median[0] == 80
+    assert stats.previous_low[0] == 100
+    assert stats.history_days[0] == 3
+
+
+def test_live_price_replaces_a_recovered_daily_dip():
+    # The day's rollup holds a dip to 70 that has since recovered to 100
+    prices = matrix({'A': [100] * 9 + [70]})
+    criteria = DealCriteria(min_history_days=3)
+
+    assert [deal.part_id for deal in find_deals(prices, criteria)] == ['A']
+    assert find_deals(prices, criteria, current=[100]) == []
+    assert find_deals(prices, criteria, current=[70])[0].all_time_low
+
+
+def test_rolling_min_ignores_gaps():
+    result = rolling_min(np.array([[5.0, np.nan, 3.0, 4.0, 6.0]]), window_days=2)
+
+    np.testing.assert_array_equal(result, [[5.0, 5.0, 3.0, 3.0, 4.0]])
+
+
+def test_find_deals_ranks_drops_and_all_time_lows():
+    criteria = DealCriteria(window_days=5, min_drop_pct=15.0, min_history_days=3)
+    prices = matrix({
+        'steady': [100, 100, 100, 100, 100],
+        'small-drop-low': [100, 100, 100, 100, 95],
+        'big-drop': [100, 100, 100, 100, 70],
+        'bigger-drop': [100, 100, 100, 100, 50],
+        'new': [np.nan, np.nan, np.nan, np.nan, 10],
+    })
+
+    deals = find_deals(prices, criteria)
+
+    assert [deal.part_id for deal in deals] == ['bigger-drop', 'big-drop', 'small-drop-low']
+    assert deals[0].drop_pct == 50.0 and deals[0].all_time_low
+    assert deals[2].describe() == "small-drop-low at AMAZON is $0.95: 5% below the median of $1.00, new all-time low"
+
+
+def test_find_deals_skips_out_of_stock():
+    prices = matrix({'A': [100, 100, 100, 50], 'B': [100, 100, 100, 50]})
+
+    deals = find_deals(prices, DealCriteria(window_days=4, min_history_days=1), in_stock=np.array([False, True]))
+
+    assert [deal.part_id for deal in deals] == ['B']
+
+
+def test_quantiles_match_numpy():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 100, size=(50, 12))
+    values[rng.random(values.shape) < 0.3] = np.nan
+    values[0] = np.nan
+
+    prices = PriceMatrix(keys=[(str(i), 'AMAZON') for i in range(50)], start=START, prices=values)
+    stats = compute_stats(prices, DealCriteria(window_days=12, percentile=10.0))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        np.testing.assert_allclose(stats.window_median, np.nanmedian(values, axis=1))
+        np.testing.assert_allclose(stats.window_percentile, np.nanpercentile(values, 10, axis=1))
+
+
+@patch.dict(os.environ, {'PRICE_HISTORY_ENABLED': 'true', 'DEAL_ALERTS_ENABLED': 'true', 'OUTBOX_STORE': 'memory'})
+@patch('handler.drain_outbox')
+@patch('handler.price_history_accessor')
+@patch('handler.find_product_availability')
+@patch('handler.dynamodb_accessor')
+@patch('handler.publish_to_discord')
+def test_handler_enqueues_deals_for_changed_prices(mock_discord, mock_dynamo, mock_find, mock_history, mock_drain):
+    from handler import handle
+    from notifications import outbox
+
+    steady = make_product('B')
+    mock_find.return_value = [make_product('A', price=Decimal('80')), steady]
+    mock_dynamo.batch_get_items.return_value = {('A', 'AMAZON'): make_product('A'), ('B', 'AMAZON'): steady}
+    history = matrix({'A': [10000] * 9 + [8000]})
+
+    with patch.object(outbox, '_memory_store', InMemoryOutboxStore()), \
+            patch.object(deals, 'matrix_from_daily_rollups', return_value=history) as mock_matrix, \
+            patch('handler.load_subscription_index', return_value=SubscriptionIndex(fallback_channel='default')):
+        handle(None, None)
+        pending = outbox.outbox_store_from_env().pending()
+
+    # Only the product whose price changed is looked up
+    mock_matrix.assert_called_once_with([('A', 'AMAZON')])
+    assert [(record.kind, record.product.id) for record in pending] == [(NotificationKind.DEAL, 'A')]
+    assert mock_drain.call_count == 2
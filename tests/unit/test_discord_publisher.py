@@ -0,0 +1,151 @@
+import json
+import threading
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from discord.discord_publisher import BackgroundPublisher, DiscordPublisher, TokenBucket
+from models.product import Product
+from models.store import Store
+
+
+class StubWebhookServer:
+    """Local Discord webhook stand-in that records payloads and replays scripted responses."""
+
+    def __init__(self) -> None:
+        self.payloads: list[dict] = []
+        # (status, headers) returned in order; 204 with no headers once exhausted
+        self.responses: list[tuple[int, dict]] = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                with stub._lock:
+                    stub.payloads.append(json.loads(body))
+                    status, headers = stub.responses.pop(0) if stub.responses else (204, {})
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                response_body = b'{"retry_after": 0.01}' if status == 429 else b''
+                self.send_header('Content-Length', str(len(response_body)))
+                self.end_headers()
+                self.wfile.write(response_body)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}/webhook"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubWebhookServer()
+    yield server
+    server.close()
+
+
+def make_products(count: int) -> list[Product]:
+    return [
+        Product(id=f"PART-{i}", name=f"Part {i}", price=Decimal('99.99'), url=f"https://example.com/{i}",
+                store=Store.AMAZON, in_stock=True)
+        for i in range(count)
+    ]
+
+
+def test_packs_ten_embeds_per_message(stub):
+    publisher = DiscordPublisher()
+
+    messages = publisher.publish_products(stub.url, make_products(23))
+
+    assert messages == 3
+    assert [len(payload['embeds']) for payload in stub.payloads] == [10, 10, 3]
+    assert stub.payloads[0]['embeds'][0]['url'] == "https://example.com/0"
+
+
+def test_retries_after_429(stub):
+    stub.responses = [(429, {'Retry-After': '0.05'})]
+    sleeps: list[float] = []
+    publisher = DiscordPublisher(sleep=lambda seconds: sleeps.append(seconds))
+
+    publisher.publish_products(stub.url, make_products(1))
+
+    assert len(stub.payloads) == 2
+    assert sleeps and sleeps[0] > 0
+
+
+def test_waits_when_rate_limit_headers_say_bucket_is_empty(stub):
+    stub.responses = [(204, {'X-RateLimit-Limit': '5', 'X-RateLimit-Remaining': '0',
+                             'X-RateLimit-Reset-After': '0.2'})]
+    sleeps: list[float] = []
+    publisher = DiscordPublisher(sleep=lambda seconds: sleeps.append(seconds))
+
+    publisher.publish_products(stub.url, make_products(11))
+
+    assert len(stub.payloads) == 2
+    assert sleeps and 0 < sleeps[0] <= 0.2
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(capacity=2, refill_seconds=2.0, clock=lambda: now[0])
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0)
+    now[0] = 1.0
+    assert bucket.reserve() == 0.0
+
+
+def test_background_publisher_groups_queued_alerts_per_webhook(stub):
+    background = BackgroundPublisher(DiscordPublisher())
+
+    for product in make_products(4):
+        background.submit(stub.url, [product])
+    errors = background.flush()
+
+    assert sum(len(payload['embeds']) for payload in stub.payloads) == 4
+    assert len(stub.payloads) <= 4
+    assert errors == []
+
+
+def test_background_publisher_survives_unexpected_errors_and_clears_them_on_flush(stub):
+    publisher = DiscordPublisher()
+    calls = []
+
+    def send_embeds(webhook_url, embeds):
+        calls.append(webhook_url)
+        if len(calls) == 1:
+            raise KeyError('embed')
+        return DiscordPublisher.send_embeds(publisher, webhook_url, embeds)
+
+    publisher.send_embeds = send_embeds
+    background = BackgroundPublisher(publisher)
+
+    background.submit(stub.url, make_products(1))
+    errors = background.flush()
+    background.submit(stub.url, make_products(1))
+
+    assert [type(error) for error in errors] == [KeyError]
+    assert background.flush() == []
+    assert len(stub.payloads) == 1
+
+
+def test_malformed_rate_limit_headers_are_ignored(stub):
+    stub.responses = [(429, {'Retry-After': 'soon'}),
+                      (204, {'X-RateLimit-Limit': 'five', 'X-RateLimit-Remaining': '',
+                             'X-RateLimit-Reset-After': 'n/a'})]
+    publisher = DiscordPublisher(sleep=lambda seconds: None)
+
+    publisher.publish_products(stub.url, make_products(1))
+
+    assert len(stub.payloads) == 2
+    assert publisher.bucket(stub.url).capacity == 5
@@ -0,0 +1,193 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from aws_accessors import dynamodb_accessor
+from models.store import Store
+from tests.helpers import make_product
+
+
+@pytest.fixture
+def mock_client():
+    with patch('aws_accessors.dynamodb_accessor.get_client') as get_client:
+        yield get_client.return_value
+
+
+@pytest.fixture
+def mock_table():
+    with patch('aws_accessors.dynamodb_accessor.get_table') as get_table:
+        yield get_table.return_value
+
+
+def raw_item(part_id: str, store_id: str, in_stock: bool = True) -> dict:
+    return {
+        'PartId': {'S': part_id},
+        'StoreId': {'S': store_id},
+        'Name': {'S': f"Part {part_id}"},
+        'Price': {'N': '199.99'},
+        'Url': {'S': f"https://example.com/{part_id}"},
+        'InStock': {'BOOL': in_stock},
+    }
+
+
+def echo_batch_get(RequestItems):
+    keys = RequestItems[dynamodb_accessor.DYNAMODB_TABLE_NAME]['Keys']
+    items = [raw_item(key['PartId']['S'], key['StoreId']['S']) for key in keys]
+    return {'Responses': {dynamodb_accessor.DYNAMODB_TABLE_NAME: items}, 'UnprocessedKeys': {}}
+
+
+def test_batch_get_chunks_by_100_keys(mock_client):
+    mock_client.batch_get_item.side_effect = echo_batch_get
+    keys = [(f"PART-{i}", Store.AMAZON.name) for i in range(250)]
+
+    products = dynamodb_accessor.batch_get_items(keys)
+
+    chunk_sizes = sorted(
+        len(call.kwargs['RequestItems'][dynamodb_accessor.DYNAMODB_TABLE_NAME]['Keys'])
+        for call in mock_client.batch_get_item.call_args_list
+    )
+    assert chunk_sizes == [50, 100, 100]
+    assert len(products) == 250
+    product = products[("PART-7", "AMAZON")]
+    assert product.store == Store.AMAZON
+    assert product.price == Decimal('199.99')
+    assert product.in_stock is True
+
+
+@patch('aws_accessors.dynamodb_accessor.time.sleep')
+def test_batch_get_retries_unprocessed_keys(mock_sleep, mock_client):
+    table = dynamodb_accessor.DYNAMODB_TABLE_NAME
+    unprocessed_key = {'PartId': {'S': 'B'}, 'StoreId': {'S': 'NEWEGG'}}
+    mock_client.batch_get_item.side_effect = [
+        {'Responses': {table: [raw_item('A', 'AMAZON')]},
+         'UnprocessedKeys': {table: {'Keys': [unprocessed_key]}}},
+        {'Responses': {table: [raw_item('B', 'NEWEGG', in_stock=False)]}, 'UnprocessedKeys': {}},
+    ]
+
+    products = dynamodb_accessor.batch_get_items([('A', 'AMAZON'), ('B', 'NEWEGG')])
+
+    assert set(products) == {('A', 'AMAZON'), ('B', 'NEWEGG')}
+    assert products[('B', 'NEWEGG')].in_stock is False
+    retry = mock_client.batch_get_item.call_args_list[1]
+    assert retry.kwargs['RequestItems'] == {table: {'Keys': [unprocessed_key]}}
+    mock_sleep.assert_called_once()
+
+
+def test_batch_get_omits_missing_and_duplicate_keys(mock_client):
+    mock_client.batch_get_item.return_value = {'Responses': {dynamodb_accessor.DYNAMODB_TABLE_NAME: []}}
+
+    products = dynamodb_accessor.batch_get_items([('A', 'AMAZON'), ('A', 'AMAZON')])
+
+    assert products == {}
+    keys = mock_client.batch_get_item.call_args.kwargs['RequestItems'][dynamodb_accessor.DYNAMODB_TABLE_NAME]['Keys']
+    assert len(keys) == 1
+    assert dynamodb_accessor.batch_get_items([]) == {}
+
+
+def test_poll_schedule_reads_share_the_batch_get_helper(mock_client):
+    from aws_accessors import poll_schedule_accessor
+
+    table = poll_schedule_accessor.POLL_SCHEDULE_TABLE_NAME
+    mock_client.batch_get_item.return_value = {
+        'Responses': {table: [{'PartId': {'S': 'A'}, 'StoreId': {'S': 'AMAZON'}, 'NextCheckAt': {'N': '60'}}]}}
+
+    items = poll_schedule_accessor.get_items([('A', 'AMAZON'), ('A', 'AMAZON')])
+
+    assert items == [{'PartId': 'A', 'StoreId': 'AMAZON', 'NextCheckAt': Decimal(60)}]
+    assert mock_client.batch_get_item.call_args.kwargs['RequestItems'] == {
+        table: {'Keys': [{'PartId': {'S': 'A'}, 'StoreId': {'S': 'AMAZON'}}]}}
+
+
+def test_query_item_returns_none_when_missing(mock_table):
+    mock_table.query.return_value = {'Items': []}
+
+    assert dynamodb_accessor.query_item('A', 'AMAZON') is None
+
+
+def test_write_buffer_batches_by_25(mock_client):
+    mock_client.batch_write_item.return_value = {'UnprocessedItems': {}}
+    buffer = dynamodb_accessor.WriteBuffer()
+
+    for i in range(60):
+        buffer.add(make_product(f"PART-{i}", price=199.99))
+    buffer.flush()
+
+    batch_sizes = sorted(
+        len(call.kwargs['RequestItems'][dynamodb_accessor.DYNAMODB_TABLE_NAME])
+        for call in mock_client.batch_write_item.call_args_list
+    )
+    assert batch_sizes == [10, 25, 25]
+    first_request = mock_client.batch_write_item.call_args_list[0].kwargs['RequestItems']
+    item = first_request[dynamodb_accessor.DYNAMODB_TABLE_NAME][0]['PutRequest']['Item']
+    assert item['Price'] == {'N': '199.99'}
+
+
+def test_write_buffer_skips_unchanged_state(mock_client):
+    mock_client.batch_write_item.return_value = {'UnprocessedItems': {}}
+    stored = make_product('A', price=Decimal('199.99'), in_stock=False)
+    buffer = dynamodb_accessor.WriteBuffer({('A', 'AMAZON'): stored})
+
+    assert buffer.add(make_product('A', price=199.99, in_stock=False)) is False
+    assert buffer.add(make_product('A', price=199.99, in_stock=True)) is True
+    buffer.flush()
+
+    assert (buffer.written, buffer.skipped) == (1, 1)
+    mock_client.batch_write_item.assert_called_once()
+
+
+@patch('aws_accessors.dynamodb_accessor.time.sleep')
+def test_write_buffer_retries_unprocessed_items(mock_sleep, mock_client):
+    table = dynamodb_accessor.DYNAMODB_TABLE_NAME
+    unprocessed = {table: [{'PutRequest': {'Item': {'PartId': {'S': 'B'}}}}]}
+    mock_client.batch_write_item.side_effect = [{'UnprocessedItems': unprocessed}, {'UnprocessedItems': {}}]
+    buffer = dynamodb_accessor.WriteBuffer()
+
+    buffer.add(make_product('A'))
+    buffer.add(make_product('B'))
+    buffer.flush()
+
+    assert mock_client.batch_write_item.call_args_list[1].kwargs['RequestItems'] == unprocessed
+    mock_sleep.assert_called_once()
+
+
+def conditional_check_failed() -> ClientError:
+    return ClientError({'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'failed'}}, 'UpdateItem')
+
+
+def stored_item(part_id: str, price: str, in_stock: bool) -> dict:
+    return {'PartId': part_id, 'StoreId': 'AMAZON', 'Name': f"Part {part_id}", 'Price': Decimal(price),
+            'Url': f"https://example.com/{part_id}", 'InStock': in_stock}
+
+
+def test_record_transition_reports_restock(mock_table):
+    mock_table.update_item.return_value = {'Attributes': stored_item('A', '199.99', in_stock=False)}
+
+    transition = dynamodb_accessor.record_transition(make_product('A', price=199.99, in_stock=True))
+
+    assert transition.changed and transition.restocked
+    assert not transition.price_dropped
+    kwargs = mock_table.update_item.call_args.kwargs
+    assert kwargs['ReturnValues'] == 'ALL_OLD'
+    assert 'attribute_not_exists(PartId)' in kwargs['ConditionExpression']
+    assert kwargs['ExpressionAttributeValues'][':price'] == Decimal('199.99')
+
+
+def test_record_transition_reports_price_drop_and_first_sighting(mock_table):
+    mock_table.update_item.return_value = {'Attributes': stored_item('A', '249.99', in_stock=True)}
+    dropped = dynamodb_accessor.record_transition(make_product('A', price=199.99, in_stock=True))
+    assert dropped.price_dropped and not dropped.restocked
+
+    mock_table.update_item.return_value = {}
+    first = dynamodb_accessor.record_transition(make_product('B', in_stock=True))
+    assert first.first_seen and first.restocked
+
+
+def test_record_transition_unchanged_state(mock_table):
+    mock_table.update_item.side_effect = conditional_check_failed()
+
+    transition = dynamodb_accessor.record_transition(make_product('A'))
+
+    assert not transition.changed
+    assert not transition.restocked and not transition.price_dropped
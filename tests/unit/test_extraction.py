@@ -0,0 +1,88 @@
+from product_resolvers.cc_resolver import CanadaComputersResolver
+from product_resolvers.extraction import ExtractionSpec, SelectorRule, extract_from_html
+from product_resolvers.newegg_resolver import NeweggResolver
+
+
+def extract(resolver_cls, html):
+    return extract_from_html(html, resolver_cls.SPEC)
+
+
+def test_playwright_selector_rendering():
+    assert SelectorRule('#price').playwright_selector == '#price'
+    assert SelectorRule('.btn', 'Add to Cart').playwright_selector == '.btn:has-text("Add to Cart")'
+
+
+def test_newegg_in_stock_from_html():
+    html = """
+    <div class="price-current">$<strong>1,049</strong><sup>.99</sup></div>
+    <button class="btn btn-primary">Add to Cart</button>
+    """
+    result = extract(NeweggResolver, html)
+
+    assert result.price == 1049.0
+    assert result.in_stock is True
+    assert result.complete
+
+
+def test_text_match_is_case_insensitive():
+    html = """
+    <div class="product-inventory"><strong>Out of Stock.</strong></div>
+    <button class="btn btn-primary">Add to Cart</button>
+    """
+    result = extract(NeweggResolver, html)
+
+    assert result.in_stock is False
+    assert result.complete
+
+
+def test_in_stock_without_price_is_incomplete():
+    html = '<button class="buy-now">Buy Now</button>'
+    result = extract(CanadaComputersResolver, html)
+
+    assert result.in_stock is True
+    assert result.price is None
+    assert not result.complete
+
+
+def test_no_signals_is_incomplete():
+    result = extract(CanadaComputersResolver, '<div id="app"></div>')
+
+    assert not result.complete
+
+
+def test_disabled_buy_button_is_unavailable():
+    html = """
+    <span class="current-price-value">$549.99</span>
+    <button class="buy-now" disabled>Buy Now</button>
+    """
+    result = extract(CanadaComputersResolver, html)
+
+    assert result.price == 549.99
+    assert result.in_stock is False
+
+
+def test_signals_record_matched_rules():
+    html = """
+    <span class="current-price-value">$549.99</span>
+    <button class="buy-now" disabled>Buy Now</button>
+    """
+    result = extract(CanadaComputersResolver, html)
+
+    assert result.signals == [
+        'price:.current-price-value',
+        'unavailable:button.buy-now[disabled]',
+    ]
+
+
+def test_page_script_embeds_spec():
+    spec = ExtractionSpec(
+        price_rules=(SelectorRule('#price'),),
+        available_rules=(SelectorRule('.btn', 'Add to Cart'),),
+    )
+
+    script = spec.page_script
+
+    assert script.lstrip().startswith('() =>')
+    assert '"css": "#price"' in script
+    assert '"text": "Add to Cart"' in script
+    assert spec.page_script is script
@@ -2,7 +2,7 @@ import sys
 import os
 from decimal import Decimal
 import pytest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 # Add project root and lambda to Python path
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
@@ -12,9 +12,10 @@ if project_root not in sys.path:
 if lambda_path not in sys.path:
     sys.path.insert(0, lambda_path)
 
-from handler import handle
-from models.product import Product
+from handler import handle, publish_to_discord
+from models.product import Product, ScrapeStatus
 from models.store import Store
+from notifications.outbox import DEFAULT_CHANNEL, NotificationKind
 
 @pytest.fixture
 def mock_product():
@@ -33,11 +34,85 @@ def mock_product():
 def test_new_product_in_stock_amazon(mock_discord, mock_dynamo, mock_find, mock_product):
     # Arrange
     mock_find.return_value = [mock_product]
-    mock_dynamo.query_item.return_value = None  # No previous record
+    mock_dynamo.batch_get_items.return_value = {}  # No previous record
 
     # Act
     handle(None, None)
 
     # Assert
-    mock_dynamo.put_item.assert_called_once_with(mock_product)
-    mock_discord.assert_called_once_with([mock_product])
+    mock_dynamo.WriteBuffer.assert_called_once_with({})
+    write_buffer = mock_dynamo.WriteBuffer.return_value
+    write_buffer.add.assert_called_once_with(mock_product)
+    write_buffer.flush.assert_called_once()
+    mock_discord.assert_called_once_with([mock_product], DEFAULT_CHANNEL, kind=NotificationKind.RESTOCK)
+
+@patch('handler.find_product_availability')
+@patch('handler.dynamodb_accessor')
+@patch('handler.publish_to_discord')
+def test_failed_scrapes_are_not_recorded(mock_discord, mock_dynamo, mock_find, mock_product):
+    failed = Product(id="OTHER", name="Other", price=None, url="https://amazon.com/other",
+                     store=Store.AMAZON, in_stock=False, status=ScrapeStatus.FAILED)
+    skipped = Product(id="THIRD", name="Third", price=None, url="https://amazon.com/third",
+                      store=Store.AMAZON, in_stock=False, status=ScrapeStatus.SKIPPED)
+    mock_find.return_value = [failed, mock_product, skipped]
+    mock_dynamo.batch_get_items.return_value = {}
+
+    handle(None, None)
+
+    keys = list(mock_dynamo.batch_get_items.call_args.args[0])
+    assert keys == [(mock_product.id, Store.AMAZON.name)]
+    write_buffer = mock_dynamo.WriteBuffer.return_value
+    write_buffer.add.assert_called_once_with(mock_product)
+
+@patch.dict(os.environ, {'STATE_WRITE_MODE': 'conditional'})
+@patch('handler.find_product_availability')
+@patch('handler.dynamodb_accessor')
+@patch('handler.publish_to_discord')
+def test_conditional_mode_publishes_restocks_only(mock_discord, mock_dynamo, mock_find, mock_product):
+    restocked = MagicMock(changed=True, restocked=True, price_dropped=False)
+    unchanged = MagicMock(changed=False)
+    mock_find.return_value = [mock_product, mock_product]
+    mock_dynamo.record_transition.side_effect = [restocked, unchanged]
+
+    handle(None, None)
+
+    assert mock_dynamo.record_transition.call_count == 2
+    mock_dynamo.batch_get_items.assert_not_called()
+    mock_discord.assert_called_once_with([mock_product], DEFAULT_CHANNEL, kind=NotificationKind.RESTOCK)
+
+@patch.dict(os.environ, {'PRICE_HISTORY_ENABLED': 'true'})
+@patch('handler.price_history_accessor')
+@patch('handler.find_product_availability')
+@patch('handler.dynamodb_accessor')
+@patch('handler.publish_to_discord')
+def test_price_history_failure_does_not_block_alerts(mock_discord, mock_dynamo, mock_find, mock_history, mock_product):
+    mock_find.return_value = [mock_product]
+    mock_dynamo.batch_get_items.return_value = {}
+    mock_history.record_prices.side_effect = RuntimeError("throttled")
+
+    handle(None, None)
+
+    mock_dynamo.WriteBuffer.return_value.flush.assert_called_once()
+    mock_discord.assert_called_once_with([mock_product], DEFAULT_CHANNEL, kind=NotificationKind.RESTOCK)
+    mock_history.record_prices.assert_called_once_with([mock_product])
+
+@patch('handler.get_background_publisher')
+@patch('handler.ssm_accessor')
+def test_publish_to_discord_queues_in_stock_products(mock_ssm, mock_get_publisher, mock_product):
+    out_of_stock = Product(id="OTHER", name="Other", price=None, url="https://amazon.com/other",
+                           store=Store.AMAZON, in_stock=False)
+    mock_ssm.retrieve_parameter.return_value = "https://discord.test/webhook"
+
+    publish_to_discord([mock_product, out_of_stock])
+
+    mock_get_publisher.return_value.submit.assert_called_once_with("https://discord.test/webhook", [mock_product], "Stock Alert!")
+
+
+@patch('handler.get_background_publisher')
+@patch('handler.ssm_accessor')
+def test_deals_published_directly_are_titled_as_deals(mock_ssm, mock_get_publisher, mock_product):
+    mock_ssm.retrieve_parameter.return_value = "https://discord.test/webhook"
+
+    publish_to_discord([mock_product], kind=NotificationKind.DEAL)
+
+    assert mock_get_publisher.return_value.submit.call_args.args[2] == "Deal Alert!"
@@ -0,0 +1,214 @@
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from models.product import ScrapeStatus
+from models.store import Store
+from observability import metrics, profiling
+from observability.metrics import EMF_MAX_VALUES, MetricsRecorder, Outcome, Span, is_timeout, timed
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PlaywrightTimeoutError(Exception):
+    """Stands in for playwright's TimeoutError, which does not subclass the builtin."""
+
+
+PlaywrightTimeoutError.__name__ = 'TimeoutError'
+
+
+@pytest.fixture
+def recorder():
+    lines = []
+    recorder = MetricsRecorder(namespace='Test', sink=lines.append, clock=FakeClock())
+    recorder.lines = lines
+    with patch.object(metrics, '_metrics', recorder):
+        yield recorder
+
+
+def test_timer_records_latency_outcome_and_bytes_per_store(recorder):
+    with timed('browser.goto', Store.AMAZON) as span:
+        recorder.clock.now += 0.25
+        span.bytes = 2048
+
+    stats = recorder.snapshot()[('browser.goto', 'AMAZON')]
+    assert stats.latencies_ms == [250.0]
+    assert stats.outcomes == {Outcome.SUCCESS: 1}
+    assert stats.bytes == 2048
+
+
+@pytest.mark.parametrize("error, outcome", [
+    (ValueError("bad"), Outcome.ERROR),
+    (TimeoutError(), Outcome.TIMEOUT),
+    (asyncio.TimeoutError(), Outcome.TIMEOUT),
+    (PlaywrightTimeoutError(), Outcome.TIMEOUT),
+])
+def test_exceptions_are_classified_and_propagate(recorder, error, outcome):
+    with pytest.raises(type(error)):
+        with timed('dynamodb.batch_get'):
+            raise error
+
+    assert recorder.snapshot()[('dynamodb.batch_get', 'ALL')].outcomes == {outcome: 1}
+
+
+def test_is_timeout_matches_requests_timeouts_by_class_name():
+    class Timeout(OSError):
+        pass
+
+    class ReadTimeout(Timeout):
+        pass
+
+    assert is_timeout(ReadTimeout())
+    assert not is_timeout(ConnectionError())
+
+
+def test_decorator_times_sync_and_async_functions(recorder):
+    @timed('sync.phase')
+    def work(value):
+        recorder.clock.now += 0.01
+        return value * 2
+
+    @timed('async.phase', Store.NEWEGG)
+    async def async_work(value):
+        recorder.clock.now += 0.5
+        return value + 1
+
+    assert work(4) == 8
+    assert asyncio.run(async_work(4)) == 5
+    assert asyncio.iscoroutinefunction(async_work)
+
+    snapshot = recorder.snapshot()
+    assert snapshot[('sync.phase', 'ALL')].latencies_ms == [10.0]
+    assert snapshot[('async.phase', 'NEWEGG')].latencies_ms == [500.0]
+
+
+def test_emf_documents_carry_dimensions_and_chunk_latencies():
+    recorder = MetricsRecorder(namespace='Test', sink=lambda line: None)
+    for index in range(EMF_MAX_VALUES + 5):
+        outcome = Outcome.ERROR if index % 10 == 0 else Outcome.SUCCESS
+        recorder.record(Span('http.fetch', 'AMAZON', outcome, bytes=100), 0.001 * index)
+
+    documents = recorder.emf_documents(timestamp_ms=1000)
+
+    assert len(documents) == 2
+    first, overflow = documents
+    directive = first['_aws']['CloudWatchMetrics'][0]
+    assert first['_aws']['Timestamp'] == 1000
+    assert directive['Namespace'] == 'Test'
+    assert directive['Dimensions'] == [['Phase', 'Store']]
+    assert {metric['Name'] for metric in directive['Metrics']} == {
+        'Latency', 'Success', 'Error', 'Timeout', 'Blocked', 'Skipped', 'Bytes'}
+    assert (first['Phase'], first['Store']) == ('http.fetch', 'AMAZON')
+    assert len(first['Latency']) == EMF_MAX_VALUES
+    assert first['Error'] == 11
+    assert first['Success'] == 94
+    assert first['Bytes'] == 100 * (EMF_MAX_VALUES + 5)
+    # Counts are only reported once, so CloudWatch does not add them twice
+    assert len(overflow['Latency']) == 5
+    assert 'Success' not in overflow
+    assert [metric['Name'] for metric in overflow['_aws']['CloudWatchMetrics'][0]['Metrics']] == ['Latency']
+
+
+def test_flush_writes_summaries_then_emf_and_resets(recorder):
+    for seconds in (0.004, 0.2, 3.0):
+        recorder.record(Span('resolve', 'NEWEGG'), seconds)
+    recorder.record(Span('resolve', 'NEWEGG', Outcome.BLOCKED), 0.05)
+
+    recorder.flush()
+
+    summary, document = (json.loads(line) for line in recorder.lines)
+    assert summary['event'] == 'phase_summary'
+    assert summary['count'] == 4
+    assert summary['outcomes'] == {'SUCCESS': 3, 'BLOCKED': 1}
+    assert summary['max_ms'] == 3000.0
+    assert summary['histogram'] == {'le_10': 1, 'le_50': 1, 'le_250': 1, 'le_5000': 1}
+    assert '_aws' in document
+    assert recorder.snapshot() == {}
+
+
+def test_disabled_recorder_writes_nothing():
+    lines = []
+    recorder = MetricsRecorder(sink=lines.append, enabled=False)
+    with patch.object(metrics, '_metrics', recorder):
+        with timed('resolve'):
+            pass
+        recorder.flush()
+
+    assert lines == []
+
+
+def test_file_output_appends_json_lines(tmp_path, monkeypatch):
+    path = tmp_path / 'metrics.jsonl'
+    monkeypatch.setenv('METRICS_OUTPUT', f'file:{path}')
+    monkeypatch.setenv('METRICS_NAMESPACE', 'Local')
+    with patch.object(metrics, '_metrics', None):
+        with timed('ssm.get_parameters'):
+            pass
+        metrics.log_event('transitions', counts={'RESTOCK': 1})
+        metrics.get_metrics().flush()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line.get('event') for line in lines] == ['transitions', 'phase_summary', None]
+    assert lines[2]['_aws']['CloudWatchMetrics'][0]['Namespace'] == 'Local'
+
+
+def test_unknown_output_is_rejected(monkeypatch):
+    monkeypatch.setenv('METRICS_OUTPUT', 'kafka')
+
+    with pytest.raises(ValueError):
+        metrics.sink_from_env()
+
+
+def test_resolver_outcome_follows_product_status():
+    assert metrics.outcome_for_status(ScrapeStatus.OK) == Outcome.SUCCESS
+    assert metrics.outcome_for_status(ScrapeStatus.BLOCKED) == Outcome.BLOCKED
+    assert metrics.outcome_for_status(ScrapeStatus.SKIPPED) == Outcome.SKIPPED
+    assert metrics.outcome_for_status(ScrapeStatus.FAILED) == Outcome.ERROR
+    assert metrics.outcome_for_status(ScrapeStatus.FAILED, timed_out=True) == Outcome.TIMEOUT
+
+
+def test_cprofile_runs_once_per_process(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv('PROFILE_INVOCATION', 'cprofile')
+    monkeypatch.setenv('PROFILE_OUTPUT_DIR', str(tmp_path))
+    monkeypatch.setattr(profiling, '_profiled', False)
+
+    with profiling.profile_invocation():
+        sum(range(1000))
+    with profiling.profile_invocation():
+        sum(range(1000))
+
+    assert len(list(tmp_path.glob('profile-*.prof'))) == 1
+    assert 'cumulative' in capsys.readouterr().out
+
+
+def test_unknown_profiler_is_rejected(monkeypatch):
+    monkeypatch.setenv('PROFILE_INVOCATION', 'perf')
+    monkeypatch.setattr(profiling, '_profiled', False)
+
+    with pytest.raises(ValueError):
+        with profiling.profile_invocation():
+            pass
+
+
+def test_discord_post_records_bytes_and_rate_limits(recorder):
+    from discord.discord_publisher import DiscordPublisher
+
+    limited, accepted = MagicMock(status_code=429, headers={'Retry-After': '0'}), MagicMock(status_code=204, headers={})
+    limited.request.body = accepted.request.body = b'{"embeds": []}'
+    session = MagicMock()
+    session.post.side_effect = [limited, accepted]
+    publisher = DiscordPublisher(session=session, sleep=lambda seconds: None)
+
+    publisher.send_embeds('https://discord.example/webhook', [{'title': 'x'}])
+
+    stats = recorder.snapshot()[('discord.post', 'ALL')]
+    assert stats.outcomes == {Outcome.BLOCKED: 1, Outcome.SUCCESS: 1}
+    assert stats.bytes == 2 * len(b'{"embeds": []}')
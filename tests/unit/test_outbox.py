@@ -0,0 +1,168 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from handler import handle
+from models.store import Store
+from notifications.outbox import (
+    DigestPolicy,
+    InMemoryOutboxStore,
+    NotificationKind,
+    NotificationRecord,
+    OutboxDrainer,
+    make_notification,
+    outbox_store_from_env,
+)
+from tests.helpers import make_product
+
+NOW = 1_700_000_000
+
+
+def make_drainer(store, publisher, digest=DigestPolicy(), now=NOW) -> OutboxDrainer:
+    return OutboxDrainer(store, lambda channel: f"https://discord.test/{channel}", publisher=publisher,
+                         digest=digest, clock=lambda: now)
+
+
+def test_same_transition_is_enqueued_once():
+    store = InMemoryOutboxStore()
+    previous = make_product('A', in_stock=False)
+
+    assert store.enqueue(make_notification(NotificationKind.RESTOCK, make_product('A'), previous, now=NOW))
+    assert not store.enqueue(make_notification(NotificationKind.RESTOCK, make_product('A'), previous, now=NOW + 60))
+    assert len(store.pending()) == 1
+
+
+def test_repeated_restock_at_the_same_price_is_delivered_again():
+    store = InMemoryOutboxStore()
+    publisher = MagicMock()
+    sold_out = make_product('A', in_stock=False)
+
+    for cycle in range(2):
+        assert store.enqueue(make_notification(NotificationKind.RESTOCK, make_product('A'), sold_out, now=NOW + cycle))
+        assert make_drainer(store, publisher, now=NOW + cycle).drain().sent == 1
+
+    assert publisher.send_embeds.call_count == 2
+
+
+def test_dynamodb_enqueue_only_dedups_against_pending_records():
+    from aws_accessors import outbox_accessor
+
+    with patch.object(outbox_accessor, 'get_table') as get_table:
+        outbox_accessor.put_record({'NotificationId': 'n'})
+
+    condition = get_table.return_value.put_item.call_args.kwargs['ConditionExpression']
+    assert condition == 'attribute_not_exists(NotificationId) OR attribute_not_exists(PendingChannel)'
+
+
+def test_record_round_trips_through_dict():
+    record = make_notification(NotificationKind.RESTOCK, make_product('A'), None, channel='gpus', now=NOW)
+
+    restored = NotificationRecord.from_dict(record.to_dict())
+
+    assert restored == record
+    assert record.to_dict()['PendingChannel'] == 'gpus'
+
+
+def test_drain_delivers_once_and_marks_sent():
+    store = InMemoryOutboxStore()
+    publisher = MagicMock()
+    for part_id in ('A', 'B'):
+        store.enqueue(make_notification(NotificationKind.RESTOCK, make_product(part_id), None, now=NOW))
+
+    first = make_drainer(store, publisher).drain()
+    second = make_drainer(store, publisher).drain()
+
+    assert (first.sent, first.digests, second.sent) == (2, 0, 0)
+    webhook, embeds = publisher.send_embeds.call_args.args
+    assert webhook == "https://discord.test/default"
+    assert len(embeds) == 2
+    assert store.pending() == []
+
+
+def test_digest_window_defers_then_coalesces():
+    store = InMemoryOutboxStore()
+    publisher = MagicMock()
+    digest = DigestPolicy(window_seconds=300, min_items=3)
+    for part_id in ('A', 'B', 'C', 'D'):
+        store.enqueue(make_notification(NotificationKind.RESTOCK, make_product(part_id), None, now=NOW))
+
+    early = make_drainer(store, publisher, digest, now=NOW + 60).drain()
+    late = make_drainer(store, publisher, digest, now=NOW + 300).drain()
+
+    assert early.deferred == 4 and early.sent == 0
+    assert (late.sent, late.digests) == (4, 1)
+    embeds = publisher.send_embeds.call_args.args[1]
+    assert len(embeds) == 1
+    assert embeds[0]['title'] == "Stock Alert Digest: 4 products in stock"
+
+
+def test_digests_are_split_by_kind():
+    store = InMemoryOutboxStore()
+    publisher = MagicMock()
+    for part_id in ('A', 'B', 'C'):
+        store.enqueue(make_notification(NotificationKind.DEAL, make_product(part_id), None, now=NOW))
+    store.enqueue(make_notification(NotificationKind.RESTOCK, make_product('D'), None, now=NOW))
+
+    result = make_drainer(store, publisher, DigestPolicy(min_items=3)).drain()
+
+    assert (result.sent, result.digests) == (4, 1)
+    titles = [embed['title'] for embed in publisher.send_embeds.call_args.args[1]]
+    assert titles == ["Deal Alert Digest: 3 products below their usual price", "Stock Alert!"]
+
+
+def test_failed_delivery_stays_pending():
+    store = InMemoryOutboxStore()
+    publisher = MagicMock()
+    publisher.send_embeds.side_effect = requests.ConnectionError("down")
+    store.enqueue(make_notification(NotificationKind.RESTOCK, make_product('A'), None, now=NOW))
+
+    result = make_drainer(store, publisher).drain()
+
+    assert result.failed == 1
+    assert len(store.pending()) == 1
+    publisher.send_embeds.side_effect = None
+    assert make_drainer(store, publisher).drain().sent == 1
+
+
+def test_webhook_lookup_failure_releases_the_batch():
+    store = InMemoryOutboxStore()
+    store.enqueue(make_notification(NotificationKind.RESTOCK, make_product('A'), None, now=NOW))
+
+    def missing_webhook(channel):
+        raise KeyError(channel)
+
+    drainer = OutboxDrainer(store, missing_webhook, publisher=MagicMock(), clock=lambda: NOW)
+    result = drainer.drain()
+
+    assert result.failed == 1
+    # Released, not left leased, so the next drain can claim it straight away
+    assert store.claim(store.pending()[0].notification_id, NOW + 120, NOW)
+
+
+def test_leased_record_is_not_claimed_twice():
+    store = InMemoryOutboxStore()
+    record = make_notification(NotificationKind.RESTOCK, make_product('A'), None, now=NOW)
+    store.enqueue(record)
+
+    assert store.claim(record.notification_id, NOW + 120, NOW)
+    assert not store.claim(record.notification_id, NOW + 130, NOW + 10)
+    assert store.claim(record.notification_id, NOW + 300, NOW + 200)
+
+
+@patch.dict('os.environ', {'OUTBOX_STORE': 'memory'})
+@patch('handler.drain_outbox')
+@patch('handler.find_product_availability')
+@patch('handler.dynamodb_accessor')
+@patch('handler.publish_to_discord')
+def test_handler_enqueues_restocks_when_outbox_enabled(mock_discord, mock_dynamo, mock_find, mock_drain):
+    product = make_product('OUTBOX-TEST')
+    product.store = Store.AMAZON
+    mock_find.return_value = [product]
+    mock_dynamo.batch_get_items.return_value = {}
+
+    handle(None, None)
+
+    pending = outbox_store_from_env().pending()
+    assert [record.product.id for record in pending] == ['OUTBOX-TEST']
+    mock_discord.assert_not_called()
+    mock_drain.assert_called_once()
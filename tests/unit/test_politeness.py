@@ -0,0 +1,114 @@
+import asyncio
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from models.product import Product
+from models.store import Store
+from product_resolvers.base_resolver import BaseResolver
+from product_resolvers.http_fetcher import BlockSignal, detect_block
+from product_resolvers.politeness import PolitenessPolicy, PolitenessScheduler, StoreThrottle, policies_from_env
+from product_resolvers.resolution_scheduler import ConcurrencyLimits, ResolutionScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeAsyncBrowserPool:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class FakeResolver(BaseResolver):
+    def __init__(self, store: Store, index: int, signal=None, finished=None):
+        super().__init__(f"PART-{index}", f"https://example.com/{store.name}/{index}", "Test Part")
+        self.store_name = store
+        self.signal = signal
+        self.finished = finished
+
+    async def resolve_async(self, browser_pool) -> Product:
+        await asyncio.sleep(0.001)
+        self.block_signal = self.signal
+        self.finished.append(self.store_name)
+        return self._create_product(Decimal('10.00'), self.signal is None)
+
+
+def test_detect_block_classifies_responses():
+    assert detect_block(429, "") == BlockSignal.RATE_LIMITED
+    assert detect_block(503, "") == BlockSignal.RATE_LIMITED
+    assert detect_block(403, "") == BlockSignal.CAPTCHA
+    assert detect_block(200, "<p>Please solve this CAPTCHA</p>") == BlockSignal.CAPTCHA
+    assert detect_block(200, "<p>$199.99</p>") is None
+
+
+def test_throttle_backs_off_on_block_and_recovers():
+    clock = FakeClock()
+    policy = PolitenessPolicy(requests_per_second=2.0, burst=1, max_concurrency=4, cooldown_seconds=10.0)
+    throttle = StoreThrottle(policy, clock)
+
+    async def advance(seconds):
+        clock.now += seconds
+
+    async def request(signal):
+        await throttle.acquire(sleep=advance)
+        await throttle.release(signal)
+
+    asyncio.run(request(BlockSignal.RATE_LIMITED))
+    assert throttle.rate == 1.0
+    assert throttle.concurrency == 2
+    assert throttle.reserve() == pytest.approx(10.0)
+
+    clock.now = 10.0
+    asyncio.run(request(BlockSignal.CAPTCHA))
+    # Consecutive blocks double the cooldown
+    assert throttle.reserve() == pytest.approx(20.0)
+
+    clock.now = 100.0
+    for _ in range(10):
+        asyncio.run(request(None))
+    assert throttle.rate == pytest.approx(policy.requests_per_second)
+    assert throttle.concurrency == policy.max_concurrency
+
+
+def test_blocked_store_yields_capacity_to_other_stores():
+    finished = []
+    cooling = PolitenessPolicy(requests_per_second=100.0, burst=1, max_concurrency=1, cooldown_seconds=0.2)
+    fast = PolitenessPolicy(requests_per_second=1000.0, burst=10, max_concurrency=4)
+    politeness = PolitenessScheduler({Store.AMAZON: cooling, Store.NEWEGG: fast})
+    resolvers = [FakeResolver(Store.AMAZON, i, BlockSignal.RATE_LIMITED, finished) for i in range(2)]
+    resolvers += [FakeResolver(Store.NEWEGG, i, None, finished) for i in range(8)]
+    scheduler = ResolutionScheduler(ConcurrencyLimits(global_limit=2, default_per_store=4),
+                                    browser_pool_factory=FakeAsyncBrowserPool, politeness=politeness)
+
+    products = scheduler.run(resolvers)
+
+    assert len(products) == 10
+    # Newegg kept both global slots busy while Amazon cooled down
+    assert finished[-1] == Store.AMAZON
+    assert finished.count(Store.NEWEGG) == 8
+    summary = politeness.summary()
+    assert summary[Store.AMAZON]['blocks'] == 2
+    assert summary[Store.AMAZON]['rate'] < cooling.requests_per_second
+    assert summary[Store.NEWEGG]['blocks'] == 0
+
+
+def test_policies_from_env_overrides_one_store():
+    with patch.dict('os.environ', {'POLITENESS_POLICIES': '{"AMAZON": {"requests_per_second": 0.25}}'}):
+        policies = policies_from_env()
+
+    assert policies[Store.AMAZON].requests_per_second == 0.25
+    assert policies[Store.AMAZON].max_concurrency == 2
+    assert policies[Store.NEWEGG] == PolitenessPolicy(requests_per_second=1.0, burst=3, max_concurrency=3)
+
+    with patch.dict('os.environ', {'POLITENESS_POLICIES': '{"BESTBUY": {}}'}):
+        with pytest.raises(ValueError):
+            policies_from_env()
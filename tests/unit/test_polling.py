@@ -0,0 +1,223 @@
+import os
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from catalog import polling
+from catalog.catalog import CatalogEntry
+from catalog.polling import (
+    HOURS_PER_DAY,
+    InMemoryPollSchedule,
+    PollingPolicy,
+    PollingScheduler,
+    PollState,
+    get_polling_scheduler,
+)
+from models.product import ScrapeStatus
+from models.store import Store
+from transitions.engine import TransitionKind
+from tests.helpers import make_product
+
+# 2026-01-05 10:00:00 UTC
+TEN_AM = 1767607200
+HOUR = 3600
+POLICY = PollingPolicy(min_interval_seconds=300, max_interval_seconds=6 * HOUR, initial_interval_seconds=HOUR,
+                       max_per_tick=10, lease_seconds=900)
+
+
+class FakeClock:
+    def __init__(self, now: int = TEN_AM):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_state(part_id: str = 'GPU', store: Store = Store.AMAZON, **fields) -> PollState:
+    fields.setdefault('next_check_at', TEN_AM)
+    fields.setdefault('interval_seconds', HOUR)
+    return PollState(part_id=part_id, store=store, **fields)
+
+
+def with_restocks(hour: int, count: int) -> tuple[int, ...]:
+    hours = [0] * HOURS_PER_DAY
+    hours[hour] = count
+    return tuple(hours)
+
+
+@pytest.mark.parametrize("kind, interval", [
+    (TransitionKind.RESTOCK, 900),
+    (TransitionKind.PRICE_CHANGE, 900),
+    (TransitionKind.SOLD_OUT, 900),
+    (TransitionKind.UNCHANGED, 5400),
+    (TransitionKind.FIRST_SEEN, 5400),
+])
+def test_changes_shorten_the_interval_and_quiet_checks_stretch_it(kind, interval):
+    state = POLICY.observe(make_state(), TEN_AM, kind, priority=0)
+
+    assert state.interval_seconds == interval
+    assert state.next_check_at == TEN_AM + interval
+    assert state.checks == 1
+    assert state.changes == (kind in polling.CHANGE_KINDS)
+
+
+def test_interval_stays_within_bounds():
+    fast = make_state(interval_seconds=400)
+    slow = make_state(interval_seconds=5 * HOUR)
+
+    assert POLICY.observe(fast, TEN_AM, TransitionKind.RESTOCK, 0).interval_seconds == 300
+    assert POLICY.observe(slow, TEN_AM, TransitionKind.UNCHANGED, 0).interval_seconds == 6 * HOUR
+
+
+def test_subscriber_priority_shortens_the_wait():
+    state = POLICY.observe(make_state(interval_seconds=4 * HOUR), TEN_AM, TransitionKind.UNCHANGED, priority=3)
+
+    # 6 hours / sqrt(1 + 3)
+    assert state.next_check_at == TEN_AM + 3 * HOUR
+
+
+def test_restocks_are_counted_by_hour_of_day():
+    state = POLICY.observe(make_state(), TEN_AM + 15 * 60, TransitionKind.RESTOCK, 0)
+
+    assert state.restock_hours[10] == 1
+    assert sum(state.restock_hours) == 1
+
+
+def test_check_is_pulled_forward_to_a_hot_restock_hour():
+    # Restocks cluster at 13:00 UTC; a 6 hour wait from 10:00 would miss them
+    state = make_state(interval_seconds=6 * HOUR, restock_hours=with_restocks(13, 3))
+
+    assert POLICY.observe(state, TEN_AM, TransitionKind.UNCHANGED, 0).next_check_at == TEN_AM + 3 * HOUR
+
+
+def test_hot_hours_are_polled_at_the_minimum_interval():
+    state = make_state(interval_seconds=6 * HOUR, restock_hours=with_restocks(10, 3))
+
+    assert POLICY.observe(state, TEN_AM + 600, TransitionKind.UNCHANGED, 0).next_check_at == TEN_AM + 900
+
+
+def test_a_single_restock_does_not_make_an_hour_hot():
+    assert POLICY.hot_hours(with_restocks(13, 1)) == set()
+
+
+def test_failed_checks_retry_without_changing_the_interval():
+    state = POLICY.retry(make_state(interval_seconds=2 * HOUR), TEN_AM)
+
+    assert state.interval_seconds == 2 * HOUR
+    assert state.next_check_at == TEN_AM + POLICY.retry_seconds
+    assert state.checks == 0
+
+
+def test_state_round_trips_through_dynamodb_numbers():
+    state = make_state(checks=4, changes=1, restock_hours=with_restocks(13, 2))
+    item = {name: Decimal(value) if isinstance(value, int) else value for name, value in state.to_dict().items()}
+    item['RestockHours'] = [Decimal(count) for count in item['RestockHours']]
+
+    assert PollState.from_dict(item) == state
+
+
+def test_memory_schedule_returns_due_states_earliest_first():
+    schedule = InMemoryPollSchedule()
+    schedule.put_many([make_state('A', next_check_at=TEN_AM - 60), make_state('B', next_check_at=TEN_AM - 600),
+                       make_state('C', next_check_at=TEN_AM + 60)])
+    # Moving A later leaves a stale heap entry that must be skipped
+    schedule.put_many([make_state('A', next_check_at=TEN_AM + 600)])
+
+    assert [state.part_id for state in schedule.due(TEN_AM, limit=10)] == ['B']
+    assert [state.part_id for state in schedule.due(TEN_AM + 600, limit=10)] == ['B', 'C', 'A']
+    assert [state.part_id for state in schedule.due(TEN_AM + 600, limit=2)] == ['B', 'C']
+
+
+def test_select_checks_new_pairs_and_leases_them():
+    schedule = InMemoryPollSchedule()
+    clock = FakeClock()
+    scheduler = PollingScheduler(schedule, POLICY, clock)
+    entries = [CatalogEntry('GPU', 'GPU', {Store.AMAZON: 'a', Store.NEWEGG: 'n'}), CatalogEntry('CPU', 'CPU', {Store.AMAZON: 'c'})]
+
+    selected = scheduler.select(entries)
+
+    assert [(entry.product_id, set(entry.urls)) for entry in selected] == [
+        ('GPU', {Store.AMAZON, Store.NEWEGG}), ('CPU', {Store.AMAZON})]
+    # Leased until the run records them, so an overlapping tick selects nothing
+    assert scheduler.select(entries) == []
+    assert {state.next_check_at for state in schedule.states.values()} == {TEN_AM + POLICY.lease_seconds}
+
+
+def test_record_reschedules_each_pair_from_its_transition():
+    schedule = InMemoryPollSchedule()
+    clock = FakeClock()
+    scheduler = PollingScheduler(schedule, POLICY, clock)
+    entries = [CatalogEntry('GPU', 'GPU', {Store.AMAZON: 'a', Store.NEWEGG: 'n', Store.CANADA_COMPUTERS: 'c'})]
+    scheduler.select(entries)
+
+    products = [make_product('GPU', Store.AMAZON), make_product('GPU', Store.NEWEGG),
+                make_product('GPU', Store.CANADA_COMPUTERS, status=ScrapeStatus.BLOCKED)]
+    kinds = {('GPU', 'AMAZON'): TransitionKind.RESTOCK, ('GPU', 'NEWEGG'): TransitionKind.UNCHANGED}
+    scheduler.record(products, kinds, lambda part_id, store: 0)
+
+    states = schedule.states
+    assert states[('GPU', 'AMAZON')].next_check_at == TEN_AM + 900
+    assert states[('GPU', 'NEWEGG')].next_check_at == TEN_AM + 5400
+    assert states[('GPU', 'CANADA_COMPUTERS')].next_check_at == TEN_AM + POLICY.retry_seconds
+
+    # The restocked pair and the blocked retry are due 15 minutes later; the quiet pair waits
+    clock.now = TEN_AM + 900
+    assert [(entry.product_id, set(entry.urls)) for entry in scheduler.select(entries)] == [
+        ('GPU', {Store.AMAZON, Store.CANADA_COMPUTERS})]
+
+
+def test_select_respects_the_tick_budget():
+    scheduler = PollingScheduler(InMemoryPollSchedule(), PollingPolicy(max_per_tick=3), FakeClock())
+    entries = [CatalogEntry(f"P{index}", 'Part', {Store.AMAZON: 'a'}) for index in range(5)]
+
+    assert [entry.product_id for entry in scheduler.select(entries)] == ['P0', 'P1', 'P2']
+    assert [entry.product_id for entry in scheduler.select(entries)] == ['P3', 'P4']
+
+
+def test_items_dropped_from_the_catalog_are_parked_instead_of_using_the_budget():
+    schedule = InMemoryPollSchedule()
+    clock = FakeClock()
+    scheduler = PollingScheduler(schedule, PollingPolicy(max_per_tick=3, lease_seconds=900), clock)
+    removed = [make_state(f"OLD{index}", next_check_at=TEN_AM - 600) for index in range(5)]
+    kept = [make_state(f"P{index}", next_check_at=TEN_AM - 60) for index in range(2)]
+    schedule.put_many(removed + kept)
+    scheduler._known.update(state.key for state in removed + kept)
+    entries = [CatalogEntry(f"P{index}", 'Part', {Store.AMAZON: 'a'}) for index in range(2)]
+
+    assert [entry.product_id for entry in scheduler.select(entries)] == ['P0', 'P1']
+    assert {schedule.states[state.key].next_check_at for state in removed} == {
+        TEN_AM + PollingPolicy().max_interval_seconds}
+
+
+def test_schedule_is_off_unless_configured():
+    with patch.object(polling, '_polling_scheduler', None):
+        with patch.dict(os.environ, {'POLL_SCHEDULE': 'none'}):
+            assert get_polling_scheduler() is None
+        with patch.dict(os.environ, {'POLL_SCHEDULE': 'memory', 'POLL_MAX_PER_TICK': '25'}):
+            scheduler = get_polling_scheduler()
+            assert isinstance(scheduler.store, InMemoryPollSchedule)
+            assert scheduler.policy.max_per_tick == 25
+            assert get_polling_scheduler() is scheduler
+
+
+@patch.dict(os.environ, {'POLL_SCHEDULE': 'memory'})
+@patch('handler.find_product_availability')
+@patch('handler.dynamodb_accessor')
+@patch('handler.publish_to_discord')
+@patch('handler.load_catalog')
+def test_handler_checks_only_due_pairs(mock_catalog, mock_discord, mock_dynamo, mock_find):
+    from handler import handle
+
+    mock_catalog.return_value = [CatalogEntry('GPU', 'GPU', {Store.AMAZON: 'a'})]
+    mock_find.side_effect = lambda entries: [make_product(entry.product_id, store)
+                                             for entry in entries for store in entry.urls]
+    mock_dynamo.batch_get_items.return_value = {}
+
+    with patch.object(polling, '_polling_scheduler', None):
+        handle(None, None)
+        handle(None, None)
+
+        assert mock_find.call_count == 1
+        state = polling._polling_scheduler.store.states[('GPU', 'AMAZON')]
+        assert state.checks == 1
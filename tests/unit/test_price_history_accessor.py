@@ -0,0 +1,67 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from aws_accessors import price_history_accessor as history
+from aws_accessors.price_history_accessor import Granularity
+from models.store import Store
+from tests.helpers import make_product
+
+NOW = 1_700_003_725  # 1h02m05s past a day boundary
+
+
+@pytest.fixture
+def mock_table():
+    with patch('aws_accessors.price_history_accessor.get_table') as get_table:
+        yield get_table.return_value
+
+
+def test_to_cents_rounds_half_up():
+    assert history.to_cents(1999.99) == 199999
+    assert history.to_cents(Decimal('0.005')) == 1
+    assert history.to_cents(None) is None
+
+
+def test_record_prices_writes_points_and_rollups(mock_table):
+    mock_table.update_item.return_value = {'Attributes': {'MinCents': Decimal(150000), 'MaxCents': Decimal(150000)}}
+
+    history.record_prices([make_product(store=Store.NEWEGG, price=1499.99),
+                           make_product(store=Store.NEWEGG, price=None, in_stock=False)], timestamp=NOW)
+
+    batch = mock_table.batch_writer.return_value.__enter__.return_value
+    items = [call.kwargs['Item'] for call in batch.put_item.call_args_list]
+    assert items[0] == {'SeriesId': 'A#NEWEGG', 'Ts': NOW, 'InStock': True, 'PriceCents': 149999,
+                        'ExpiresAt': NOW + history.RAW_RETENTION_SECONDS}
+    assert 'PriceCents' not in items[1]
+
+    update_keys = [call.kwargs['Key'] for call in mock_table.update_item.call_args_list]
+    hour_key = {'SeriesId': 'A#NEWEGG#HOUR', 'Ts': Granularity.HOUR.bucket_start(NOW)}
+    day_key = {'SeriesId': 'A#NEWEGG#DAY', 'Ts': Granularity.DAY.bucket_start(NOW)}
+    # Each bucket gets the combined update, then a conditional MinCents update because 149999 < 150000
+    assert update_keys == [hour_key, hour_key, day_key, day_key]
+    bound_update = mock_table.update_item.call_args_list[1].kwargs
+    assert bound_update['ConditionExpression'] == 'MinCents > :price'
+
+
+def test_out_of_stock_prices_stay_out_of_the_rollups(mock_table):
+    history.record_prices([make_product(store=Store.NEWEGG, price=999.99, in_stock=False)], timestamp=NOW)
+
+    batch = mock_table.batch_writer.return_value.__enter__.return_value
+    assert batch.put_item.call_args.kwargs['Item']['PriceCents'] == 99999
+    mock_table.update_item.assert_not_called()
+
+
+def test_query_rollups_follows_pages(mock_table):
+    rollup = {'Ts': Decimal(NOW - NOW % 3600), 'MinCents': Decimal(100), 'MaxCents': Decimal(300),
+              'LastCents': Decimal(200), 'LastTs': Decimal(NOW), 'PointCount': Decimal(3)}
+    mock_table.query.side_effect = [
+        {'Items': [rollup], 'LastEvaluatedKey': {'SeriesId': 'A#NEWEGG#HOUR', 'Ts': 1}},
+        {'Items': [rollup]},
+    ]
+
+    rollups = history.query_rollups('A', 'NEWEGG', Granularity.HOUR, NOW - 7200, NOW)
+
+    assert len(rollups) == 2
+    assert (rollups[0].min_cents, rollups[0].max_cents, rollups[0].last_cents, rollups[0].count) == (100, 300, 200, 3)
+    assert mock_table.query.call_args_list[1].kwargs['ExclusiveStartKey'] == {'SeriesId': 'A#NEWEGG#HOUR', 'Ts': 1}
@@ -0,0 +1,107 @@
+import asyncio
+from decimal import Decimal
+
+from models.product import Product, ScrapeStatus
+from models.store import Store
+from product_resolvers.base_resolver import BaseResolver
+from product_resolvers.circuit_breaker import BreakerBoard
+from product_resolvers.resolution_scheduler import ConcurrencyLimits, ResolutionScheduler
+
+
+class FakeAsyncBrowserPool:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class ConcurrencyTracker:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.active_by_store = {}
+        self.peak_by_store = {}
+
+
+class FakeResolver(BaseResolver):
+    def __init__(self, store: Store, delay: float, tracker: ConcurrencyTracker):
+        super().__init__(f"PART-{store.name}-{delay}", f"https://example.com/{store.name}", "Test Part")
+        self.store_name = store
+        self.delay = delay
+        self.tracker = tracker
+
+    async def resolve_async(self, browser_pool) -> Product:
+        tracker = self.tracker
+        tracker.active += 1
+        tracker.peak = max(tracker.peak, tracker.active)
+        store_active = tracker.active_by_store.get(self.store_name, 0) + 1
+        tracker.active_by_store[self.store_name] = store_active
+        tracker.peak_by_store[self.store_name] = max(tracker.peak_by_store.get(self.store_name, 0), store_active)
+        await asyncio.sleep(self.delay)
+        tracker.active -= 1
+        tracker.active_by_store[self.store_name] -= 1
+        return self._create_product(Decimal('10.00'), True)
+
+
+def test_global_and_per_store_limits_respected():
+    tracker = ConcurrencyTracker()
+    resolvers = [FakeResolver(Store.AMAZON, 0.01, tracker) for _ in range(6)]
+    resolvers += [FakeResolver(Store.NEWEGG, 0.01, tracker) for _ in range(6)]
+    limits = ConcurrencyLimits(global_limit=3, default_per_store=2, per_store={Store.NEWEGG: 1})
+    scheduler = ResolutionScheduler(limits, browser_pool_factory=FakeAsyncBrowserPool)
+
+    products = scheduler.run(resolvers)
+
+    assert len(products) == 12
+    assert tracker.peak <= 3
+    assert tracker.peak_by_store[Store.AMAZON] <= 2
+    assert tracker.peak_by_store[Store.NEWEGG] == 1
+
+
+def test_results_returned_in_completion_order():
+    tracker = ConcurrencyTracker()
+    slow = FakeResolver(Store.AMAZON, 0.05, tracker)
+    fast = FakeResolver(Store.NEWEGG, 0.0, tracker)
+    scheduler = ResolutionScheduler(browser_pool_factory=FakeAsyncBrowserPool)
+    streamed = []
+
+    products = scheduler.run([slow, fast], on_result=streamed.append)
+
+    assert [p.store for p in products] == [Store.NEWEGG, Store.AMAZON]
+    assert streamed == products
+
+
+class BrokenResolver(FakeResolver):
+    async def resolve_async(self, browser_pool) -> Product:
+        raise KeyError('price')
+
+
+def test_unexpected_error_fails_one_product_not_the_sweep():
+    tracker = ConcurrencyTracker()
+    broken = BrokenResolver(Store.AMAZON, 0.0, tracker)
+    board = BreakerBoard(store_failure_threshold=1, url_failure_threshold=1)
+    scheduler = ResolutionScheduler(browser_pool_factory=FakeAsyncBrowserPool, breakers=board)
+
+    products = scheduler.run([broken, FakeResolver(Store.NEWEGG, 0.0, tracker)])
+
+    assert {(p.store, p.status) for p in products} == {(Store.AMAZON, ScrapeStatus.FAILED),
+                                                       (Store.NEWEGG, ScrapeStatus.OK)}
+    # The failure reached the breaker
+    assert not board.allow(Store.AMAZON, broken.product_url)
+
+
+def test_empty_resolver_list():
+    scheduler = ResolutionScheduler(browser_pool_factory=FakeAsyncBrowserPool)
+
+    assert scheduler.run([]) == []
+
+
+def test_limits_from_environment(monkeypatch):
+    monkeypatch.setenv('GLOBAL_CONCURRENCY', '32')
+    monkeypatch.setenv('PER_STORE_CONCURRENCY', '10')
+
+    limits = ResolutionScheduler(browser_pool_factory=FakeAsyncBrowserPool).limits
+
+    assert limits.global_limit == 32
+    assert limits.for_store(Store.AMAZON) == 10
@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock
+
+from product_resolvers.route_policy import ALLOW_ALL_POLICY, DEFAULT_ROUTE_POLICY
+
+
+def test_heavy_resource_types_blocked():
+    for resource_type in ['image', 'media', 'font', 'stylesheet']:
+        assert DEFAULT_ROUTE_POLICY.should_block(resource_type, "https://www.newegg.com/x")
+
+
+def test_document_and_scripts_allowed():
+    assert not DEFAULT_ROUTE_POLICY.should_block('document', "https://www.newegg.com/p/1")
+    assert not DEFAULT_ROUTE_POLICY.should_block('script', "https://www.newegg.com/app.js")
+
+
+def test_tracker_subdomains_blocked():
+    assert DEFAULT_ROUTE_POLICY.should_block('script', "https://www.google-analytics.com/analytics.js")
+    assert DEFAULT_ROUTE_POLICY.should_block('xhr', "https://stats.g.doubleclick.net/collect")
+
+
+def test_store_specific_domains():
+    policy = DEFAULT_ROUTE_POLICY.with_blocked_domains('amazon-adsystem.com')
+
+    assert policy.should_block('script', "https://aax-us-east.amazon-adsystem.com/e/dtb")
+    assert not DEFAULT_ROUTE_POLICY.should_block('script', "https://aax-us-east.amazon-adsystem.com/e/dtb")
+
+
+def test_allow_all_does_not_install_route():
+    page = MagicMock()
+
+    ALLOW_ALL_POLICY.apply(page)
+    DEFAULT_ROUTE_POLICY.apply(page)
+
+    page.route.assert_called_once()
@@ -0,0 +1,77 @@
+from unittest.mock import patch
+
+import pytest
+
+from aws_accessors.aws_session import AWSSession
+from aws_accessors.ssm_accessor import ParameterCache
+
+
+def parameters_response(names):
+    return {'Parameters': [{'Name': name, 'Value': f"value-of-{name}",
+                            'ARN': f"arn:aws:ssm:us-east-1:1:parameter{name}"} for name in names],
+            'InvalidParameters': []}
+
+
+@pytest.fixture
+def mock_ssm():
+    with patch('aws_accessors.ssm_accessor.get_client') as get_client:
+        client = get_client.return_value
+        client.get_parameters.side_effect = lambda Names, WithDecryption: parameters_response(Names)
+        yield client
+
+
+def test_prefetch_batches_and_warm_reads_skip_ssm(mock_ssm):
+    cache = ParameterCache(ttl_seconds=60)
+    names = [f"/webhooks/{i}" for i in range(12)]
+
+    cache.prefetch(names + [None, names[0]])
+    values = [cache.get(name) for name in names]
+    cache.prefetch(names)
+
+    assert [len(call.kwargs['Names']) for call in mock_ssm.get_parameters.call_args_list] == [10, 2]
+    assert values[3] == "value-of-/webhooks/3"
+    assert cache.get("arn:aws:ssm:us-east-1:1:parameter/webhooks/3") == "value-of-/webhooks/3"
+
+
+def test_entries_expire_and_refresh(mock_ssm):
+    now = [0.0]
+    cache = ParameterCache(ttl_seconds=60, clock=lambda: now[0])
+
+    cache.get('/webhook')
+    now[0] = 59
+    cache.get('/webhook')
+    assert mock_ssm.get_parameters.call_count == 1
+
+    now[0] = 61
+    cache.get('/webhook')
+    cache.refresh('/webhook')
+    cache.get('/webhook')
+    assert mock_ssm.get_parameters.call_count == 3
+
+
+def test_missing_parameter_raises(mock_ssm):
+    mock_ssm.get_parameters.side_effect = None
+    mock_ssm.get_parameters.return_value = {'Parameters': [], 'InvalidParameters': ['/missing']}
+
+    with pytest.raises(KeyError):
+        ParameterCache().get('/missing')
+
+
+def test_expired_entry_is_not_served_once_the_parameter_is_gone(mock_ssm):
+    now = [0.0]
+    cache = ParameterCache(ttl_seconds=60, clock=lambda: now[0])
+    cache.get('/webhook')
+
+    mock_ssm.get_parameters.side_effect = None
+    mock_ssm.get_parameters.return_value = {'Parameters': [], 'InvalidParameters': ['/webhook']}
+    now[0] = 61
+
+    with pytest.raises(KeyError):
+        cache.get('/webhook')
+
+
+def test_clients_are_memoized_per_service_and_region():
+    assert AWSSession.get_client('sqs') is AWSSession.get_client('sqs', AWSSession.default_region())
+    assert AWSSession.get_client('sqs', 'us-west-2') is not AWSSession.get_client('sqs', 'eu-west-1')
+    assert AWSSession.get_resource('dynamodb') is AWSSession.get_resource('dynamodb')
+    assert AWSSession.get_client('sqs', 'us-west-2').meta.config.max_pool_connections == 32
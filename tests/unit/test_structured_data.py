@@ -0,0 +1,95 @@
+import json
+
+import lxml.html
+
+from product_resolvers.newegg_resolver import NeweggResolver
+from product_resolvers.extraction import extract_from_html
+from product_resolvers.structured_data import (
+    EmbeddedStateRule,
+    extract_structured_from_document,
+    offer_from_json_ld,
+)
+
+
+def json_ld_script(data) -> str:
+    return f'<script type="application/ld+json">{json.dumps(data)}</script>'
+
+
+def test_json_ld_product_offer():
+    offer = offer_from_json_ld([json.dumps({
+        "@context": "https://schema.org",
+        "@type": "Product",
+        "name": "RTX 3090 Ti",
+        "offers": {"@type": "Offer", "price": "1,999.99", "priceCurrency": "USD",
+                   "availability": "https://schema.org/OutOfStock"}
+    })])
+
+    assert offer.price == 1999.99
+    assert offer.currency == "USD"
+    assert offer.in_stock is False
+    assert offer.complete
+
+
+def test_json_ld_graph_with_multiple_offers_prefers_cheapest_in_stock():
+    offer = offer_from_json_ld([json.dumps({
+        "@graph": [
+            {"@type": "BreadcrumbList"},
+            {"@type": ["Product"], "offers": [
+                {"price": 1899.0, "availability": "OutOfStock"},
+                {"price": 2099.0, "availability": "InStock"},
+                {"price": 1999.0, "availability": "http://schema.org/InStock"},
+            ]}
+        ]
+    })])
+
+    assert offer.in_stock is True
+    assert offer.price == 1999.0
+
+
+def test_invalid_json_ld_is_ignored():
+    assert offer_from_json_ld(["{not json", json.dumps({"@type": "WebPage"})]) is None
+
+
+def test_embedded_state_from_inline_script():
+    html = """
+    <html><head><script>
+      window.__initialState__ = {"ItemDetail": {"FinalPrice": 1049.99, "Instock": true}};
+      window.other = 1;
+    </script></head><body></body></html>
+    """
+    document = lxml.html.fromstring(html)
+
+    offer = extract_structured_from_document(document, NeweggResolver.SPEC.embedded_state_rules)
+
+    assert offer.price == 1049.99
+    assert offer.in_stock is True
+
+
+def test_embedded_state_without_keys_is_ignored():
+    rule = EmbeddedStateRule(variable='__state__', price_keys=('price',), in_stock_keys=('inStock',))
+    document = lxml.html.fromstring('<html><body><script>__state__ = {"a": 1}</script></body></html>')
+
+    assert extract_structured_from_document(document, (rule,)) is None
+
+
+def test_structured_data_wins_over_selectors():
+    html = json_ld_script({
+        "@type": "Product",
+        "offers": {"price": "899.00", "availability": "https://schema.org/InStock"}
+    }) + '<div class="product-inventory">OUT OF STOCK</div>'
+
+    result = extract_from_html(html, NeweggResolver.SPEC)
+
+    assert result.in_stock is True
+    assert result.price == 899.0
+
+
+def test_selectors_fill_in_missing_structured_fields():
+    html = json_ld_script({"@type": "Product", "offers": {"availability": "InStock"}}) + \
+        '<div class="price-current"><strong>1,049</strong></div>'
+
+    result = extract_from_html(html, NeweggResolver.SPEC)
+
+    assert result.in_stock is True
+    assert result.price == 1049.0
+    assert result.complete
@@ -0,0 +1,119 @@
+import json
+import os
+from decimal import Decimal
+from unittest.mock import patch
+
+from handler import notify_restocks
+from models.store import Store
+from notifications.outbox import DEFAULT_CHANNEL
+from notifications.subscriptions import (
+    Subscription,
+    SubscriptionIndex,
+    load_subscription_index,
+    parse_subscriptions,
+)
+from tests.helpers import make_product
+
+
+def test_lookup_matches_store_and_threshold():
+    index = SubscriptionIndex([
+        Subscription('alice', 'gpu-channel', 'GPU', store=Store.NEWEGG),
+        Subscription('bob', 'deals-channel', 'GPU', max_price=Decimal('450')),
+        Subscription('carol', 'gpu-channel', 'GPU'),
+    ])
+
+    assert [s.subscriber_id for s in index.subscriptions_for(make_product('GPU', Store.NEWEGG, Decimal('500.00')))] == ['alice', 'carol']
+    assert set(index.channels_for(make_product('GPU', Store.AMAZON, Decimal('449.99')))) == {'gpu-channel', 'deals-channel'}
+    assert index.channels_for(make_product('GPU', Store.AMAZON, Decimal('450.01'))) == ['gpu-channel']
+    assert index.channels_for(make_product('CPU')) == []
+
+
+def test_deliveries_group_by_channel_once_per_product():
+    subscriptions = [Subscription(f"user-{i}", 'gpu-channel', 'GPU') for i in range(50)]
+    subscriptions += [Subscription('dana', 'cpu-channel', 'CPU'), Subscription('erin', 'gpu-channel', 'CPU')]
+    index = SubscriptionIndex(subscriptions)
+
+    deliveries = index.deliveries([make_product('GPU'), make_product('CPU'), make_product('RAM')])
+
+    assert {channel: [p.id for p in products] for channel, products in deliveries.items()} == {
+        'gpu-channel': ['GPU', 'CPU'],
+        'cpu-channel': ['CPU'],
+    }
+
+
+def test_fallback_channel_only_for_unwatched_products():
+    index = SubscriptionIndex([Subscription('bob', 'deals', 'GPU', max_price=Decimal('100'))],
+                              fallback_channel=DEFAULT_CHANNEL)
+
+    assert index.channels_for(make_product('GPU', price=Decimal('500.00'))) == []
+    assert index.channels_for(make_product('CPU')) == [DEFAULT_CHANNEL]
+
+
+def test_parse_skips_invalid_entries():
+    subscriptions = parse_subscriptions({'subscriptions': [
+        {'subscriber': 'alice', 'channel': '/webhooks/gpus', 'product': 'GPU', 'store': 'NEWEGG', 'max_price': 999.99},
+        {'subscriber': 'bob', 'product': 'GPU', 'store': 'NOT_A_STORE'},
+        {'channel': 'x'},
+    ]})
+
+    assert subscriptions == [Subscription('alice', '/webhooks/gpus', 'GPU', Store.NEWEGG, Decimal('999.99'))]
+    assert Subscription.from_dict(subscriptions[0].to_dict()) == subscriptions[0]
+
+
+def test_file_source(tmp_path, monkeypatch):
+    path = tmp_path / "subscriptions.json"
+    path.write_text(json.dumps({'subscriptions': [{'subscriber': 'alice', 'channel': 'c', 'product': 'GPU'}]}))
+    monkeypatch.setenv('SUBSCRIPTION_SOURCE', 'file')
+    monkeypatch.setenv('SUBSCRIPTIONS_PATH', str(path))
+
+    index = load_subscription_index()
+
+    assert len(index) == 1
+    assert index.fallback_channel is None
+
+
+@patch('handler.ssm_accessor')
+@patch('handler.publish_to_discord')
+def test_notify_restocks_publishes_once_per_channel(mock_publish, mock_ssm):
+    index = SubscriptionIndex([
+        Subscription('alice', 'a', 'GPU'), Subscription('bob', 'b', 'GPU'), Subscription('carol', 'a', 'CPU'),
+    ])
+    gpu, cpu = make_product('GPU'), make_product('CPU')
+
+    notify_restocks([(gpu, None), (cpu, None)], index)
+
+    assert sorted((call.args[1], [p.id for p in call.args[0]]) for call in mock_publish.call_args_list) == [
+        ('a', ['GPU', 'CPU']),
+        ('b', ['GPU']),
+    ]
+    assert sorted(mock_ssm.prefetch_parameters.call_args.args[0]) == ['a', 'b']
+
+
+def test_priority_sums_store_and_any_store_subscriptions():
+    index = SubscriptionIndex(parse_subscriptions({'subscriptions': [
+        {'subscriber': 'alice', 'channel': 'gpu', 'product': 'GPU', 'store': 'NEWEGG', 'priority': 5},
+        {'subscriber': 'bob', 'channel': 'gpu', 'product': 'GPU'},
+    ]}))
+
+    assert index.priority_for('GPU', Store.NEWEGG) == 6
+    assert index.priority_for('GPU', Store.AMAZON) == 1
+    assert index.priority_for('CPU', Store.AMAZON) == 0
+
+
+@patch('handler.load_subscription_index')
+@patch('handler.find_product_availability')
+@patch('handler.dynamodb_accessor')
+@patch('handler.publish_to_discord')
+def test_handler_loads_subscriptions_once(mock_publish, mock_dynamo, mock_find, mock_index):
+    from catalog import polling
+    from handler import handle
+
+    mock_index.return_value = SubscriptionIndex(fallback_channel=DEFAULT_CHANNEL)
+    mock_find.return_value = [make_product('GPU')]
+    mock_dynamo.batch_get_items.return_value = {}
+
+    with patch.dict(os.environ, {'POLL_SCHEDULE': 'memory'}), patch.object(polling, '_polling_scheduler', None):
+        handle(None, None)
+
+    mock_index.assert_called_once()
+    mock_publish.assert_called_once()
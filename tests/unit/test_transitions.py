@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import pytest
+
+from models.product import ScrapeStatus
+from models.store import Store
+from transitions.engine import TRANSITION_TABLE, TransitionKind, plan_transitions, state_key
+from tests.helpers import make_product
+
+
+@pytest.mark.parametrize('previous, current, kind, write, notify', [
+    (None, make_product('P', in_stock=True), TransitionKind.FIRST_SEEN, True, True),
+    (None, make_product('P', in_stock=False), TransitionKind.FIRST_SEEN, True, False),
+    (make_product('P', in_stock=False), make_product('P', in_stock=True), TransitionKind.RESTOCK, True, True),
+    (make_product('P', in_stock=True), make_product('P', in_stock=False), TransitionKind.SOLD_OUT, True, False),
+    (make_product('P'), make_product('P', price=Decimal('90.00')), TransitionKind.PRICE_CHANGE, True, False),
+    (make_product('P'), make_product('P'), TransitionKind.UNCHANGED, False, False),
+    (make_product('P', in_stock=False), make_product('P', in_stock=False), TransitionKind.UNCHANGED, False, False),
+    (make_product('P'), make_product('P', in_stock=False, price=None, status=ScrapeStatus.FAILED),
+     TransitionKind.ERROR, False, False),
+])
+def test_each_transition(previous, current, kind, write, notify):
+    previous_by_key = {state_key(previous): previous} if previous else {}
+
+    plan = plan_transitions([current], previous_by_key)
+
+    assert [transition.kind for transition in plan.transitions] == [kind]
+    assert plan.writes == ([current] if write else [])
+    assert plan.restocks == ([(current, previous)] if notify else [])
+
+
+def test_table_covers_every_stock_and_price_combination():
+    for previous_in_stock in (None, True, False):
+        for in_stock in (True, False):
+            assert (previous_in_stock, in_stock, False) in TRANSITION_TABLE
+            if previous_in_stock is not None:
+                assert (previous_in_stock, in_stock, True) in TRANSITION_TABLE
+
+
+def test_float_and_decimal_prices_compare_by_value():
+    previous = make_product('P', price=Decimal('1999.99'))
+
+    plan = plan_transitions([make_product('P', price=1999.99)], {state_key(previous): previous})
+
+    assert plan.counts() == {TransitionKind.UNCHANGED: 1}
+
+
+def test_every_store_is_classified_in_one_batch():
+    previous = {state_key(product): product for product in [
+        make_product('GPU', Store.AMAZON, in_stock=False),
+        make_product('GPU', Store.NEWEGG, in_stock=True),
+    ]}
+    products = [
+        make_product('GPU', Store.AMAZON, in_stock=True),
+        make_product('GPU', Store.NEWEGG, in_stock=False),
+        make_product('GPU', Store.CANADA_COMPUTERS, in_stock=True),
+    ]
+
+    plan = plan_transitions(products, previous)
+
+    assert [transition.kind for transition in plan.transitions] == [
+        TransitionKind.RESTOCK, TransitionKind.SOLD_OUT, TransitionKind.FIRST_SEEN
+    ]
+    assert plan.writes == products
+    assert [product.store for product, _ in plan.restocks] == [Store.AMAZON, Store.CANADA_COMPUTERS]
+    assert plan.of_kind(TransitionKind.SOLD_OUT)[0].previous is previous[('GPU', 'NEWEGG')]